@@ -15,15 +15,22 @@ class Alien(Sprite):
 
     __init__
         initializes elements of the alien "fleet"
+    image
+        current animation frame of the fleet
     update
         updates speed of aliens on screen
     check_edges
         checks for the edge of the screen
     draw_alien
         draws the alien on the screen
+    kill
+        removes the alien from its groups and the fleet's column index
+    remove_internal
+        takes the alien out of the fleet's column index when it leaves a group
     """
    
-    def __init__(self, fleet: 'AlienFleet', x: float, y: float):
+    def __init__(self, fleet: 'AlienFleet', x: float, y: float, col: int = 0, 
+                 row: int = 0):
         super().__init__()
 
         """
@@ -38,36 +45,59 @@ class Alien(Sprite):
             x-coordinate (used by rect)
         y (float)
             y-coordinate (used by rect)
+        col (int)
+            column of the alien in the formation
+        row (int)
+            row of the alien in the formation
 
         Attributes
         ----------
 
         fleet
             group fo aliens moving toward bottom of the screen
-        image
-            image file of alien
-            scaled by width and height from settings
+        boundaries
+            rect of the screen, shared with the fleet
         rect
             creates rect for each alien
+        home
+            (x, y) of the alien's formation slot when the fleet was built
+        diving (bool)
+            True while the alien is out of formation, moved by the fleet's
+            DiveAttack instead of with the formation
         """
         
         self.fleet = fleet
         self.screen = fleet.game.screen
-        self.boundaries = fleet.game.screen.get_rect()
+        self.boundaries = fleet.boundaries
         self.settings = fleet.game.settings
 
-        self.image = pygame.image.load(self.settings.alien_file)
-        self.image = pygame.transform.scale(self.image, 
-            (self.settings.alien_w, self.settings.alien_h)
-            )
-
-        
-        self.rect = self.image.get_rect()
+        self.rect = fleet.atlas.frames[0].get_rect()
         self.rect.x = x
         self.rect.y = y
 
         self.y = float(self.rect.y)
         self.x = float(self.rect.x)
+        self.home = (self.x, self.y)
+        self.diving = False
+        self.col = col
+        self.row = row
+
+    @property
+    def image(self):
+
+        """
+        The fleet's current animation frame, so changing frames never touches
+        the aliens
+        """
+        return self.fleet.atlas.frames[self.fleet.frame]
+
+    @property
+    def mask(self):
+
+        """
+        Collision mask of the fleet's animation frames
+        """
+        return self.fleet.atlas.mask
 
     def update(self):
 
@@ -82,6 +112,8 @@ class Alien(Sprite):
         x
             determines speed and direction of fleet movement
         """
+        if self.diving:
+            return
         temp_speed = self.settings.fleet_speed
 
         self.x += temp_speed * self.fleet.fleet_direction
@@ -95,8 +127,10 @@ class Alien(Sprite):
 
         Returns:
             True: if edge of screen is hit
-            False: if edge of screen is not hit
+            False: if edge of screen is not hit, or the alien is diving
         """
+        if self.diving:
+            return False
         return (self.rect.right >= self.boundaries.right or self.rect.left <= self.boundaries.left)
         
 
@@ -110,4 +144,28 @@ class Alien(Sprite):
 
         blit(Args: image, rect)
         """
-        self.screen.blit(self.image, self.rect)
\ No newline at end of file
+        self.screen.blit(self.image, self.rect)
+
+    def kill(self):
+
+        """
+        Removes the alien from its groups (used by groupcollide) and from the
+        fleet's column index
+        """
+        self.fleet.remove_from_column(self)
+        super().kill()
+
+    def remove_internal(self, group):
+
+        """
+        Called by pygame when the alien is removed from a group with remove()
+        or empty(). Keeps the fleet's column index in step with the fleet
+
+        Args
+        ----
+        group
+            the group the alien is leaving
+        """
+        super().remove_internal(group)
+        if group is self.fleet.fleet:
+            self.fleet.remove_from_column(self)
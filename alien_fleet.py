@@ -1,5 +1,12 @@
+import random
+from time import perf_counter
+
 import pygame
 from alien import Alien
+from sprite_atlas import SpriteAtlas
+from enemy_arsenal import EnemyArsenal
+from dive_attack import DiveAttack
+from collision_masks import groupcollide_pixels
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -16,9 +23,17 @@ class AlienFleet:
     __init__(self, game: 'AlienInvasion')
         Initializes attributes of the alien fleet
     create_fleet(self) 
-        Creates the alien fleet
-    _create_trapezoid_fleet(self, alien_w, alien_h, fleet_w, fleet_h, x_offset, y_offset)
-        Creates the alien fleet in the shape of a trapezoid
+        Swaps in the pre-built alien fleet and starts building the next one
+    calc_layout(self)
+        Computes the formation slots for the current screen size
+    rescale(self, old_size)
+        Fits the fleet, its layout and its bullets to a new screen size
+    _start_prebuild(self)
+        Starts building the next fleet in the background
+    prebuild(self, deadline)
+        Builds aliens of the next fleet until a deadline
+    _trapezoid_slots(self, alien_w, alien_h, fleet_w, fleet_h, x_offset, y_offset)
+        Positions of the alien fleet in the shape of a trapezoid
     calc_offsets(self, alien_w, alien_h, screen_w, fleet_w, fleet_h)
         Calculates the distance between the fleet and the edge of the screen
     calc_fleet_size(self, alien_w, screen_w, alien_h, screen_h)
@@ -31,7 +46,10 @@ class AlienFleet:
     drop_alien_fleet(self)
         Drops the alien fleet vertically
     update_fleet(self)
-        Updates fleet and checks if fleet collides with edges of screen 
+        Updates fleet, moves the divers, and checks if fleet collides with
+        edges of screen
+    _advance_animation(self)
+        Moves the shared animation clock of the fleet
     draw(self)
         Draws the aliens in the fleet on the screen
     check_collisions(self, other_group)
@@ -41,6 +59,10 @@ class AlienFleet:
         the screen
     check_destroyed_status(self)
         Checks if fleet has been destroyed, returns that fleet has been destroyed
+    remove_from_column(self, alien)
+        Removes a destroyed alien from the column index
+    _fire_from_front(self)
+        Lets the lowest alien of a random column fire, at the rate in settings
     
 
     """
@@ -67,6 +89,37 @@ class AlienFleet:
         fleet_drop_speed
             the speed at which the fleet moves down the y-axis when a boundary 
             is hit
+        batch_draw
+            draws the fleet with one batched blit, set by the quality governor
+        boundaries
+            rect of the screen, shared by every alien and updated in place
+            when the screen changes size
+        atlas
+            pre-scaled animation frames shared by every alien
+        layout
+            (x, y, column, row) of every formation slot at the current screen
+            size, computed once per resize
+        frame (int)
+            index of the animation frame every alien shows
+        frame_ticks (int)
+            frames the current animation frame has been shown for
+        next_fleet
+            sprite group of the next fleet, built a few aliens at a time in
+            idle frame time
+        next_columns
+            column index of the next fleet
+        columns
+            aliens of each formation column, top row first, so the last alien
+            is the one allowed to fire
+        arsenal
+            pool of alien bullets
+        formation_x, formation_y (float)
+            how far the formation has moved since the fleet was built
+        dives
+            aliens out of formation diving at the ship
+        rng
+            random number generator for alien fire, seeded from settings so
+            networked games stay in step
 
         Calls
         -----
@@ -81,20 +134,58 @@ class AlienFleet:
         self.fleet = pygame.sprite.Group()
         self.fleet_direction = self.settings.fleet_direction
         self.fleet_drop_speed = self.settings.fleet_drop_speed
+        self.batch_draw = False
+        self.boundaries = game.screen.get_rect()
+        self.atlas = self._load_atlas()
+        self.calc_layout()
+        self.frame = 0
+        self.frame_ticks = 0
+        self.columns = {}
+        self.arsenal = EnemyArsenal(game)
+        self.formation_x = 0.0
+        self.formation_y = 0.0
+        self.dives = DiveAttack(self)
+        self.rng = random.Random(self.settings.random_seed)
+        self.next_fleet = None
+        self.next_columns = {}
 
         self.create_fleet()
 
     def create_fleet(self):
 
         """
-        Creates the alien fleet
+        Swaps in the pre-built alien fleet, finishing it first if idle time ran
+        out, and starts building the next one. The level-clear frame only
+        exchanges the groups instead of loading and scaling every alien
+
+        Calls
+        -----
+        prebuild()
+            finishes the next fleet without a deadline
+        _start_prebuild()
+            starts the fleet after this one
+        """
+        if self.next_fleet is None:
+            self._start_prebuild()
+        self.prebuild()
+        self.fleet, self.columns = self.next_fleet, self.next_columns
+        self.formation_x = 0.0
+        self.formation_y = 0.0
+        self.dives.clear()
+        self._start_prebuild()
+
+    def calc_layout(self):
+
+        """
+        Computes the formation slots for the current screen size, from the
+        size of the scaled aliens
 
         Attributes
         ----------
         alien_w
-            width of alien
+            width of alien at the current resolution
         alien_h
-            height of alien
+            height of alien at the current resolution
         screen_w
             width of screen
         screen_h
@@ -106,12 +197,11 @@ class AlienFleet:
             calculates the size of the fleet
         calc_offsets(Args: alien_w, alien_h, screen_w, fleet_w, fleet_h)
             calculates how far away the fleet will be from the edge of the screen
-        _create_trapezoid_fleet(Args: alien_w, alien_h, fleet_w, fleet_h, 
+        _trapezoid_slots(Args: alien_w, alien_h, fleet_w, fleet_h, 
         x_offset, y_offset)
-            creates the shape of the alien fleet
+            positions in the shape of the alien fleet
         """
-        alien_w = self.settings.alien_w
-        alien_h = self.settings.alien_h
+        alien_w, alien_h = self.atlas.frames[0].get_size()
         screen_w = self.settings.screen_w
         screen_h = self.settings.screen_h
 
@@ -119,12 +209,78 @@ class AlienFleet:
 
         x_offset, y_offset = self.calc_offsets(alien_w, alien_h, screen_w, fleet_w, fleet_h)
 
-        self._create_trapezoid_fleet(alien_w, alien_h, fleet_w, fleet_h, x_offset, y_offset)
+        self.layout = list(self._trapezoid_slots(
+            alien_w, alien_h, fleet_w, fleet_h, x_offset, y_offset))
 
-    def _create_trapezoid_fleet(self, alien_w, alien_h, fleet_w, fleet_h, x_offset, y_offset):
+    def rescale(self, old_size):
 
         """
-        Creates the alien fleet in the shape of a trapezoid
+        Fits the fleet to a new screen size. The aliens keep their place
+        relative to the screen, the layout is computed again for the next
+        fleets, and the fleet being built ahead is started again at the new size
+
+        Args
+        ----
+        old_size
+            (width, height) of the screen before the change
+        """
+        x_ratio = self.settings.screen_w / old_size[0]
+        y_ratio = self.settings.screen_h / old_size[1]
+        self.boundaries.size = (self.settings.screen_w, self.settings.screen_h)
+        self.atlas = self._load_atlas()
+        self.calc_layout()
+
+        size = self.atlas.frames[0].get_size()
+        self.formation_x *= x_ratio
+        self.formation_y *= y_ratio
+        self.dives.rescale(x_ratio, y_ratio)
+        alien: Alien
+        for alien in self.fleet:
+            alien.home = (alien.home[0] * x_ratio, alien.home[1] * y_ratio)
+            alien.x *= x_ratio
+            alien.y *= y_ratio
+            alien.rect.size = size
+            alien.rect.x = alien.x
+            alien.rect.y = alien.y
+        self._start_prebuild()
+        self.arsenal.rescale(old_size)
+
+    def _start_prebuild(self):
+
+        """
+        Starts building the next fleet from the cached layout. The aliens are
+        made by prebuild()
+        """
+        self._pending_slots = iter(self.layout)
+        self.next_fleet = pygame.sprite.Group()
+        self.next_columns = {}
+
+    def prebuild(self, deadline=None):
+
+        """
+        Builds aliens of the next fleet until the deadline passes or the fleet
+        is complete
+
+        Args
+        ----
+        deadline (float)
+            perf_counter() time to stop at, None to build the whole fleet
+
+        Returns:
+            bool: True once the next fleet is complete
+        """
+        for current_x, current_y, col, row in self._pending_slots:
+            new_alien = Alien(self, current_x, current_y, col, row)
+            self.next_fleet.add(new_alien)
+            self.next_columns.setdefault(col, []).append(new_alien)
+            if deadline is not None and perf_counter() >= deadline:
+                return False
+        return True
+
+    def _trapezoid_slots(self, alien_w, alien_h, fleet_w, fleet_h, x_offset, y_offset):
+
+        """
+        Yields the positions of the alien fleet in the shape of a trapezoid
 
         Attributes
         ----------
@@ -134,17 +290,15 @@ class AlienFleet:
         current_y
             y position of the alien
 
-        Calls
-        -----
-        _create_alien(Args: current_x, current_y)
-            creates the alien based on the current x and y position
+        Yields:
+            tuple: current_x, current_y, column and row of each alien
         """
         for row in range(fleet_h):
             for col in range(row, fleet_w - row):
                 current_x = alien_w * col + x_offset
                 current_y = alien_h * row + y_offset
 
-                self._create_alien(current_x, current_y)
+                yield current_x, current_y, col, row
 
      
 
@@ -197,7 +351,8 @@ class AlienFleet:
         
         return int(fleet_w), int(fleet_h)
     
-    def _create_alien(self, current_x: int, current_y: int):
+    def _create_alien(self, current_x: int, current_y: int, col: int = 0, 
+                      row: int = 0):
 
         """
         Creates an alien and adds it to the fleet
@@ -208,12 +363,53 @@ class AlienFleet:
             x position of alien
         current_y
             y position of alien
-
-        
+        col
+            formation column of alien
+        row
+            formation row of alien
         """
-        new_alien = Alien(self, current_x, current_y)
+        new_alien = Alien(self, current_x, current_y, col, row)
 
         self.fleet.add(new_alien)
+        self.columns.setdefault(col, []).append(new_alien)
+
+    def remove_from_column(self, alien: 'Alien'):
+
+        """
+        Removes a destroyed alien from the column index, dropping the column
+        once it is empty
+
+        Args
+        ----
+        alien
+            alien that left the fleet
+        """
+        column = self.columns.get(alien.col)
+        if column is None or alien not in column:
+            return
+        column.remove(alien)
+        if not column:
+            del self.columns[alien.col]
+
+    def _fire_from_front(self):
+
+        """
+        Lets the lowest alien in formation of a random column fire, so an
+        alien out diving never shoots. The chance each frame comes from
+        alien_fire_rate (shots per second) in settings
+        """
+        if not self.columns:
+            return
+        if self.rng.random() >= self.settings.alien_fire_rate / self.settings.FPS:
+            return
+        front = []
+        for column in self.columns.values():
+            for alien in reversed(column):
+                if not alien.diving:
+                    front.append(alien)
+                    break
+        if front:
+            self.arsenal.fire_bullet(self.rng.choice(front).rect.midbottom)
 
     def check_fleet_edges(self):
 
@@ -231,23 +427,72 @@ class AlienFleet:
     def drop_alien_fleet(self):
 
         """
-        Drops the alien fleet vertically
+        Drops the alien fleet vertically, leaving divers on their paths
         """
+        self.formation_y += self.fleet_drop_speed
         for alien in self.fleet:
-            alien.y += self.fleet_drop_speed
+            if not alien.diving:
+                alien.y += self.fleet_drop_speed
+
+    def _load_atlas(self):
+
+        """
+        Builds the alien animation frames from the sprite sheet in settings, or
+        from alien_file when there is no sheet, at the current resolution.
+        Frames built for an earlier window size are reused
+
+        Returns:
+            SpriteAtlas
+        """
+        resolution = self.game.resolution
+        size = resolution.scaled_size((self.settings.alien_w, self.settings.alien_h))
+
+        def build():
+            if self.settings.alien_sheet_file:
+                return SpriteAtlas.from_sheet(self.settings.alien_sheet_file,
+                    self.settings.alien_frame_count, size)
+            return SpriteAtlas.from_image(self.settings.alien_file, size,
+                self.settings.alien_squash)
+
+        return resolution.get(('alien_atlas', size), build)
 
     def update_fleet(self):
 
         """
-        Updates fleet and checks if fleet collides with edges of screen
+        Updates fleet and checks if fleet collides with edges of screen, moves
+        the divers, then lets the front aliens fire and moves their bullets
         """
         self.check_fleet_edges()
         self.fleet.update()
+        self.formation_x += self.settings.fleet_speed * self.fleet_direction
+        self.dives.update()
+        self._advance_animation()
+        self._fire_from_front()
+        self.arsenal.update_arsenal()
+
+    def _advance_animation(self):
+
+        """
+        Moves the fleet to the next animation frame every alien_frame_ticks
+        frames. Aliens read their image from the shared frame index, so no
+        alien is touched here
+        """
+        self.frame_ticks += 1
+        if self.frame_ticks >= self.settings.alien_frame_ticks:
+            self.frame_ticks = 0
+            self.frame = (self.frame + 1) % len(self.atlas.frames)
 
     def draw(self):
         """
         Draws the aliens in the fleet on the screen
+
+        Uses Group.draw() when batch_draw is set, which blits the whole fleet
+        in one call instead of one method call per alien
         """
+        self.arsenal.draw()
+        if self.batch_draw:
+            self.fleet.draw(self.game.screen)
+            return
         alien: 'Alien'
         for alien in self.fleet:
             alien.draw_alien()
@@ -255,7 +500,8 @@ class AlienFleet:
     def check_collisions(self, other_group):
 
         """
-        Checks for collisions between the aliens and another group
+        Checks for collisions between the aliens and another group, on solid
+        pixels when pixel_collisions is on in settings
 
         Args
         ----
@@ -265,16 +511,18 @@ class AlienFleet:
         Returns:
             bool: True or False if a collision occurs
         """
+        if self.settings.pixel_collisions:
+            return groupcollide_pixels(self.fleet, other_group, True, True)
         return pygame.sprite.groupcollide(self.fleet, other_group, True, True)
     
     def check_fleet_bottom(self):
 
         """
         Checks for a collision between an alien in the fleet and the bottom of
-        the screen
+        the screen. Divers fly past the bottom and do not count
         """      
         for alien in self.fleet:
-            if alien.rect.bottom >= self.settings.screen_h:
+            if alien.rect.bottom >= self.settings.screen_h and not alien.diving:
                 return True
         return False
     
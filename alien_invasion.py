@@ -1,13 +1,30 @@
 import sys
+import warnings
 import pygame
 from settings import Settings
 from ship import Ship
 from arsenal import ShipArsenal
 from alien_fleet import AlienFleet
+from asteroid_field import AsteroidField
 from game_stats import GameStats
-from time import sleep
+from time import perf_counter
 from button import Button
+from event_bus import EventBus
 from hud import HUD
+from input_handler import InputHandler
+from netplay import DesyncError, LockstepSession
+from telemetry import TelemetryLog
+from replay import ReplayRecorder
+from simulation_thread import SimulationThread
+from particles import ExplosionParticles
+from starfield import Starfield
+from low_res_renderer import LowResRenderer
+from quality_governor import QualityGovernor
+from gc_scheduler import GCScheduler
+from frame_pacer import FramePacer
+from music_controller import MusicController
+from resolution_cache import ResolutionCache
+from video_capture import VideoCapture
 
 class AlienInvasion:
     """
@@ -20,26 +37,98 @@ class AlienInvasion:
 
     screen (int)
         sets the screen width and height, imported from settings
-    bg (file)
-        sets the screen background, imported from settings
+    resolution (object)
+        sprite images and backgrounds scaled for each window size
+    fullscreen (bool)
+        True while the window fills the display
+    vsync (bool)
+        True when the window was opened with vsync
+    windowed_size
+        size of the window to go back to when leaving fullscreen
+    resize_at (float)
+        perf_counter() time to scale the game to a resized window at, None
+        when no resize is waiting
+    starfield (object)
+        scrolling parallax background
+    low_res (object)
+        draws the scene at a lower resolution and stretches it to the screen,
+        None when render_scale is 1
+    events (object)
+        event bus that hands game events to stats, HUD, audio and effects
+        once per frame
     running (bool)
         determines if the game is running 
     clock (int)
         represents the FPS of that game
+    music (object)
+        plays the title and battle tracks and fades between them
+    pacer (object)
+        waits for each frame in the pacing mode from settings and measures
+        jitter
     ship (object)
         the "character" that the player can control
+    ships (list)
+        every ship in play, the partner's ship is added in netplay
+    asteroids (object)
+        drifting asteroid hazards, empty unless asteroids is on in settings
+    netplay (object)
+        lockstep session with the other player, None when playing alone
+    simulation (object)
+        SimulationThread running the simulation in threaded mode, else None
+    pause_ticks (int)
+        ticks left of the pause after a ship is lost, the simulation does not
+        move while they count down
+    quality_governor (object)
+        lowers optional costs when frames keep running over budget
+    particles (object)
+        explosion particles started when aliens are destroyed
+    telemetry (object)
+        optional per-frame and per-event session log
+    replay (object)
+        optional seekable recording of every simulated frame
+    input (object)
+        maps keys to actions and measures input latency
+    gc_scheduler (object)
+        runs garbage collection between frames when gc_scheduling is on
+    capture (object)
+        copies rendered frames to background encoders when recording
 
     Functions
     ---------
 
     __init__(self)
         initializes elements of the game
-    play_background_music(self)
-        plays the background music of the game
+    _open_display(self, size, fullscreen)
+        opens the game window, with vsync if pacing asks for it
+    _toggle_fullscreen(self)
+        switches between fullscreen and the window
+    _resize(self)
+        scales sprites and lays the game out again after the screen size
+        changes
     run_game(self)
         the game loop
+    _run_frame(self)
+        one frame of the game loop
+    _update_game(self)
+        moves everything and checks collisions
+    _paused(self)
+        counts down the pause after a lost ship
+    _run_threaded(self)
+        the game loop with the simulation on its own thread
+    _run_netplay(self)
+        the co-op game loop over the network
+    _update_netplay(self)
+        swaps inputs with the other player and moves everything
+    _play_sound(self, sound)
+        plays a sound effect, merging overlaps at reduced quality
+    _on_aliens_killed(self, events)
+        plays the impact sound once per frame of kills
+    _on_ship_lost(self, events)
+        pauses the music for the lose ship sound
     _update_screen(self)
         updates the screen (backgound and drawing the ship)
+    _draw_scene(self, snapshot)
+        draws the background, sprites and particles at full resolution
     _check_events(self)
         checks events of player 
     _check_keydown_events(self, event)
@@ -47,14 +136,23 @@ class AlienInvasion:
         pressed
     _check_keyup_events(self, event)
         stops moving character when key is released
+    _quit_game(self)
+        saves and closes files, then exits
 
     """
 
-    def __init__(self):
+    def __init__(self, settings: Settings = None):
 
         """
         Initializes elements of the game
 
+        Args
+        ----
+
+        settings (class)
+            Settings to use instead of the defaults, for tools that change them
+            before the game is built
+
         Attributes
         ----------
 
@@ -62,8 +160,8 @@ class AlienInvasion:
             imports Settings() class from file
         screen (int)
             sets the screen width and height, imported from settings
-        bg (file)
-            sets the screen background, imported from settings
+        starfield (object)
+            scrolling parallax background built from settings
         running (bool)
             determines if the game is running 
         clock (int)
@@ -78,31 +176,36 @@ class AlienInvasion:
             sets screen width and height
         set_caption()
             sets caption of the game for player to see
-        load()
-            loads the background
-        scale()
-            scales background to fit the screen
 
         
         """
         
         pygame.init()
-        self.settings = Settings()
+        self.settings = settings or Settings()
         self.settings.initialize_dynamic_settings()
 
-        self.screen = pygame.display.set_mode(
-            (self.settings.screen_w, self.settings.screen_h)
-            )
+        self.resolution = ResolutionCache((self.settings.screen_w, self.settings.screen_h),
+            self.settings.resolution_cache_sizes)
+        self.resize_at = None
+        self.windowed_size = (self.settings.screen_w, self.settings.screen_h)
+        self.fullscreen = self.settings.fullscreen
+        self.screen = self._open_display(self.windowed_size, self.fullscreen)
+        self.settings.screen_w, self.settings.screen_h = self.screen.get_size()
+        self.resolution.set_resolution(self.screen.get_size())
         pygame.display.set_caption(self.settings.name)
-        self.bg = pygame.image.load(self.settings.bg_file)
-        self.bg = pygame.transform.scale(self.bg, 
-            (self.settings.screen_w, self.settings.screen_h)
-            )
+        if self.settings.render_scale != 1:
+            self.low_res = LowResRenderer(self)
+            self.starfield = Starfield(self, self.low_res.surface)
+        else:
+            self.low_res = None
+            self.starfield = Starfield(self)
+        self.events = EventBus()
 
         self.game_stats = GameStats(self)
         self.HUD = HUD(self)
         self.running = True
         self.clock = pygame.time.Clock()
+        self.pacer = FramePacer(self)
 
         pygame.mixer.init()
         self.laser_sound = pygame.mixer.Sound(self.settings.laser_sound)
@@ -111,30 +214,119 @@ class AlienInvasion:
         self.impact_sound.set_volume(0.3)
         self.lose_ship_sound = pygame.mixer.Sound(self.settings.lose_ship_sound)
         self.lose_ship_sound.set_volume(0.5)
-        self.play_background_music()
+        self.music = MusicController(self)
+        self.events.subscribe('aliens_killed', self._on_aliens_killed)
+        self.events.subscribe('ship_lost', self._on_ship_lost)
 
         self.ship = Ship(self, ShipArsenal(self))
+        self.ships = [self.ship]
+        self.netplay = None
+        self.simulation = None
+        self.pause_ticks = 0
         self.alien_fleet = AlienFleet(self)
         self.alien_fleet.create_fleet()
+        self.asteroids = AsteroidField(self)
+        if self.low_res:
+            self.low_res.prescale()
         self.play_button = Button(self, 'START')
         self.game_active = False
+        self.quality_governor = QualityGovernor(self)
+        self.particles = ExplosionParticles(self)
+        self.telemetry = TelemetryLog(self)
+        self.replay = ReplayRecorder(self)
+        self.input = InputHandler(self)
+        self.gc_scheduler = GCScheduler(self)
+        self.capture = VideoCapture(self)
 
-    def play_background_music(self):
+    def _open_display(self, size, fullscreen=False):
 
         """
-        Plays background music
+        Opens the game window. With vsync pacing, asks for vsync, which
+        pygame only gives to SCALED or OPENGL windows, and falls back to a
+        plain window if the driver cannot provide it. Without a hardware
+        renderer pygame opens the SCALED window in software with a warning
+        and no vsync, so a warning counts as no vsync too, and the pacer then
+        uses clock.tick() instead. A SCALED window keeps its size when
+        resized or made fullscreen, other windows take the size of the window
+        or the display
 
-        Attributes
-        ----------
+        Args
+        ----
+        size
+            (width, height) of the window
+        fullscreen (bool)
+            fills the display instead of opening a window
 
-        title_screen_music
-            loads music file from settings
+        Returns:
+            pygame.Surface: the screen
+        """
+        flags = pygame.FULLSCREEN if fullscreen else 0
+        if self.settings.resizable and not self.settings.netplay_role:
+            flags |= pygame.RESIZABLE
+        self.vsync = False
+        if self.settings.frame_pacing == 'vsync':
+            try:
+                with warnings.catch_warnings(record=True) as caught:
+                    warnings.simplefilter('always')
+                    screen = pygame.display.set_mode(size, flags | pygame.SCALED,
+                        vsync=1)
+            except pygame.error as e:
+                print(f'Vsync unavailable, pacing with clock.tick(): {e}')
+            else:
+                if not caught:
+                    self.vsync = True
+                else:
+                    print(f'Vsync unavailable, pacing with clock.tick(): '
+                        f'{caught[0].message}')
+                return screen
+        return pygame.display.set_mode((0, 0) if fullscreen else size, flags)
+
+    def _toggle_fullscreen(self):
 
         """
-        self.title_screen_music = pygame.mixer.music.load(
-            self.settings.title_screen_music)
-        pygame.mixer.music.play(-1)
-        pygame.mixer.music.set_volume(0.5)
+        Switches between fullscreen and the window, remembering the window
+        size to go back to. Not used in netplay, where both games must keep
+        the same screen size
+        """
+        if self.netplay:
+            return
+        if self.screen.get_flags() & pygame.SCALED:
+            pygame.display.toggle_fullscreen()
+            self.fullscreen = not self.fullscreen
+            return
+        if not self.fullscreen:
+            self.windowed_size = self.screen.get_size()
+        self.fullscreen = not self.fullscreen
+        self._open_display(self.windowed_size, self.fullscreen)
+        self._resize()
+
+    def _resize(self):
+
+        """
+        Scales sprites and lays the game out again once the screen has changed
+        size. Everything keeps its place relative to the screen. Images come
+        from the resolution cache, so going back to a recent size does not
+        scale anything again
+        """
+        size = self.screen.get_size()
+        old_size = (self.settings.screen_w, self.settings.screen_h)
+        if size == old_size:
+            return
+        self.settings.screen_w, self.settings.screen_h = size
+        self.resolution.set_resolution(size)
+        if self.low_res:
+            self.low_res.rescale()
+            self.starfield.rescale(self.low_res.surface)
+        else:
+            self.starfield.rescale()
+        for ship in self.ships:
+            ship.rescale(old_size)
+        self.alien_fleet.rescale(old_size)
+        self.asteroids.rescale(old_size)
+        if self.low_res:
+            self.low_res.prescale()
+        self.HUD.rescale()
+        self.play_button.rescale()
 
     def run_game(self): 
 
@@ -143,30 +335,239 @@ class AlienInvasion:
         
         Calls
         -----
-        _check_events()
-        update()
-        _update_screen()
+        _run_frame()
+            events, updates and drawing for one frame
 
         Methods
         -------
 
+        after_frame(Args: deadline)
+            collects garbage in the time left before the frame's deadline
         tick()
-            runs the game at specified FPS (access through settings)
+            pacer: waits for the next frame at the FPS in settings
+        record_frame()
+            passes the frame time to the telemetry log and quality governor
         """  
+        if self.settings.threaded_simulation:
+            self._run_threaded()
+            return
+        if self.settings.netplay_role:
+            self._run_netplay()
+            return
+
+        self.gc_scheduler.start()
         while self.running:
-            self._check_events()
-            if self.game_active:
-                self.ship.update()
-                self.alien_fleet.update_fleet()
-                self._check_collisions()
-            self._update_screen()
-            self.clock.tick(self.settings.FPS)
+            deadline = perf_counter() + 1 / self.settings.FPS
+            self._run_frame()
+            self.gc_scheduler.after_frame(deadline)
+            frame_ms = self.pacer.tick()
+            self.telemetry.record_frame(frame_ms)
+            if self.settings.adaptive_quality:
+                self.quality_governor.record_frame(frame_ms, self.pacer.work_ms)
+
+    def _run_frame(self):
+
+        """
+        Runs one frame of the game loop without waiting for the next frame
+
+        Calls
+        -----
+        _check_events()
+        _paused()
+            skips the update during the pause after a lost ship
+        _update_game()
+        music.update()
+            starts the next track once a fade out has finished
+        starfield.update()
+        _update_screen()
+        prebuild(Args: deadline)
+            builds part of the next fleet if the frame has time left
+        """
+        frame_start = perf_counter()
+        self._check_events()
+        if self.game_active and not self._paused():
+            self._update_game()
+        self.music.update()
+        self.starfield.update()
+        self._update_screen()
+        self.alien_fleet.prebuild(frame_start
+            + self.settings.prebuild_frame_share / self.settings.FPS)
+
+    def _update_game(self):
+
+        """
+        Moves the ships, fleet and particles, checks collisions, hands the
+        frame's events to their subscribers, and records the frame for the
+        replay
+        """
+        if self.settings.poll_movement:
+            self.input.poll_movement(self.ship)
+        for ship in self.ships:
+            ship.update()
+        self.alien_fleet.update_fleet()
+        self.asteroids.update()
+        self._check_collisions()
+        self.events.dispatch()
+        self.particles.update()
+        self.replay.record_frame()
+
+    def _run_threaded(self):
+
+        """
+        Game loop with the simulation (ship, fleet and collisions) on a
+        SimulationThread at a fixed tick. This thread handles events and draws
+        the latest snapshot the simulation published, so a slow flip() does
+        not hold up the next update
+
+        Calls
+        -----
+        _check_events()
+            run while holding the simulation lock, since events change state
+        latest()
+            gets the newest render snapshot
+        _update_screen(Args: snapshot)
+        stop()
+            stops and joins the simulation thread
+        """
+        self.simulation = SimulationThread(self)
+        self.simulation.start()
+        try:
+            while self.running:
+                with self.simulation.state_lock:
+                    self._check_events()
+                self.music.update()
+                self.starfield.update()
+                self._update_screen(self.simulation.buffer.latest())
+                self.telemetry.record_frame(self.pacer.tick())
+        finally:
+            self.simulation.stop()
+
+    def _run_netplay(self):
+
+        """
+        Co-op game loop over the network. Both players run the same simulation
+        and only step it once the inputs of both players for the tick are
+        known, so every tick waits on the LockstepSession. The session ends
+        with the game, and the game is then shut down like any other quit
+
+        Calls
+        -----
+        connect()
+            hosts or joins a session, as set by netplay_role in settings
+        _update_netplay()
+            swaps this tick's inputs and steps the simulation
+        _quit_game()
+            saves scores and closes the log files, unless a quit event already
+            did
+
+        Exceptions
+        ----------
+
+        DesyncError
+            if the two simulations no longer match
+        OSError
+            if the connection fails or the other player leaves
+        """
+        try:
+            self.netplay = LockstepSession.connect(self)
+        except OSError as e:
+            print(f'Netplay could not connect: {e}')
+            self._quit_game()
+        try:
+            while self.running and self.game_active:
+                self._check_events()
+                self._update_netplay()
+                self.music.update()
+                self.starfield.update()
+                self._update_screen()
+                self.pacer.tick()
+        except (DesyncError, OSError) as e:
+            print(f'Netplay stopped: {e}')
+        finally:
+            self.netplay.close()
+            print(self.netplay.report())
+            if self.running:
+                self._quit_game()
+
+    def _update_netplay(self):
+
+        """
+        Swaps this tick's inputs with the other player, then moves the ships,
+        fleet and particles, checks collisions and records the frame, the same
+        way on both sides. Both sides lose a ship on the same tick, so they
+        sit out the pause after it for the same ticks and swap nothing then
+        """
+        if self._paused():
+            return
+        self.netplay.step_inputs()
+        for ship in self.ships:
+            ship.update()
+        self.alien_fleet.update_fleet()
+        self.asteroids.update()
+        self._check_collisions()
+        self.events.dispatch()
+        self.particles.update()
+        self.replay.record_frame()
+
+    def _play_sound(self, sound):
+
+        """
+        Plays a sound effect. When the quality governor merges sounds, a sound
+        that is still playing is not started again on another channel
+
+        Args
+        ----
+        sound
+            pygame Sound to play
+        """
+        if self.quality_governor.merge_sounds and sound.get_num_channels():
+            return
+        sound.play()
+
+    def _on_aliens_killed(self, events):
+
+        """
+        Plays the impact sound once for all the aliens killed in a frame
+        """
+        self._play_sound(self.impact_sound)
+        self.impact_sound.fadeout(500)
+
+    def _on_ship_lost(self, events):
+
+        """
+        Pauses the music, plays the lose ship sound and starts the pause after
+        a ship is lost. The pause is counted down in ticks by _paused() rather
+        than slept, so the window keeps handling events through it and, in
+        threaded mode, the simulation does not hold the state lock
+        """
+        self.music.pause()
+        self.lose_ship_sound.play()
+        self.pause_ticks = round(self.settings.ship_lost_pause * self.settings.FPS)
+        if not self.pause_ticks:
+            self.music.unpause()
+
+    def _paused(self):
+
+        """
+        Counts one tick of the pause after a lost ship, and brings the music
+        back when the pause is over
+
+        Returns:
+            bool: True if the simulation sits out this tick
+        """
+        if not self.pause_ticks:
+            return False
+        self.pause_ticks -= 1
+        if not self.pause_ticks:
+            self.music.unpause()
+        return True
 
     def _check_collisions(self):
 
         """
         Checks for collisions for the ship, aliens and the bottom of the screen,
-        and between the projectiles and aliens. 
+        and between the projectiles and aliens. Scores, sounds and effects are
+        left to the subscribers of the events published here
 
         Methods
         -------
@@ -174,44 +575,78 @@ class AlienInvasion:
         check_collisions()
             checks for collisions between sprites
         _check_game_status()
-            checks for remaining ships, resets, level, and contains sleep timer
+            checks for remaining ships and resets the level
         check_fleet_bottom()
             checks for bottom of the alien fleet
+        check_hit (Args: rect)
+            checks if an alien bullet hit the ship
+        _check_asteroid_collisions()
+            checks the asteroids against the ships, bullets and aliens
+        _check_bullet_collisions (Args: ship)
+            checks the bullets of each ship against the fleet
         check_destroyed_status()
             checks if alien fleet is destroyed
-        update (Args: collisions)
-            updates game stats based on collisions
-        update_scores()
-            updates the scores on the HUD
         _reset_level()
             resets level when fleet is destroyed
         increase_difficulty()
             increases difficulty when alien fleet is destroyed
-        update_level()
-            game_stats: increments level by 1
-            HUD: updates level display
+        publish (Args: 'level_cleared')
+            game_stats and HUD update the level when the events are dispatched
         
          
         """
 
-        if self.ship.check_collisions(self.alien_fleet.fleet):
-            self._check_game_status()
+        for ship in self.ships:
+            if ship.check_collisions(self.alien_fleet.fleet):
+                self._check_game_status()
 
         if self.alien_fleet.check_fleet_bottom():
             self._check_game_status()
 
-        collisions = self.alien_fleet.check_collisions(self.ship.arsenal.arsenal)
-        if collisions:
-            self.impact_sound.play()
-            self.impact_sound.fadeout(500)
-            self.game_stats.update(collisions)
-            self.HUD.update_scores()
+        for ship in self.ships:
+            mask = ship.mask if self.settings.pixel_collisions else None
+            if self.alien_fleet.arsenal.check_hit(ship.rect, mask):
+                ship._center_ship()
+                self._check_game_status()
+
+        self._check_asteroid_collisions()
+
+        for ship in self.ships:
+            self._check_bullet_collisions(ship)
 
         if self.alien_fleet.check_destroyed_status():
             self._reset_level()
             self.settings.increase_difficulty()
-            self.game_stats.update_level()
-            self.HUD.update_level()
+            self.events.publish('level_cleared')
+
+    def _check_asteroid_collisions(self):
+
+        """
+        Checks the asteroids against the ships, bullets and aliens. A ship hit
+        by an asteroid is lost. Aliens crushed by asteroids score no points
+        """
+        ships_hit, aliens_hit, destroyed = self.asteroids.check_collisions()
+        centers = [alien.rect.center for alien in aliens_hit] + destroyed
+        if centers:
+            self.events.publish('asteroid_impacts', centers=centers)
+        for ship in ships_hit:
+            ship._center_ship()
+            self._check_game_status()
+
+    def _check_bullet_collisions(self, ship):
+
+        """
+        Checks the bullets of one ship against the fleet and publishes the
+        aliens it destroyed
+
+        Args
+        ----
+        ship
+            ship whose arsenal is checked
+        """
+        collisions = self.alien_fleet.check_collisions(ship.arsenal.arsenal)
+        if collisions:
+            self.events.publish('aliens_killed', aliens=list(collisions))
 
 
     def _check_game_status(self):
@@ -220,17 +655,17 @@ class AlienInvasion:
         Checks for status of elements in the game
 
         Decrements ships_left if collision between aliens and the bottom of the
-        screen or aliens and the ship occurs, as well as resets the level
+        screen or aliens and the ship occurs, as well as resets the level.
+        Publishes ship_lost or game_over for the sound and telemetry
         """
         if self.game_stats.ships_left > 0:
-            pygame.mixer.music.pause()
-            self.lose_ship_sound.play()
             self.game_stats.ships_left -= 1
             self._reset_level()
-            sleep(1.0)
-            pygame.mixer.music.unpause()
+            self.events.publish('ship_lost', ships_left=self.game_stats.ships_left)
         else:
             self.game_active = False
+            self.events.publish('game_over',
+                score=self.game_stats.score, level=self.game_stats.level)
         
 
     def _reset_level(self):
@@ -238,9 +673,12 @@ class AlienInvasion:
         """
         Resets the level, empties the screen and recreates all elements
         """
-        self.ship.arsenal.arsenal.empty()
+        for ship in self.ships:
+            ship.arsenal.arsenal.empty()
+        self.alien_fleet.arsenal.empty()
         self.alien_fleet.fleet.empty()
         self.alien_fleet.create_fleet()
+        self.asteroids.reset()
 
 
     def restart_game(self):
@@ -254,28 +692,51 @@ class AlienInvasion:
         self.game_stats.reset_stats()
         self.HUD.update_scores()
         self._reset_level()
-        self.ship._center_ship()
+        self.particles.clear()
+        for ship in self.ships:
+            ship._center_ship()
+        self.music.play_battle()
         self.game_active = True
         pygame.mouse.set_visible(False)
 
-    def _update_screen(self):
+    def _update_screen(self, snapshot=None):
 
         """
         Updates game screen while game is running
 
+        Args
+        ----
+        snapshot (RenderSnapshot)
+            positions published by the simulation thread; when None the
+            sprites are drawn from the live game objects
+
         Methods
         -------
 
-        blit()
-            places background image on the screen
+        draw(Args: snapshot)
+            low_res: draws the scene at a lower resolution and stretches it
+            to the screen, in place of the steps below up to the HUD
+        starfield.draw()
+            draws the background layers on the screen
+        blits()
+            draws the sprites of a simulation snapshot
+        fill()
+            fills the screen with a solid color when the quality governor
+            skips the background image
         draw()
             draws the ship onto the screen
         flip()
             updates the game screen
+        end_frame(Args: shown)
+            finishes the input latency measurements this frame shows; in
+            threaded mode the ship is taken from the snapshot that was drawn
+        capture_frame()
+            capture: queues a copy of the finished frame when recording
         """
-        self.screen.blit(self.bg, (0, 0))
-        self.ship.draw()
-        self.alien_fleet.draw()
+        if self.low_res:
+            self.low_res.draw(snapshot)
+        else:
+            self._draw_scene(snapshot)
         self.HUD.draw()
 
         if not self.game_active:
@@ -283,6 +744,34 @@ class AlienInvasion:
             pygame.mouse.set_visible(True)
 
         pygame.display.flip()
+        if snapshot:
+            _, (ship_x, _) = snapshot.ship[0]
+            self.input.end_frame((ship_x, len(snapshot.bullets)))
+        else:
+            self.input.end_frame()
+        self.capture.capture_frame()
+
+    def _draw_scene(self, snapshot):
+
+        """
+        Draws the background, sprites and particles straight on the screen
+        """
+        if self.quality_governor.solid_background:
+            self.screen.fill(self.settings.bg_fill_color)
+        else:
+            self.starfield.draw()
+        if snapshot is None:
+            for ship in self.ships:
+                ship.draw()
+            self.alien_fleet.draw()
+            self.asteroids.draw()
+        elif snapshot:
+            self.screen.blits(snapshot.bullets, doreturn=False)
+            self.screen.blits(snapshot.ship, doreturn=False)
+            self.screen.blits(snapshot.enemy_bullets, doreturn=False)
+            self.screen.blits(snapshot.aliens, doreturn=False)
+            self.screen.blits(snapshot.asteroids, doreturn=False)
+        self.particles.draw(particles=None if snapshot is None else snapshot.particles)
 
     def _check_events(self): 
 
@@ -298,20 +787,35 @@ class AlienInvasion:
             checks if player releases a key
         _check_button_clicked()
             checks if player clicked the "start" button
+        _resize()
+            fits the game to the window once it has kept its size for
+            resize_settle seconds
+        _toggle_fullscreen()
+            switches between fullscreen and the window
+        toggle()
+            capture: starts or stops recording the frames
 
         """
-        for event in pygame.event.get():
+        for event in self.input.get_events():
             if event.type == pygame.QUIT:
-                self.running = False
-                self.game_stats.save_scores()
-                pygame.quit()
-                sys.exit()
+                self._quit_game()
+            elif event.type == pygame.VIDEORESIZE:
+                self.resize_at = perf_counter() + self.settings.resize_settle
+            elif (event.type == pygame.KEYDOWN
+                    and self.input.action_for(event.key) == 'fullscreen'):
+                self._toggle_fullscreen()
+            elif (event.type == pygame.KEYDOWN
+                    and self.input.action_for(event.key) == 'capture'):
+                self.capture.toggle()
             elif event.type == pygame.KEYDOWN and self.game_active == True:
                 self._check_keydown_events(event)
             elif event.type == pygame.KEYUP:
                 self._check_keyup_events(event)
-            elif event.type == pygame.MOUSEBUTTONDOWN:
+            elif event.type == pygame.MOUSEBUTTONDOWN and not self.netplay:
                 self._check_button_clicked()
+        if self.resize_at is not None and perf_counter() >= self.resize_at:
+            self.resize_at = None
+            self._resize()
 
     def _check_button_clicked(self):
 
@@ -328,7 +832,6 @@ class AlienInvasion:
         mouse_pos = pygame.mouse.get_pos()
         if self.play_button.check_clicked(mouse_pos):
             self.restart_game()
-            pygame.mixer.music.set_volume(0.3)
 
     def _check_keydown_events(self, event):
 
@@ -341,18 +844,43 @@ class AlienInvasion:
         event
             a key is pressed
         """
-        if event.key == pygame.K_RIGHT:
+        action = self.input.action_for(event.key)
+        self.input.key_pressed(action, event)
+        if action == 'right':
             self.ship.moving_right = True
-        elif event.key == pygame.K_LEFT:
+        elif action == 'left':
             self.ship.moving_left = True
-        elif event.key == pygame.K_SPACE:
+        elif action == 'fire' and self.netplay:
+            self.netplay.queue_fire()
+        elif action == 'fire' and not self.pause_ticks:
             if self.ship.fire():
-                self.laser_sound.play()
-        elif event.key == pygame.K_q:
-            self.running = False
-            self.game_stats.save_scores()
-            pygame.quit()
-            sys.exit()
+                self._play_sound(self.laser_sound)
+        elif action == 'quit':
+            self._quit_game()
+
+    def _quit_game(self):
+
+        """
+        Stops the simulation thread, saves scores, closes the telemetry and
+        replay files, and exits
+        """
+        self.running = False
+        if self.simulation:
+            self.simulation.stop()
+        self.game_stats.save_scores()
+        self.telemetry.close()
+        self.replay.close()
+        self.capture.close()
+        if self.settings.report_input_latency:
+            print(self.input.latency_report())
+        self.gc_scheduler.stop()
+        if self.settings.report_gc_pauses:
+            print(self.gc_scheduler.report())
+        if self.settings.report_frame_pacing:
+            print(self.pacer.report())
+        pygame.quit()
+        sys.exit()
+
     def _check_keyup_events(self, event):
 
         """
@@ -364,9 +892,10 @@ class AlienInvasion:
         event
             a key is pressed
         """
-        if event.key == pygame.K_RIGHT:
+        action = self.input.action_for(event.key)
+        if action == 'right':
             self.ship.moving_right = False
-        elif event.key == pygame.K_LEFT:
+        elif action == 'left':
             self.ship.moving_left = False
 
             
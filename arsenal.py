@@ -43,10 +43,13 @@ class ShipArsenal:
             class: Settings
         arsenal
             creates sprite group
+        ship
+            ship that fires the bullets, set by Ship
         """
         self.game = game
         self.settings = game.settings
         self.arsenal = pygame.sprite.Group()
+        self.ship = None
 
     def update_arsenal(self):
         """
@@ -94,7 +97,7 @@ class ShipArsenal:
             True: If length of arsenal is less than bullet_amount from settings
         """
         if len(self.arsenal) < self.settings.bullet_amount:
-            new_bullet = Bullet(self.game)
+            new_bullet = Bullet(self.game, self.ship)
             self.arsenal.add(new_bullet)
             return True
         return False
\ No newline at end of file
@@ -0,0 +1,284 @@
+import random
+
+import pygame
+from pygame.sprite import Sprite
+from broadphase import SweepAndPrune
+from collision_masks import cached_mask, masks_overlap
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+   from alien_invasion import AlienInvasion
+
+
+class Asteroid(Sprite):
+
+    """
+    One drifting asteroid
+
+    Methods
+    -------
+
+    __init__(self, field: 'AsteroidField', size)
+        creates the asteroid off screen
+    respawn(self)
+        moves the asteroid above the screen with a new speed
+    update(self)
+        drifts the asteroid by its speed
+    """
+
+    def __init__(self, field: 'AsteroidField', size):
+
+        """
+        Creates the asteroid off screen
+
+        Args
+        ----
+        field
+            the AsteroidField the asteroid belongs to
+        size (int)
+            index of the asteroid's size in settings
+
+        Attributes
+        ----------
+        image
+            asteroid image of this size, shared by the field
+        mask
+            collision mask of the image
+        rect
+            position of the asteroid
+        x, y (float)
+            exact position
+        vx, vy (float)
+            pixels moved each frame
+        hits (int)
+            bullets it can still take, bigger asteroids take more
+        """
+        super().__init__()
+        self.field = field
+        self.size = size
+        self.image = field.images[size]
+        self.mask = field.masks[size]
+        self.rect = self.image.get_rect()
+        self.respawn()
+
+    def respawn(self):
+
+        """
+        Moves the asteroid to a random place above the screen with a new speed
+        and full hits
+        """
+        settings = self.field.settings
+        rng = self.field.rng
+        self.x = rng.uniform(-self.rect.width, settings.screen_w)
+        self.y = rng.uniform(-settings.screen_h, -self.rect.height)
+        self.vx = rng.uniform(-1, 1) * settings.asteroid_speed[0]
+        self.vy = rng.uniform(*settings.asteroid_speed)
+        self.hits = self.size + 1
+        self.rect.x = self.x
+        self.rect.y = self.y
+
+    def update(self):
+
+        """
+        Drifts the asteroid by its speed
+        """
+        self.x += self.vx
+        self.y += self.vy
+        self.rect.x = self.x
+        self.rect.y = self.y
+
+
+class AsteroidField:
+
+    """
+    Asteroids of different sizes drifting down the screen, hitting the ship,
+    bullets and aliens
+
+    Asteroids that leave the screen are sent back above it, so the field never
+    creates sprites during play. Collisions with everything else go through a
+    SweepAndPrune broadphase, and masks are only compared for the pairs whose
+    rects overlap
+
+    Methods
+    -------
+
+    __init__(self, game: 'AlienInvasion')
+        loads the asteroid sizes and fills the field if it is on in settings
+    update(self)
+        drifts every asteroid and recycles the ones off screen
+    check_collisions(self)
+        finds what the asteroids hit this frame
+    draw(self)
+        draws the asteroids
+    reset(self)
+        sends every asteroid back above the screen
+    rescale(self, old_size)
+        fits the asteroids to a new screen size
+    """
+
+    def __init__(self, game: 'AlienInvasion'):
+
+        """
+        Loads the asteroid sizes and fills the field if it is on in settings
+
+        Args
+        ----
+        game: AlienInvasion
+
+        Attributes
+        ----------
+        game
+            AlienInvasion
+        settings
+            references the settings file
+        rng
+            random number generator, seeded from settings
+        images
+            asteroid image for each size
+        masks
+            collision mask for each size
+        asteroids
+            sprite group of the asteroids
+        broadphase
+            SweepAndPrune kept between frames
+        """
+        self.game = game
+        self.settings = game.settings
+        self.rng = random.Random(self.settings.random_seed)
+
+        self.images, self.masks = self._load_images()
+
+        self.asteroids = pygame.sprite.Group()
+        self.broadphase = SweepAndPrune()
+        if self.settings.asteroids:
+            for _ in range(self.settings.asteroid_count):
+                self.asteroids.add(
+                    Asteroid(self, self.rng.randrange(len(self.images))))
+
+    def _load_images(self):
+
+        """
+        Scales the asteroid image to every size for the current resolution,
+        reusing the images of a window size seen before
+
+        Returns:
+            tuple: list of images and list of masks, one for each size
+        """
+        resolution = self.game.resolution
+
+        def build():
+            images = []
+            masks = []
+            for size in self.settings.asteroid_sizes:
+                scaled = resolution.image(self.settings.asteroid_file,
+                    (size, size)).convert_alpha()
+                images.append(scaled)
+                masks.append(cached_mask(resolution, (self.settings.asteroid_file,
+                    *scaled.get_size()), scaled))
+            return images, masks
+
+        return resolution.get(('asteroids', tuple(self.settings.asteroid_sizes)), build)
+
+    def update(self):
+
+        """
+        Drifts every asteroid and sends the ones that left the screen back
+        above it
+        """
+        screen_w = self.settings.screen_w
+        screen_h = self.settings.screen_h
+        asteroid: Asteroid
+        for asteroid in self.asteroids:
+            asteroid.update()
+            rect = asteroid.rect
+            if rect.top > screen_h or rect.right < 0 or rect.left > screen_w:
+                asteroid.respawn()
+
+    def check_collisions(self):
+
+        """
+        Finds what the asteroids hit this frame. Bullets that hit are removed
+        and wear the asteroid down, aliens that are hit are destroyed, and an
+        asteroid that hits a ship is sent back above the screen
+
+        Returns:
+            tuple: ships hit, aliens destroyed, and the centers of the
+            asteroids destroyed by bullets
+        """
+        ships_hit = []
+        aliens_hit = []
+        destroyed = []
+        if not self.asteroids:
+            return ships_hit, aliens_hit, destroyed
+
+        game = self.game
+        targets = [(ship, 'ship') for ship in game.ships]
+        for ship in game.ships:
+            targets.extend((bullet, 'bullet') for bullet in ship.arsenal.arsenal)
+        targets.extend((alien, 'alien') for alien in game.alien_fleet.fleet)
+        self.broadphase.update(self.asteroids, targets)
+
+        pixels = self.settings.pixel_collisions
+        respawned = []
+        for asteroid, target, kind in list(self.broadphase.pairs()):
+            if asteroid in respawned or kind != 'ship' and not target.alive():
+                continue
+            if pixels and not masks_overlap(asteroid.rect, asteroid.mask,
+                    target.rect, target.mask):
+                continue
+            if kind == 'ship':
+                if target not in ships_hit:
+                    ships_hit.append(target)
+                respawned.append(asteroid)
+            elif kind == 'alien':
+                aliens_hit.append(target)
+                target.kill()
+            else:
+                target.kill()
+                asteroid.hits -= 1
+                if asteroid.hits <= 0:
+                    destroyed.append(asteroid.rect.center)
+                    respawned.append(asteroid)
+
+        for asteroid in respawned:
+            asteroid.respawn()
+        return ships_hit, aliens_hit, destroyed
+
+    def draw(self):
+
+        """
+        Draws the asteroids on the screen
+        """
+        self.asteroids.draw(self.game.screen)
+
+    def reset(self):
+
+        """
+        Sends every asteroid back above the screen
+        """
+        for asteroid in self.asteroids:
+            asteroid.respawn()
+
+    def rescale(self, old_size):
+
+        """
+        Fits the asteroids to a new screen size, keeping their place relative
+        to the screen
+
+        Args
+        ----
+        old_size
+            (width, height) of the screen before the change
+        """
+        x_ratio = self.settings.screen_w / old_size[0]
+        y_ratio = self.settings.screen_h / old_size[1]
+        self.images, self.masks = self._load_images()
+        asteroid: Asteroid
+        for asteroid in self.asteroids:
+            asteroid.image = self.images[asteroid.size]
+            asteroid.mask = self.masks[asteroid.size]
+            asteroid.x *= x_ratio
+            asteroid.y *= y_ratio
+            asteroid.rect.size = asteroid.image.get_size()
+            asteroid.rect.x = asteroid.x
+            asteroid.rect.y = asteroid.y
@@ -0,0 +1,283 @@
+import argparse
+import json
+import math
+import platform
+import sys
+from pathlib import Path
+from time import perf_counter
+
+from headless import AutoPlayer, create_headless_game
+
+
+SCENARIOS = {
+    'default': {},
+    'large_fleet': {'screen_w': 2400, 'screen_h': 1600},
+    }
+
+STAGES = ('create_fleet', 'update_fleet', 'check_collisions', '_update_screen', 'frame')
+
+
+class StageTimer:
+
+    """
+    Times the stages of a headless game frame by frame
+
+    The game's stage methods are wrapped on the instances, so every call made by
+    the normal frame code is timed without changing it. Each stage keeps one
+    sample per frame (in milliseconds), which gives the comparison a whole
+    distribution to test instead of a single mean
+
+    Methods
+    -------
+
+    __init__(self, frames, warmup, fleet_builds, **overrides)
+        sets up the run
+    run(self)
+        plays the game and collects the samples
+    """
+
+    def __init__(self, frames=600, warmup=60, fleet_builds=30, **overrides):
+
+        """
+        Sets up the run
+
+        Args
+        ----
+        frames (int)
+            frames timed after the warmup
+        warmup (int)
+            frames played before timing starts, to fill caches
+        fleet_builds (int)
+            full fleets built to time create_fleet
+        overrides
+            settings for the scenario
+
+        Attributes
+        ----------
+        samples
+            stage name -> list of times in milliseconds
+        """
+        self.frames = frames
+        self.warmup = warmup
+        self.fleet_builds = fleet_builds
+        self.overrides = overrides
+        self.samples = {stage: [] for stage in STAGES}
+        self._frame_times = {}
+
+    def _wrap(self, owner, name, stage):
+
+        """
+        Replaces a method on an instance with one that adds its run time to the
+        current frame's time for the stage
+        """
+        method = getattr(owner, name)
+        times = self._frame_times
+
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                times[stage] = times.get(stage, 0.0) + perf_counter() - start
+
+        setattr(owner, name, timed)
+
+    def run(self):
+
+        """
+        Times full fleet builds, then plays the warmup and the timed frames
+
+        Returns:
+            dict: stage name -> list of times in milliseconds
+        """
+        game = create_headless_game(random_seed=0, **self.overrides)
+        fleet = game.alien_fleet
+        for _ in range(self.fleet_builds):
+            fleet.next_fleet = None
+            start = perf_counter()
+            fleet.create_fleet()
+            self.samples['create_fleet'].append((perf_counter() - start) * 1000)
+        game.restart_game()
+
+        player = AutoPlayer(game)
+        for _ in range(self.warmup):
+            player.play_frame()
+
+        self._wrap(fleet, 'update_fleet', 'update_fleet')
+        self._wrap(game, '_check_collisions', 'check_collisions')
+        self._wrap(game, '_update_screen', '_update_screen')
+        for _ in range(self.frames):
+            self._frame_times.clear()
+            start = perf_counter()
+            player.play_frame()
+            self.samples['frame'].append((perf_counter() - start) * 1000)
+            for stage in ('update_fleet', 'check_collisions', '_update_screen'):
+                self.samples[stage].append(self._frame_times.get(stage, 0.0) * 1000)
+        return self.samples
+
+
+def mann_whitney(baseline, current):
+
+    """
+    One-sided Mann-Whitney U test that current tends to be slower than the
+    baseline, using the normal approximation with a tie correction
+
+    Args
+    ----
+    baseline
+        list of times
+    current
+        list of times
+
+    Returns:
+        float: p-value, small when current is slower
+    """
+    n1, n2 = len(current), len(baseline)
+    if not n1 or not n2:
+        return 1.0
+    values = sorted([(value, 0) for value in current]
+        + [(value, 1) for value in baseline])
+
+    rank_sum = 0.0
+    ties = 0.0
+    i = 0
+    while i < len(values):
+        j = i
+        while j + 1 < len(values) and values[j + 1][0] == values[i][0]:
+            j += 1
+        rank = (i + j) / 2 + 1
+        rank_sum += rank * sum(1 for k in range(i, j + 1) if values[k][1] == 0)
+        size = j - i + 1
+        ties += size ** 3 - size
+        i = j + 1
+
+    n = n1 + n2
+    u = rank_sum - n1 * (n1 + 1) / 2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - mean - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def _median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    if len(ordered) % 2:
+        return ordered[middle]
+    return (ordered[middle - 1] + ordered[middle]) / 2
+
+
+def compare(baseline, results, threshold, alpha):
+
+    """
+    Compares every stage of every scenario against the baseline. A stage
+    regresses when its median grew by more than the threshold and the
+    Mann-Whitney test says the slowdown is not noise
+
+    Args
+    ----
+    baseline (dict)
+        saved results
+    results (dict)
+        results of this run
+    threshold (float)
+        allowed growth of the median, as a fraction
+    alpha (float)
+        significance level of the test
+
+    Returns:
+        list: (scenario, stage, baseline ms, current ms, change, p-value,
+        regressed) for each stage found in both
+    """
+    rows = []
+    for scenario, stages in results['scenarios'].items():
+        saved = baseline['scenarios'].get(scenario, {})
+        for stage, samples in stages.items():
+            if stage not in saved:
+                continue
+            before = _median(saved[stage])
+            after = _median(samples)
+            change = after / before - 1 if before else 0.0
+            p_value = mann_whitney(saved[stage], samples)
+            regressed = change > threshold and p_value < alpha
+            rows.append((scenario, stage, before, after, change, p_value, regressed))
+    return rows
+
+
+def print_results(results):
+
+    """
+    Prints the median and p95 of every stage
+    """
+    for scenario, stages in results['scenarios'].items():
+        print(f'{scenario}:')
+        for stage, samples in stages.items():
+            ordered = sorted(samples)
+            p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            print(f'  {stage:18} median {_median(samples):8.3f} ms   p95 {p95:8.3f} ms')
+
+
+def print_comparison(rows):
+
+    """
+    Prints the baseline and current medians side by side
+    """
+    print(f'{"":2}{"scenario":14}{"stage":18}{"baseline":>11}{"current":>11}'
+        f'{"change":>9}{"p":>9}')
+    for scenario, stage, before, after, change, p_value, regressed in rows:
+        mark = '!!' if regressed else ''
+        print(f'{mark:2}{scenario:14}{stage:18}{before:9.3f}ms{after:9.3f}ms'
+            f'{change:+8.1%}{p_value:9.4f}')
+
+
+def main(argv=None):
+
+    """
+    Command line entry point
+
+    Returns:
+        int: 1 if a baseline was given and a stage regressed, else 0
+    """
+    parser = argparse.ArgumentParser(
+        description='Time the stages of a headless game and check them against a baseline.')
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--warmup', type=int, default=60)
+    parser.add_argument('--fleet-builds', type=int, default=30)
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS),
+        help='scenario to run, may be repeated (default: all)')
+    parser.add_argument('--save-baseline', type=Path,
+        help='write the samples to this file as the new baseline')
+    parser.add_argument('--baseline', type=Path,
+        help='fail if a stage is slower than in this baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+        help='median growth a stage may have before it can fail')
+    parser.add_argument('--alpha', type=float, default=0.01,
+        help='significance level of the Mann-Whitney test')
+    args = parser.parse_args(argv)
+
+    results = {'python': platform.python_version(), 'scenarios': {}}
+    for scenario in args.scenario or SCENARIOS:
+        timer = StageTimer(args.frames, args.warmup, args.fleet_builds,
+            **SCENARIOS[scenario])
+        results['scenarios'][scenario] = timer.run()
+    print_results(results)
+
+    if args.save_baseline:
+        args.save_baseline.write_text(json.dumps(results))
+    if args.baseline:
+        rows = compare(json.loads(args.baseline.read_text()), results,
+            args.threshold, args.alpha)
+        print()
+        print_comparison(rows)
+        regressions = [row for row in rows if row[-1]]
+        for scenario, stage, before, after, change, p_value, _ in regressions:
+            print(f'REGRESSION {scenario} {stage}: {before:.3f} ms -> {after:.3f} ms '
+                f'({change:+.1%}, p={p_value:.4f})')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,100 @@
+class SweepAndPrune:
+
+    """
+    Sort-and-sweep broadphase along the x axis between hazards and targets
+
+    Every sprite is kept in a list sorted by rect.left. The order is kept
+    between frames, and since sprites only move a few pixels per frame, the
+    insertion sort that restores it does little more than one pass. The sweep
+    then only compares a sprite with the sprites of the other side whose x
+    ranges are still open, so the cost grows with the number of sprites and
+    overlaps instead of with every pair
+
+    Methods
+    -------
+
+    __init__(self)
+        creates the empty sorted list
+    update(self, hazards, targets)
+        adds and drops sprites and restores the x order
+    pairs(self)
+        yields the hazard and target pairs whose rects overlap
+    """
+
+    HAZARD = None
+
+    def __init__(self):
+
+        """
+        Creates the empty sorted list
+
+        Attributes
+        ----------
+        entries
+            [sprite, kind] for every sprite, sorted by rect.left; kind is
+            HAZARD for hazards
+        """
+        self.entries = []
+
+    def update(self, hazards, targets):
+
+        """
+        Brings the sorted list up to date with this frame's sprites. Sprites
+        that are gone are dropped, new ones are added at the end, and an
+        insertion sort moves everything back into x order
+
+        Args
+        ----
+        hazards
+            sprites checked against the targets
+        targets
+            (sprite, kind) pairs; kind is handed back by pairs()
+        """
+        members = dict(targets)
+        for hazard in hazards:
+            members[hazard] = self.HAZARD
+
+        entries = [entry for entry in self.entries if entry[0] in members]
+        for entry in entries:
+            entry[1] = members.pop(entry[0])
+        entries.extend([sprite, kind] for sprite, kind in members.items())
+
+        for i in range(1, len(entries)):
+            entry = entries[i]
+            left = entry[0].rect.left
+            j = i - 1
+            while j >= 0 and entries[j][0].rect.left > left:
+                entries[j + 1] = entries[j]
+                j -= 1
+            entries[j + 1] = entry
+        self.entries = entries
+
+    def pairs(self):
+
+        """
+        Sweeps the sorted list from left to right, keeping the hazards and
+        targets whose x ranges are still open
+
+        Yields:
+            tuple: hazard, target and the target's kind for every pair whose
+            rects overlap
+        """
+        open_hazards = []
+        open_targets = []
+        for sprite, kind in self.entries:
+            rect = sprite.rect
+            left = rect.left
+            if kind is self.HAZARD:
+                open_targets = [entry for entry in open_targets
+                    if entry[0].rect.right > left]
+                for target, target_kind in open_targets:
+                    if rect.colliderect(target.rect):
+                        yield sprite, target, target_kind
+                open_hazards.append(sprite)
+            else:
+                open_hazards = [hazard for hazard in open_hazards
+                    if hazard.rect.right > left]
+                for hazard in open_hazards:
+                    if rect.colliderect(hazard.rect):
+                        yield hazard, sprite, kind
+                open_targets.append((sprite, kind))
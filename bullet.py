@@ -1,9 +1,10 @@
-import pygame
+from collision_masks import cached_mask
 from pygame.sprite import Sprite
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
    from alien_invasion import AlienInvasion
+   from ship import Ship
 
 class Bullet(Sprite):
 
@@ -22,17 +23,24 @@ class Bullet(Sprite):
 
     """
    
-    def __init__(self, game: 'AlienInvasion'):
+    def __init__(self, game: 'AlienInvasion', ship: 'Ship' = None):
 
         """
         Initializes bullet, image, and rect
 
+        Args
+        ----
+        game: AlienInvasion
+        ship: ship the bullet is fired from, the player's ship if None
+
         Attributes
         ----------
 
         image
-            bullet file from settings
-            scales it based on width and height from settings
+            bullet file from settings, scaled for the current resolution and
+            shared by every bullet
+        mask
+            collision mask shared by bullets of the same size
         rect
             creates rect for the bullet
             positions bullet at midtop of the ship
@@ -41,14 +49,15 @@ class Bullet(Sprite):
         self.screen = game.screen
         self.settings = game.settings
 
-        self.image = pygame.image.load(self.settings.bullet_file_pb)
-        self.image = pygame.transform.scale(self.image, 
-            (self.settings.bullet_w, self.settings.bullet_h)
-            )
+        self.image = game.resolution.image(self.settings.bullet_file_pb,
+            (self.settings.bullet_w, self.settings.bullet_h))
 
+        self.mask = cached_mask(game.resolution,
+            (self.settings.bullet_file_pb, *self.image.get_size()), self.image)
         
         self.rect = self.image.get_rect()
-        self.rect.midtop = game.ship.rect.midtop
+        ship = ship or game.ship
+        self.rect.midtop = ship.rect.midtop
         self.y = float(self.rect.y)
 
     def update(self):
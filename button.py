@@ -17,6 +17,8 @@ class Button:
         Initializes button attributes
     _prep_msg(self.msg)
         renders and centers message image
+    rescale(self)
+        centers the button on a new screen size
     draw(self)
         draws the button on the screen
     check_clicked(self, mouse_pos)
@@ -79,6 +81,15 @@ class Button:
         self.msg_image_rect = self.msg_image.get_rect()
         self.msg_image_rect.center = self.rect.center
 
+    def rescale(self):
+
+        """
+        Centers the button and its message on a new screen size
+        """
+        self.boundaries = self.screen.get_rect()
+        self.rect.center = self.boundaries.center
+        self.msg_image_rect.center = self.rect.center
+
     def draw(self):
 
         """
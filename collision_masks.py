@@ -0,0 +1,88 @@
+import pygame
+
+
+def cached_mask(resolution, key, surface):
+
+    """
+    Returns the collision mask for an image, building it from the surface the
+    first time the key is seen at the current resolution. Every sprite drawn
+    from the same file at the same size shares one mask. Masks are kept in
+    the resolution cache with the scaled images, so they are dropped with the
+    images of window sizes that are no longer kept
+
+    Args
+    ----
+    resolution
+        ResolutionCache of the game
+    key (tuple)
+        identifies the image, for example (file, width, height)
+    surface
+        the image the mask is built from if it is not cached yet
+
+    Returns:
+        pygame.mask.Mask
+    """
+    return resolution.get(('mask', *key), lambda: pygame.mask.from_surface(surface))
+
+
+def masks_overlap(rect_a, mask_a, rect_b, mask_b):
+
+    """
+    Checks two positioned masks for a shared solid pixel
+
+    Returns:
+        bool: True if the masks overlap
+    """
+    return mask_a.overlap(mask_b, (rect_b.x - rect_a.x, rect_b.y - rect_a.y)) is not None
+
+
+def collide_pixels(sprite, group):
+
+    """
+    Finds the sprites in a group that touch a sprite on solid pixels. The rect
+    test runs first in C through spritecollide, and masks are only compared for
+    the sprites whose rects overlap
+
+    Args
+    ----
+    sprite
+        sprite with rect and mask
+    group
+        group of sprites with rect and mask
+
+    Returns:
+        list: sprites in the group that overlap the sprite's solid pixels
+    """
+    return [
+        other for other in pygame.sprite.spritecollide(sprite, group, False)
+        if masks_overlap(sprite.rect, sprite.mask, other.rect, other.mask)
+        ]
+
+
+def groupcollide_pixels(group_a, group_b, dokill_a, dokill_b):
+
+    """
+    Pixel-accurate version of pygame.sprite.groupcollide. Rect collisions are
+    found first and masks are only compared for those pairs
+
+    Returns:
+        dict: each sprite of group_a that was hit, with the list of group_b
+        sprites that hit it
+    """
+    collisions = {}
+    candidates = pygame.sprite.groupcollide(group_a, group_b, False, False)
+    for sprite_a, sprites_b in candidates.items():
+        hits = [
+            sprite_b for sprite_b in sprites_b
+            if masks_overlap(sprite_a.rect, sprite_a.mask, sprite_b.rect, sprite_b.mask)
+            ]
+        if hits:
+            collisions[sprite_a] = hits
+
+    for sprite_a, hits in collisions.items():
+        if dokill_a:
+            sprite_a.kill()
+        if dokill_b:
+            for sprite_b in hits:
+                sprite_b.kill()
+    return collisions
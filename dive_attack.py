@@ -0,0 +1,247 @@
+import math
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+   from alien import Alien
+   from alien_fleet import AlienFleet
+
+
+def _bezier(points, t):
+
+    """
+    Returns:
+        tuple: (x, y) of a cubic Bezier curve at t
+    """
+    (x0, y0), (x1, y1), (x2, y2), (x3, y3) = points
+    u = 1 - t
+    a, b, c, d = u * u * u, 3 * u * u * t, 3 * u * t * t, t * t * t
+    return (a * x0 + b * x1 + c * x2 + d * x3, a * y0 + b * y1 + c * y2 + d * y3)
+
+
+def sample_path(points, speed, samples=512):
+
+    """
+    Samples a cubic Bezier curve into one position per tick, spaced speed
+    pixels apart along the curve so a diver moves at an even speed
+
+    Args
+    ----
+    points
+        four (x, y) control points, the first one at (0, 0)
+    speed (float)
+        pixels moved each tick
+    samples (int)
+        points the curve is measured with
+
+    Returns:
+        list: (x, y) offsets from the start of the path, one per tick
+    """
+    dense = [_bezier(points, i / samples) for i in range(samples + 1)]
+    table = [dense[0]]
+    travelled = 0.0
+    next_at = speed
+    for (x0, y0), (x1, y1) in zip(dense, dense[1:]):
+        length = math.hypot(x1 - x0, y1 - y0)
+        while length and travelled + length >= next_at:
+            share = (next_at - travelled) / length
+            table.append((x0 + (x1 - x0) * share, y0 + (y1 - y0) * share))
+            next_at += speed
+        travelled += length
+    return table
+
+
+class DiveAttack:
+
+    """
+    Sends aliens out of the fleet's formation to dive at the ship, and brings
+    them back to their slot
+
+    Dive paths are cubic Bezier curves sampled once into tables of positions,
+    one per tick, for a spread of aims across the screen and both swing
+    directions. They are sampled when the fleet is built and when the screen
+    changes size, never while a dive starts, and kept in the game's
+    resolution cache so a recent window size reuses them. A diver picks the
+    table aimed closest to the nearest ship and then only advances an index.
+    Once it has left the bottom of the screen it comes back from the top,
+    eased toward its formation slot with a second table, and takes its place
+    again. The slot is the alien's place in the fleet layout plus how far the
+    formation has moved since the fleet was built
+
+    Methods
+    -------
+
+    __init__(self, fleet: 'AlienFleet')
+        samples the dive and return tables and sets up the list of divers
+    update(self)
+        starts new dives and moves every diver one tick along its path
+    start_dive(self, alien)
+        sends an alien out of formation
+    rescale(self, x_ratio, y_ratio)
+        samples the dive tables for a new screen size and moves the divers'
+        paths to it
+    clear(self)
+        forgets every diver, for a new fleet
+    """
+
+    def __init__(self, fleet: 'AlienFleet'):
+
+        """
+        Samples the dive and return tables and sets up the list of divers
+
+        Args
+        ----
+        fleet: AlienFleet
+
+        Attributes
+        ----------
+        fleet
+            AlienFleet the divers belong to
+        settings
+            references the settings file
+        enabled (bool)
+            True when dive_attacks is on in settings and not in netplay, whose
+            state snapshots do not carry dives
+        divers
+            [alien, table, step, start x, start y, returning, side] for every
+            alien out of formation
+        tables
+            (aim, side, table) dive paths for the current screen size, empty
+            when dives are off
+        returns
+            (progress, swing) per tick of the way back to the slot
+        """
+        self.fleet = fleet
+        self.settings = fleet.settings
+        self.enabled = self.settings.dive_attacks and not self.settings.netplay_role
+        self.divers = []
+
+        ticks = self.settings.dive_return_ticks
+        self.returns = []
+        for tick in range(1, ticks + 1):
+            t = tick / ticks
+            self.returns.append((t * t * (3 - 2 * t), math.sin(math.pi * t)))
+        self.tables = self._dive_tables() if self.enabled else []
+
+    def _dive_tables(self):
+
+        """
+        Samples the dive paths for the current screen size, or reuses the
+        tables of a size seen before
+
+        Returns:
+            list: (aim, side, table) where aim is the horizontal distance to
+            the ship the path ends at and side is the way it swings out first
+        """
+        settings = self.settings
+        resolution = self.fleet.game.resolution
+        alien_w, alien_h = self.fleet.atlas.frames[0].get_size()
+        speed = settings.dive_speed * resolution.scale
+        screen_w, screen_h = settings.screen_w, settings.screen_h
+
+        def build():
+            tables = []
+            for index in range(settings.dive_aims + 1):
+                aim = screen_w * (2 * index / settings.dive_aims - 1)
+                for side in (-1, 1):
+                    points = ((0, 0), (side * alien_w * 3, -alien_h * 2),
+                        (aim - side * alien_w * 2, screen_h * 0.6),
+                        (aim, screen_h + alien_h * 2))
+                    tables.append((aim, side, sample_path(points, speed)))
+            return tables
+
+        return resolution.get(('dive_paths', settings.dive_aims, speed,
+            alien_w, alien_h), build)
+
+    def start_dive(self, alien: 'Alien'):
+
+        """
+        Sends an alien out of formation on the path aimed closest to the
+        nearest ship, swinging out to a random side first
+        """
+        ships = self.fleet.game.ships
+        target = min(ships, key=lambda ship: abs(ship.rect.centerx - alien.rect.centerx))
+        distance = target.rect.centerx - alien.rect.centerx
+        side = self.fleet.rng.choice((-1, 1))
+        _, _, table = min(
+            (path for path in self.tables if path[1] == side),
+            key=lambda path: abs(path[0] - distance))
+        alien.diving = True
+        self.divers.append([alien, table, 0, alien.x, alien.y, False, side])
+
+    def update(self):
+
+        """
+        Starts a dive now and then, at dive_rate dives per second while fewer
+        than max_divers are out, then moves every diver one tick along its
+        path and puts the ones back whose return has finished
+        """
+        if not self.enabled:
+            return
+        fleet = self.fleet
+        settings = self.settings
+        if (len(self.divers) < settings.max_divers and fleet.columns
+                and fleet.rng.random() < settings.dive_rate / settings.FPS):
+            front = [column[-1] for column in fleet.columns.values()
+                if not column[-1].diving]
+            if front:
+                self.start_dive(fleet.rng.choice(front))
+
+        if not self.divers:
+            return
+        screen_h = settings.screen_h
+        returns = self.returns
+        still_out = []
+        for diver in self.divers:
+            alien, table, step, start_x, start_y, returning, side = diver
+            if not alien.alive():
+                continue
+            step += 1
+            if not returning:
+                if step < len(table) and alien.rect.top <= screen_h:
+                    dx, dy = table[step]
+                    alien.x = start_x + dx
+                    alien.y = start_y + dy
+                else:
+                    diver[3] = alien.x
+                    diver[4] = -alien.rect.height * 2
+                    diver[5] = True
+                    step = 0
+            else:
+                home_x, home_y = alien.home
+                slot_x = home_x + fleet.formation_x
+                slot_y = home_y + fleet.formation_y
+                if step >= len(returns):
+                    alien.x, alien.y = slot_x, slot_y
+                    alien.diving = False
+                else:
+                    progress, swing = returns[step - 1]
+                    alien.x = (start_x + (slot_x - start_x) * progress
+                        + side * swing * alien.rect.width * 2)
+                    alien.y = start_y + (slot_y - start_y) * progress
+            alien.rect.x = alien.x
+            alien.rect.y = alien.y
+            if alien.diving:
+                diver[2] = step
+                still_out.append(diver)
+        self.divers = still_out
+
+    def rescale(self, x_ratio, y_ratio):
+
+        """
+        Samples the dive tables for a new screen size, or takes them from the
+        resolution cache, and moves the start of every diver's path to it.
+        Divers finish the path they are on, new dives use the new tables.
+        The fleet's atlas must already be scaled to the new size
+        """
+        if self.enabled:
+            self.tables = self._dive_tables()
+        for diver in self.divers:
+            diver[3] *= x_ratio
+            diver[4] *= y_ratio
+
+    def clear(self):
+
+        """
+        Forgets every diver, for a new fleet
+        """
+        self.divers.clear()
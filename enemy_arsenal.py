@@ -0,0 +1,200 @@
+from collision_masks import cached_mask, masks_overlap
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+   from alien_invasion import AlienInvasion
+
+
+class EnemyArsenal:
+
+    """
+    Fixed-size pool of alien bullets
+
+    Every bullet rect is created once. Firing reuses a free slot and does
+    nothing when the pool is full, so no objects are made during play
+
+    Methods
+    -------
+
+    __init__(self, game: 'AlienInvasion')
+        creates the bullet image and the pool
+    _load_image(self)
+        sets the bullet image and mask for the current resolution
+    rescale(self, old_size)
+        fits the bullets to a new screen size
+    fire_bullet(self, midbottom)
+        fires a bullet from a free slot
+    update_arsenal(self)
+        moves active bullets down and frees the ones that left the screen
+    check_hit(self, target_rect, target_mask=None)
+        checks the active bullets against a rect, and the masks if given
+    draw(self)
+        draws active bullets on the screen
+    empty(self)
+        frees every slot
+    """
+
+    def __init__(self, game: 'AlienInvasion'):
+
+        """
+        Creates the bullet image and the pool
+
+        Args
+        ----
+        game: AlienInvasion
+
+        Attributes
+        ----------
+        screen
+            screen of game
+        settings
+            references the settings file
+        image
+            laser image flipped to point down
+        mask
+            collision mask of the flipped image
+        rects
+            one rect per slot in the pool
+        ys
+            float y position of each slot
+        active
+            indexes of the slots currently in flight
+        free
+            indexes of the slots ready to be fired
+        """
+        self.screen = game.screen
+        self.settings = game.settings
+
+        self.resolution = game.resolution
+        self._load_image()
+
+        size = self.settings.alien_bullet_pool
+        self.rects = [self.image.get_rect() for _ in range(size)]
+        self.ys = [0.0] * size
+        self.active = []
+        self.free = list(range(size))
+
+    def _load_image(self):
+
+        """
+        Sets the flipped bullet image and its mask for the current resolution
+        """
+        self.image = self.resolution.image(self.settings.bullet_file_pb,
+            (self.settings.bullet_w, self.settings.bullet_h), flip=True)
+        self.mask = cached_mask(self.resolution, (self.settings.bullet_file_pb,
+            *self.image.get_size(), 'flipped'), self.image)
+
+    def rescale(self, old_size):
+
+        """
+        Fits every slot to a new screen size, moving bullets in flight to the
+        same place relative to the screen
+
+        Args
+        ----
+        old_size
+            (width, height) of the screen before the change
+        """
+        x_ratio = self.settings.screen_w / old_size[0]
+        y_ratio = self.settings.screen_h / old_size[1]
+        self._load_image()
+        size = self.image.get_size()
+        for slot, rect in enumerate(self.rects):
+            center = (rect.centerx * x_ratio, rect.centery * y_ratio)
+            rect.size = size
+            rect.center = center
+            self.ys[slot] = float(rect.y)
+
+    def fire_bullet(self, midbottom):
+
+        """
+        Fires a bullet from a free slot
+
+        Args
+        ----
+        midbottom
+            (x, y) position the bullet starts from
+
+        Returns:
+            True: if a slot was free
+            False: if every bullet is already in flight
+        """
+        if not self.free:
+            return False
+        slot = self.free.pop()
+        rect = self.rects[slot]
+        rect.midtop = midbottom
+        self.ys[slot] = float(rect.y)
+        self.active.append(slot)
+        return True
+
+    def update_arsenal(self):
+
+        """
+        Moves active bullets down and frees the ones below the screen. The
+        active list is walked backwards so bullets can be removed in place
+        without copying it
+        """
+        speed = self.settings.alien_bullet_speed
+        bottom = self.settings.screen_h
+        active = self.active
+        ys = self.ys
+        for index in range(len(active) - 1, -1, -1):
+            slot = active[index]
+            ys[slot] += speed
+            rect = self.rects[slot]
+            rect.y = ys[slot]
+            if rect.top >= bottom:
+                del active[index]
+                self.free.append(slot)
+
+    def check_hit(self, target_rect, target_mask=None):
+
+        """
+        Checks the active bullets against a rect. Bullets that have not reached
+        the top of the rect are skipped before the rect test, and the masks are
+        only compared after the rects overlap. A bullet that hits is freed
+
+        Args
+        ----
+        target_rect
+            rect to check, usually the ship
+        target_mask
+            mask of the target, None to only test rects
+
+        Returns:
+            bool: True if a bullet hit the rect
+        """
+        top = target_rect.top
+        for slot in self.active:
+            rect = self.rects[slot]
+            if rect.bottom >= top and rect.colliderect(target_rect) and (
+                    target_mask is None
+                    or masks_overlap(target_rect, target_mask, rect, self.mask)):
+                self._release(slot)
+                return True
+        return False
+
+    def _release(self, slot):
+
+        """
+        Returns a slot to the free list
+        """
+        self.active.remove(slot)
+        self.free.append(slot)
+
+    def draw(self):
+
+        """
+        Draws active bullets on the screen
+        """
+        for slot in self.active:
+            self.screen.blit(self.image, self.rects[slot])
+
+    def empty(self):
+
+        """
+        Frees every slot
+        """
+        self.free.extend(self.active)
+        self.active.clear()
@@ -0,0 +1,90 @@
+from collections import defaultdict
+
+
+class EventBus:
+
+    """
+    Queues game events during the simulation and hands each subscriber the
+    whole batch once per frame
+
+    Events used by the game
+    -----------------------
+
+    aliens_killed
+        aliens (list): aliens destroyed by one ship's bullets
+    ship_lost
+        ships_left (int): ships remaining after the loss
+    level_cleared
+        no data
+    game_over
+        score (int), level (int)
+    asteroid_impacts
+        centers (list): where aliens were crushed or asteroids destroyed
+
+    Methods
+    -------
+
+    __init__(self)
+        creates empty queues and handler lists
+    subscribe(self, kind, handler)
+        calls handler with the frame's batch of an event kind
+    publish(self, kind, **data)
+        queues an event
+    dispatch(self)
+        hands every queued batch to its subscribers
+    """
+
+    def __init__(self):
+
+        """
+        Creates empty queues and handler lists
+
+        Attributes
+        ----------
+        queues
+            events waiting for dispatch, by kind
+        handlers
+            subscribers, by kind, in the order they subscribed
+        """
+        self.queues = defaultdict(list)
+        self.handlers = defaultdict(list)
+
+    def subscribe(self, kind, handler):
+
+        """
+        Calls handler with the frame's list of events of a kind
+
+        Args
+        ----
+        kind (str)
+            event name
+        handler
+            function that takes a list of event dicts
+        """
+        self.handlers[kind].append(handler)
+
+    def publish(self, kind, **data):
+
+        """
+        Queues an event until the next dispatch
+
+        Args
+        ----
+        kind (str)
+            event name
+        data
+            values stored with the event
+        """
+        self.queues[kind].append(data)
+
+    def dispatch(self):
+
+        """
+        Hands every queued batch to its subscribers, in publishing order of the
+        kinds. Events published by a handler are dispatched in the same call
+        """
+        while self.queues:
+            kind = next(iter(self.queues))
+            batch = self.queues.pop(kind)
+            for handler in self.handlers[kind]:
+                handler(batch)
@@ -0,0 +1,152 @@
+from collections import deque
+from time import perf_counter, sleep
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+   from alien_invasion import AlienInvasion
+
+
+class FramePacer:
+
+    """
+    Waits for the start of the next frame and measures how evenly frames are
+    spaced
+
+    Modes (frame_pacing in settings)
+    --------------------------------
+
+    tick
+        clock.tick(FPS), sleeps with millisecond resolution
+    busy
+        clock.tick_busy_loop(FPS), spins for the whole wait
+    hybrid
+        sleeps until pacing_spin_ms before the deadline, then spins on
+        perf_counter() for the rest
+    vsync
+        no wait here, the display flip waits for the vertical blank. If the
+        window could not get vsync, tick is used instead so frames stay capped
+    uncapped
+        no wait at all
+
+    Jitter is how far each interval between frame starts is from 1 / FPS
+
+    Methods
+    -------
+
+    __init__(self, game: 'AlienInvasion')
+        sets up the pacing mode and the jitter samples
+    tick(self)
+        waits for the next frame and records its interval
+    report(self)
+        interval and jitter distribution, as text
+    """
+
+    MODES = ('tick', 'busy', 'hybrid', 'vsync', 'uncapped')
+
+    def __init__(self, game: 'AlienInvasion'):
+
+        """
+        Sets up the pacing mode and the jitter samples
+
+        Args
+        ----
+        game: AlienInvasion
+
+        Attributes
+        ----------
+        clock
+            the game's pygame Clock, still ticked so get_fps() keeps working
+        mode (str)
+            pacing mode from settings, tick when vsync was asked for but the
+            window did not get it
+        interval (float)
+            target seconds between frame starts
+        deadline (float)
+            perf_counter() time the next frame should start, used by hybrid
+        frame_start (float)
+            perf_counter() time the current frame started
+        work_ms (float)
+            time the last frame took before waiting
+        jitter
+            recent interval minus the target, in ms
+        """
+        self.settings = game.settings
+        self.clock = game.clock
+        self.mode = self.settings.frame_pacing
+        if self.mode not in self.MODES:
+            print(f'Unknown frame_pacing {self.mode!r}, using tick')
+            self.mode = 'tick'
+        elif self.mode == 'vsync' and not game.vsync:
+            self.mode = 'tick'
+        self.interval = 1 / self.settings.FPS
+        self.frame_start = perf_counter()
+        self.deadline = self.frame_start + self.interval
+        self.work_ms = 0.0
+        self.jitter = deque(maxlen=self.settings.pacing_samples)
+
+    def _wait_hybrid(self):
+
+        """
+        Sleeps until pacing_spin_ms before the deadline, then spins until it.
+        A frame that ran more than one interval late starts a new schedule
+        instead of rushing the frames after it
+        """
+        spin = self.settings.pacing_spin_ms / 1000
+        remaining = self.deadline - perf_counter()
+        if remaining > spin:
+            sleep(remaining - spin)
+        while perf_counter() < self.deadline:
+            pass
+        now = perf_counter()
+        if now - self.deadline > self.interval:
+            self.deadline = now
+        self.deadline += self.interval
+
+    def tick(self):
+
+        """
+        Waits for the next frame in the pacing mode and records the interval
+        since the last frame started
+
+        Returns:
+            int: milliseconds since the last tick, like clock.tick()
+        """
+        self.work_ms = (perf_counter() - self.frame_start) * 1000
+        if self.mode == 'tick':
+            self.clock.tick(self.settings.FPS)
+        elif self.mode == 'busy':
+            self.clock.tick_busy_loop(self.settings.FPS)
+        else:
+            if self.mode == 'hybrid':
+                self._wait_hybrid()
+            self.clock.tick()
+
+        now = perf_counter()
+        frame_ms = (now - self.frame_start) * 1000
+        self.frame_start = now
+        self.jitter.append(frame_ms - self.interval * 1000)
+        return round(frame_ms)
+
+    def report(self):
+
+        """
+        Returns:
+            str: mean interval and the jitter distribution of the recent
+            frames
+        """
+        if not self.jitter:
+            return f'Frame pacing ({self.mode}): no frames'
+        target_ms = self.interval * 1000
+        deviations = sorted(abs(value) for value in self.jitter)
+        count = len(deviations)
+
+        def percentile(share):
+            return deviations[min(count - 1, int(count * share))]
+
+        mean_ms = target_ms + sum(self.jitter) / count
+        late = sum(1 for value in self.jitter if value > target_ms / 2)
+        return (f'Frame pacing ({self.mode}), {count} frames, '
+            f'target {target_ms:.2f} ms, mean {mean_ms:.2f} ms\n'
+            f'  jitter p50 {percentile(0.5):.3f} ms, p95 {percentile(0.95):.3f} ms, '
+            f'p99 {percentile(0.99):.3f} ms, max {deviations[-1]:.3f} ms\n'
+            f'  frames over 1.5x the target: {late}')
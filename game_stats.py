@@ -1,6 +1,8 @@
 
-import json
+import sqlite3
+from time import monotonic
 
+from leaderboard import Leaderboard
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -38,7 +40,7 @@ class GameStats():
         -------
 
         init_saved_scores
-            retrieves hi score fron json file if it exists, creates file if not
+            opens the leaderboard and reads the hi score from it
 
         """
         self.game = game
@@ -46,41 +48,50 @@ class GameStats():
         self.max_score = 0
         self.init_saved_scores()
         self.reset_stats()
+        game.events.subscribe('aliens_killed', self._on_aliens_killed)
+        game.events.subscribe('level_cleared', self._on_level_cleared)
+        game.events.subscribe('game_over', self._on_game_over)
 
     def init_saved_scores(self):
 
         """
-        Retrieves hi score fron json file if it exists, creates file if not and
-        sets hi score to 0
+        Opens the leaderboard and reads the hi score from it. The hi score of
+        an old scores file is brought over the first time. If the database
+        cannot be opened, runs are kept in memory for this session
+
+        Exceptions
+        ----------
+
+        sqlite3.Error
+            if the leaderboard file cannot be opened
         """
-        self.path = self.settings.scores_file
-        if self.path.exists() and self.path.stat.__sizeof__() > 20:
-            contents = self.path.read_text()
-            scores = json.loads(contents)
-            self.hi_score = scores.get('hi_score', 0)
-        else:
-            self.hi_score = 0
-            self.save_scores()
+        try:
+            self.leaderboard = Leaderboard(self.settings.leaderboard_file)
+            self.leaderboard.import_scores_file(self.settings.scores_file)
+        except sqlite3.Error as e:
+            print(f'Leaderboard unavailable: {e}')
+            self.leaderboard = Leaderboard(':memory:')
+        self.hi_score = self.leaderboard.hi_score()
 
     def save_scores(self):
 
         """
-        Saves hi score in json file
+        Records the run in progress if the game is quit during play, so a new
+        hi score is not lost, then writes the runs still queued and closes the
+        leaderboard
 
         Exceptions
         ----------
 
-        FileNotFoundError
-            if json file does not exist
+        sqlite3.Error
+            if the runs cannot be written
         """
-        scores = {
-            'hi_score' : self.hi_score
-        }
-        contents = json.dumps(scores, indent=4)
+        if self.game.game_active:
+            self._record_run(self.score, self.level)
         try:
-            self.path.write_text(contents)
-        except FileNotFoundError as e:
-            print(f'File Not Found: {e}')
+            self.leaderboard.close()
+        except sqlite3.Error as e:
+            print(f'Could not save the leaderboard: {e}')
 
 
     def reset_stats(self):
@@ -97,18 +108,74 @@ class GameStats():
             sets score back to 0
         level(int)
             sets level back to 1
+        run_start (float)
+            monotonic time the run started
         """
         self.ships_left = self.settings.starting_ship_count
         self.score = 0
         self.level = 1
+        self.run_start = monotonic()
+
+
+    def _on_aliens_killed(self, events):
+
+        """
+        Scores every alien killed this frame in one update
+
+        Args
+        ----
+        events
+            aliens_killed events from the event bus
+        """
+        self.update(sum(len(event['aliens']) for event in events))
+
+    def _on_level_cleared(self, events):
+
+        """
+        Increments the level once for each level cleared this frame
+        """
+        for _ in events:
+            self.update_level()
+
+    def _on_game_over(self, events):
+
+        """
+        Records the finished run on the leaderboard and writes it right away,
+        so finished runs survive a crash. Runs that cannot be written stay
+        queued for the next write
+
+        Exceptions
+        ----------
 
+        sqlite3.Error
+            if the runs cannot be written
+        """
+        for event in events:
+            self._record_run(event['score'], event['level'])
+        try:
+            self.leaderboard.flush()
+        except sqlite3.Error as e:
+            print(f'Could not save the leaderboard: {e}')
 
-    def update(self, collisions):
+    def _record_run(self, score, level):
+
+        """
+        Queues a run of the player on the leaderboard, timed from run_start
+        """
+        self.leaderboard.record_run(self.settings.player_name, score, level,
+            monotonic() - self.run_start)
+
+    def update(self, kills):
 
         """
         Updates score, max_score, and hi score
+
+        Args
+        ----
+        kills (int)
+            number of aliens destroyed
         """
-        self._update_score(collisions)
+        self._update_score(kills)
 
         self._update_max_score()
 
@@ -132,14 +199,13 @@ class GameStats():
         if self.score > self.hi_score:
             self.hi_score = self.score
 
-    def _update_score(self, collisions):
+    def _update_score(self, kills):
         
 
         """
-        Updates score when an alien is destroyed, adds points to the score
+        Updates score when aliens are destroyed, adds points for each alien
         """
-        for alien in collisions.values():
-            self.score += self.settings.alien_points
+        self.score += self.settings.alien_points * kills
 
     def update_level(self):
 
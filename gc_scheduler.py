@@ -0,0 +1,177 @@
+import gc
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+   from alien_invasion import AlienInvasion
+
+
+class GCScheduler:
+
+    """
+    Opt-in garbage collection policy for the game loop
+
+    Automatic collection is turned off while the game runs. Young collections
+    are run by the loop after a frame is drawn, when the frame has enough time
+    left before its deadline, using the same generation thresholds the
+    automatic collector would. Full collections wait for moments when a pause
+    is not seen: level transitions, a lost ship, game over and the title
+    screen. Every collection is timed through gc.callbacks
+
+    Methods
+    -------
+
+    __init__(self, game: 'AlienInvasion')
+        sets up the policy from settings
+    start(self)
+        turns automatic collection off and starts timing collections
+    after_frame(self, deadline)
+        collects if a collection is due and the frame has time for it
+    stop(self)
+        turns automatic collection back on
+    report(self)
+        collection pauses by generation, as text
+    """
+
+    def __init__(self, game: 'AlienInvasion'):
+
+        """
+        Sets up the policy from settings
+
+        Args
+        ----
+        game: AlienInvasion
+
+        Attributes
+        ----------
+        game
+            AlienInvasion
+        settings
+            references the settings file
+        enabled (bool)
+            True when gc_scheduling is on in settings
+        running (bool)
+            True between start() and stop()
+        full_pending (bool)
+            a full collection is waiting for the end of the frame
+        title_collected (bool)
+            the full collection for the current title screen has run
+        pauses
+            generation -> [collections, total ms, longest ms]
+        overdue (int)
+            collections run without enough time left in the frame
+        """
+        self.game = game
+        self.settings = game.settings
+        self.enabled = self.settings.gc_scheduling
+        self.running = False
+        self.full_pending = False
+        self.title_collected = False
+        self.pauses = {generation: [0, 0.0, 0.0] for generation in range(3)}
+        self.overdue = 0
+        self._started_at = None
+
+        if self.enabled:
+            for kind in ('level_cleared', 'ship_lost', 'game_over'):
+                game.events.subscribe(kind, self._on_transition)
+
+    def _on_transition(self, events):
+
+        """
+        Asks for a full collection at the end of the frame
+        """
+        self.full_pending = True
+
+    def _on_gc(self, phase, info):
+
+        """
+        gc.callbacks hook that times every collection
+        """
+        if phase == 'start':
+            self._started_at = perf_counter()
+        elif self._started_at is not None:
+            pause_ms = (perf_counter() - self._started_at) * 1000
+            self._started_at = None
+            stats = self.pauses[info['generation']]
+            stats[0] += 1
+            stats[1] += pause_ms
+            stats[2] = max(stats[2], pause_ms)
+
+    def start(self):
+
+        """
+        Collects and freezes everything made while loading, then turns
+        automatic collection off and starts timing collections
+        """
+        if not self.enabled or self.running:
+            return
+        gc.collect()
+        gc.freeze()
+        gc.disable()
+        gc.callbacks.append(self._on_gc)
+        self.running = True
+
+    def after_frame(self, deadline):
+
+        """
+        Runs the collection that is due, if any. Full collections run at
+        transitions and once per title screen. Young collections run when the
+        allocation count has passed the collector's threshold and the frame
+        has gc_min_slack_ms left before its deadline, or regardless of time
+        once the count is gc_overdue_factor times over the threshold
+
+        Args
+        ----
+        deadline (float)
+            perf_counter() time the next frame should start
+        """
+        if not self.running:
+            return
+        if not self.game.game_active:
+            if not self.title_collected:
+                self.title_collected = True
+                self.full_pending = True
+        else:
+            self.title_collected = False
+
+        if self.full_pending:
+            self.full_pending = False
+            gc.collect(2)
+            return
+
+        count0, count1, _ = gc.get_count()
+        threshold0, threshold1, _ = gc.get_threshold()
+        if count0 < threshold0:
+            return
+        slack_ms = (deadline - perf_counter()) * 1000
+        if slack_ms < self.settings.gc_min_slack_ms and self.game.game_active:
+            if count0 < threshold0 * self.settings.gc_overdue_factor:
+                return
+            self.overdue += 1
+        gc.collect(1 if count1 >= threshold1 else 0)
+
+    def stop(self):
+
+        """
+        Stops timing collections and turns automatic collection back on
+        """
+        if not self.running:
+            return
+        gc.callbacks.remove(self._on_gc)
+        gc.unfreeze()
+        gc.enable()
+        self.running = False
+
+    def report(self):
+
+        """
+        Returns:
+            str: collections, mean and longest pause for each generation
+        """
+        lines = ['GC pauses:']
+        for generation, (count, total_ms, longest_ms) in self.pauses.items():
+            mean_ms = total_ms / count if count else 0.0
+            lines.append(f'  gen {generation}: {count} collections, '
+                f'mean {mean_ms:.3f} ms, max {longest_ms:.3f} ms')
+        lines.append(f'  collections without frame slack: {self.overdue}')
+        return '\n'.join(lines)
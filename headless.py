@@ -0,0 +1,96 @@
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+from alien_invasion import AlienInvasion
+from settings import Settings
+
+
+def create_headless_game(**overrides):
+
+    """
+    Builds an AlienInvasion that runs without a window or sound card, for
+    profiling and test tools
+
+    Input polling, the quality governor and the pause after losing a ship are
+    turned off so runs are repeatable and fast, and finished runs go to an
+    in-memory leaderboard instead of the saved one
+
+    Args
+    ----
+    overrides
+        settings attributes to set before the game is built
+
+    Returns:
+        AlienInvasion: a game that is ready to play
+    """
+    settings = Settings()
+    settings.poll_movement = False
+    settings.adaptive_quality = False
+    settings.ship_lost_pause = 0
+    settings.leaderboard_file = ':memory:'
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+
+    game = AlienInvasion(settings)
+    game.restart_game()
+    return game
+
+
+class AutoPlayer:
+
+    """
+    Simple automated player: steers under the lowest alien of the nearest
+    column, fires whenever it can, and restarts after a game over
+
+    Methods
+    -------
+
+    __init__(self, game: 'AlienInvasion')
+        attaches the player to a game
+    play_frame(self)
+        sets the ship's controls and runs one frame
+    """
+
+    def __init__(self, game: 'AlienInvasion'):
+
+        """
+        Attaches the player to a game
+
+        Attributes
+        ----------
+        game
+            AlienInvasion
+        restarts (int)
+            game overs so far
+        """
+        self.game = game
+        self.restarts = 0
+
+    def _steer(self):
+
+        """
+        Moves the ship toward the nearest column that still has aliens, and
+        fires
+        """
+        ship = self.game.ship
+        columns = self.game.alien_fleet.columns
+        if columns:
+            target = min((column[-1].rect.centerx for column in columns.values()),
+                key=lambda x: abs(x - ship.rect.centerx))
+            ship.moving_left = target < ship.rect.centerx - 4
+            ship.moving_right = target > ship.rect.centerx + 4
+        ship.fire()
+
+    def play_frame(self):
+
+        """
+        Sets the ship's controls and runs one frame of the game, restarting the
+        game if it is over
+        """
+        if not self.game.game_active:
+            self.restarts += 1
+            self.game.restart_game()
+        self._steer()
+        self.game._run_frame()
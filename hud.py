@@ -13,8 +13,12 @@ class HUD:
         Initializes HUD attributes
     _setup_life_image(self)
         sets up image to show the player "lives"
+    rescale(self)
+        lays the HUD out again for a new screen size
     update_scores(self)
         updates score, max_score, and hi_score on screen
+    _render_scores(self)
+        renders score, max_score, and hi_score images
     _update_score(self)
         updates current score on screen
     _update_max_score(self)
@@ -50,6 +54,8 @@ class HUD:
             references font file and size for the HUD
         margin
             space from the edges of the screen
+        refresh_interval (int)
+            frames between score re-renders, raised by the quality governor
         
         """
         self.game = game
@@ -60,9 +66,14 @@ class HUD:
         self.font = pygame.font.Font(self.settings.font_file, 
                 self.settings.HUD_font_size)
         self.margin = 30
+        self.refresh_interval = 1
+        self.frames_since_refresh = 0
+        self.scores_dirty = False
         self.update_scores()
         self._setup_life_image()
         self.update_level()
+        game.events.subscribe('aliens_killed', self._on_aliens_killed)
+        game.events.subscribe('level_cleared', self._on_level_cleared)
 
     def _setup_life_image(self):
 
@@ -74,18 +85,55 @@ class HUD:
         life_image
             loads and scales ship file as an image
         """
-        self.life_image = pygame.image.load(self.settings.ship_file)
-        self.life_image = pygame.transform.scale(self.life_image, 
+        self.life_image = self.game.resolution.image(self.settings.ship_file,
             (self.settings.ship_w, self.settings.ship_h))
         
         self.life_rect = self.life_image.get_rect()
 
+    def rescale(self):
+
+        """
+        Lays the HUD out again for a new screen size, once per resize
+        """
+        self.boundaries = self.screen.get_rect()
+        self._setup_life_image()
+        self._render_scores()
+        self.update_level()
+
+    def _on_aliens_killed(self, events):
+
+        """
+        Re-renders the scores once for all the kills of a frame
+        """
+        self.update_scores()
+
+    def _on_level_cleared(self, events):
+
+        """
+        Re-renders the level once for the frame
+        """
+        self.update_level()
 
     def update_scores(self):
 
         """
         Updates score, max score, and hi score on HUD
+
+        If refresh_interval is above 1 the scores are only marked as changed
+        and get re-rendered by draw() once enough frames have passed
         """
+        if self.refresh_interval > 1:
+            self.scores_dirty = True
+            return
+        self._render_scores()
+
+    def _render_scores(self):
+
+        """
+        Renders score, max score, and hi score images
+        """
+        self.scores_dirty = False
+        self.frames_since_refresh = 0
         self._update_score()
         self._update_max_score()
         self._update_hi_score()
@@ -204,6 +252,10 @@ class HUD:
         """
         Draws hi score, max score, score, and level images on the screen
         """
+        self.frames_since_refresh += 1
+        if self.scores_dirty and self.frames_since_refresh >= self.refresh_interval:
+            self._render_scores()
+
         self.screen.blit(self.hi_score_image, self.hi_score_rect)
         self.screen.blit(self.max_score_image, self.max_score_rect)
         self.screen.blit(self.score_image, self.score_rect)
@@ -0,0 +1,217 @@
+from collections import Counter
+from time import perf_counter
+
+import pygame
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+   from alien_invasion import AlienInvasion
+
+
+class InputHandler:
+
+    """
+    Maps keys to game actions, filters the event queue down to the events the
+    game uses, and measures input latency
+
+    Latency is measured in milliseconds, from the time a KEYDOWN for a move or
+    fire action arrived to the first flip() that puts the result on the screen
+    (the ship drawn moved, or with a new bullet). pygame events carry no
+    timestamp, so the time the event queue was read stands in for it unless
+    the event has an SDL timestamp
+
+    Methods
+    -------
+
+    __init__(self, game: 'AlienInvasion')
+        builds the key map from settings and filters the event queue
+    action_for(self, key)
+        action bound to a key
+    pressed(self, action)
+        checks if any key bound to an action is held down
+    get_events(self)
+        takes the waiting events off the queue, noting the time
+    poll_movement(self, ship)
+        sets the ship's movement from the keys held down
+    key_pressed(self, action, event)
+        starts a latency measurement for an action
+    end_frame(self, shown)
+        finishes latency measurements the flipped frame shows
+    latency_report(self)
+        latency distribution as text
+    """
+
+    def __init__(self, game: 'AlienInvasion'):
+
+        """
+        Builds the key map from settings and filters the event queue
+
+        Args
+        ----
+        game: AlienInvasion
+
+        Attributes
+        ----------
+        game
+            AlienInvasion
+        settings
+            references the settings file
+        actions
+            dict of key to action name
+        frame (int)
+            frames ended so far
+        read_at (float)
+            perf_counter() time the event queue was last read
+        pending
+            latency measurements waiting for the ship to respond
+        latency
+            Counter of whole milliseconds to response over all measurements
+        """
+        self.game = game
+        self.settings = game.settings
+        self.actions = {
+            key: action
+            for action, keys in self.settings.key_bindings.items()
+            for key in keys
+            }
+        self.frame = 0
+        self.read_at = perf_counter()
+        self.pending = []
+        self.latency = Counter()
+
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(self.settings.allowed_events)
+
+    def action_for(self, key):
+
+        """
+        Returns:
+            str: action bound to the key, None if the key is not bound
+        """
+        return self.actions.get(key)
+
+    def pressed(self, action):
+
+        """
+        Checks if any key bound to an action is held down
+
+        Returns:
+            bool: True if one of the keys is down
+        """
+        keys = pygame.key.get_pressed()
+        return any(keys[key] for key in self.settings.key_bindings[action])
+
+    def get_events(self):
+
+        """
+        Takes the waiting events off the queue and notes when, as the arrival
+        time of events without a timestamp
+
+        Returns:
+            list: the events
+        """
+        self.read_at = perf_counter()
+        return pygame.event.get()
+
+    def poll_movement(self, ship):
+
+        """
+        Sets the ship's movement from the keys held down, so a KEYUP lost while
+        the window was out of focus cannot leave the ship moving
+
+        Args
+        ----
+        ship
+            ship to move
+        """
+        ship.moving_left = self.pressed('left')
+        ship.moving_right = self.pressed('right')
+
+    def _local_ship(self):
+
+        """
+        Returns:
+            Ship: the ship this player controls
+        """
+        if self.game.netplay:
+            return self.game.ships[self.game.netplay.local_index]
+        return self.game.ship
+
+    def key_pressed(self, action, event=None):
+
+        """
+        Starts a latency measurement for a move or fire action
+
+        Args
+        ----
+        action (str)
+            action of the key that was pressed
+        event
+            the KEYDOWN event, its SDL timestamp is used when it has one
+        """
+        if action not in ('left', 'right', 'fire'):
+            return
+        pressed_at = self.read_at
+        timestamp = getattr(event, 'timestamp', None)
+        if timestamp is not None:
+            pressed_at -= max(0, pygame.time.get_ticks() - timestamp) / 1000
+        ship = self._local_ship()
+        self.pending.append((action, self.frame, pressed_at, ship.rect.x,
+            len(ship.arsenal.arsenal)))
+
+    def end_frame(self, shown=None):
+
+        """
+        Called right after flip(). Finishes the latency measurements the
+        flipped frame shows, and drops ones older than input_latency_timeout
+        frames (for example a move into the edge of the screen)
+
+        Args
+        ----
+        shown
+            (x, bullets) of the local ship as it was drawn, the live ship
+            when None
+        """
+        if self.pending:
+            if shown is None:
+                ship = self._local_ship()
+                shown = (ship.rect.x, len(ship.arsenal.arsenal))
+            shown_x, shown_bullets = shown
+            now = perf_counter()
+            still_pending = []
+            for action, frame, pressed_at, x, bullets in self.pending:
+                if action == 'left':
+                    done = shown_x < x
+                elif action == 'right':
+                    done = shown_x > x
+                else:
+                    done = shown_bullets > bullets
+                if done:
+                    self.latency[int((now - pressed_at) * 1000)] += 1
+                elif self.frame - frame < self.settings.input_latency_timeout:
+                    still_pending.append((action, frame, pressed_at, x, bullets))
+            self.pending = still_pending
+        self.frame += 1
+
+    def latency_report(self):
+
+        """
+        Returns:
+            str: count, mean, median, p95 and max latency in milliseconds, and
+            the share of presses shown within each whole number of frames
+        """
+        total = sum(self.latency.values())
+        if not total:
+            return 'input latency: no samples'
+        samples = sorted(self.latency.elements())
+        mean = sum(samples) / total
+        p50 = samples[total // 2]
+        p95 = samples[min(total - 1, int(total * 0.95))]
+        frames = Counter()
+        for ms, count in self.latency.items():
+            frames[ms * self.settings.FPS // 1000] += count
+        shares = ', '.join(
+            f'<{frame + 1}: {count / total:.0%}'
+            for frame, count in sorted(frames.items()))
+        return (f'input latency (ms): n={total} mean={mean:.1f} p50={p50} '
+            f'p95={p95} max={samples[-1]} [frames {shares}]')
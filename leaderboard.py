@@ -0,0 +1,182 @@
+import json
+import sqlite3
+from time import time
+
+
+class Leaderboard:
+
+    """
+    Local leaderboard of every finished run, kept in SQLite
+
+    The database runs in WAL mode so reads at startup never wait on a write.
+    Indexes on score and on (player, score) let the hi score, the top runs and
+    a player's best be read without scanning the table, however many runs it
+    holds. Finished runs are queued and written in one transaction when the
+    leaderboard is flushed or closed
+
+    Table layout
+    ------------
+
+    runs(id, player, score, level, duration, finished_at)
+        one row per finished run; duration is in seconds, finished_at is a
+        Unix timestamp
+
+    Methods
+    -------
+
+    __init__(self, path)
+        opens the database and creates the table and indexes
+    import_scores_file(self, scores_file)
+        brings the hi score of the old JSON scores file over once
+    record_run(self, player, score, level, duration)
+        queues a finished run
+    flush(self)
+        writes the queued runs
+    hi_score(self)
+        highest score recorded
+    top(self, count)
+        best runs of all players
+    best(self, player)
+        best run of one player
+    close(self)
+        writes the queued runs and closes the database
+    """
+
+    def __init__(self, path):
+
+        """
+        Opens the database and creates the table and indexes
+
+        Args
+        ----
+        path (file)
+            database file, ':memory:' for a leaderboard that is not saved
+
+        Attributes
+        ----------
+        connection
+            sqlite3 connection
+        pending
+            finished runs waiting to be written, as row tuples
+        """
+        self.connection = sqlite3.connect(path)
+        self.pending = []
+        with self.connection:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS runs ('
+                'id INTEGER PRIMARY KEY, '
+                'player TEXT NOT NULL, '
+                'score INTEGER NOT NULL, '
+                'level INTEGER NOT NULL, '
+                'duration REAL NOT NULL, '
+                'finished_at REAL NOT NULL)')
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC)')
+            self.connection.execute(
+                'CREATE INDEX IF NOT EXISTS runs_by_player ON runs (player, score DESC)')
+
+    def import_scores_file(self, scores_file):
+
+        """
+        Brings the hi score of the old JSON scores file over as a run, if the
+        leaderboard is still empty
+
+        Args
+        ----
+        scores_file (file)
+            the old scores.json
+        """
+        if self.hi_score() or not scores_file.exists():
+            return
+        try:
+            hi_score = json.loads(scores_file.read_text()).get('hi_score', 0)
+        except ValueError as e:
+            print(f'Could not read {scores_file}: {e}')
+            return
+        if hi_score:
+            self.record_run('-', hi_score, 1, 0.0)
+            self.flush()
+
+    def record_run(self, player, score, level, duration):
+
+        """
+        Queues a finished run until the next flush()
+
+        Args
+        ----
+        player (str)
+            name of the player
+        score (int)
+            final score
+        level (int)
+            level reached
+        duration (float)
+            seconds the run lasted
+        """
+        self.pending.append((player, score, level, duration, time()))
+
+    def flush(self):
+
+        """
+        Writes the queued runs in one transaction
+        """
+        if not self.pending:
+            return
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO runs (player, score, level, duration, finished_at) '
+                'VALUES (?, ?, ?, ?, ?)', self.pending)
+        self.pending.clear()
+
+    def hi_score(self):
+
+        """
+        Returns:
+            int: highest score recorded, queued runs included, 0 if none
+        """
+        (saved,) = self.connection.execute('SELECT MAX(score) FROM runs').fetchone()
+        return max([saved or 0] + [run[1] for run in self.pending])
+
+    def top(self, count=10):
+
+        """
+        Best runs of all players, queued runs included
+
+        Args
+        ----
+        count (int)
+            number of runs to return
+
+        Returns:
+            list: (player, score, level, duration, finished_at) tuples, best
+            first
+        """
+        saved = self.connection.execute(
+            'SELECT player, score, level, duration, finished_at FROM runs '
+            'ORDER BY score DESC LIMIT ?', (count,)).fetchall()
+        return sorted(saved + self.pending, key=lambda run: -run[1])[:count]
+
+    def best(self, player):
+
+        """
+        Best run of one player, queued runs included
+
+        Returns:
+            tuple: (player, score, level, duration, finished_at), None if the
+            player has no runs
+        """
+        saved = self.connection.execute(
+            'SELECT player, score, level, duration, finished_at FROM runs '
+            'WHERE player = ? ORDER BY score DESC LIMIT 1', (player,)).fetchall()
+        runs = saved + [run for run in self.pending if run[0] == player]
+        return max(runs, key=lambda run: run[1], default=None)
+
+    def close(self):
+
+        """
+        Writes the queued runs and closes the database
+        """
+        self.flush()
+        self.connection.close()
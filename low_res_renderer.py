@@ -0,0 +1,173 @@
+import weakref
+import pygame
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+   from alien_invasion import AlienInvasion
+
+
+class LowResRenderer:
+
+    """
+    Draws the scene on an offscreen surface smaller than the screen and
+    stretches it to the screen once per frame
+
+    The game keeps moving in screen coordinates. Positions are scaled when the
+    sprites are blitted. Every sprite image is scaled down up front, when the
+    game starts and after the window is resized, and kept for as long as the
+    sprite's image exists, so frames of play only blit. The HUD and the play
+    button are drawn on the screen after the stretch so the text stays sharp
+
+    Methods
+    -------
+
+    __init__(self, game: 'AlienInvasion')
+        creates the offscreen surface
+    rescale(self)
+        makes the offscreen surface again for a new screen size
+    prescale(self)
+        scales every sprite image the game draws for the offscreen surface
+    draw(self, snapshot)
+        draws the background, sprites and particles and stretches them to the
+        screen
+    """
+
+    def __init__(self, game: 'AlienInvasion'):
+
+        """
+        Creates the offscreen surface
+
+        Args
+        ----
+        game: AlienInvasion
+
+        Attributes
+        ----------
+        game
+            AlienInvasion
+        settings
+            references the settings file
+        screen
+            screen of game, where the offscreen surface is stretched to
+        scale (float)
+            size of the offscreen surface as a fraction of the screen
+        surface
+            offscreen surface the scene is drawn on
+        use_scale2x (bool)
+            True when the surface is exactly half the screen and scale2x is
+            asked for in settings
+        scaled
+            scaled copy of each sprite image, dropped with the image
+        """
+        self.game = game
+        self.settings = game.settings
+        self.screen = game.screen
+        self.scale = self.settings.render_scale
+        self.scaled = weakref.WeakKeyDictionary()
+        self.rescale()
+
+    def rescale(self):
+
+        """
+        Makes the offscreen surface for the current screen size. Scaled sprite
+        images are kept, the images of a new resolution are new objects and
+        get their own copies from prescale()
+        """
+        width, height = self.screen.get_size()
+        size = (int(width * self.scale), int(height * self.scale))
+        self.surface = pygame.Surface(size).convert()
+        self.use_scale2x = (self.settings.render_upscale == 'scale2x'
+            and (size[0] * 2, size[1] * 2) == (width, height))
+
+    def prescale(self):
+
+        """
+        Scales the images of the ships, both kinds of bullets, the alien
+        animation frames and the asteroids, once the sprites exist and again
+        after they are rescaled for a new window size. The ship bullets' image
+        is taken from the resolution cache the way Bullet takes it, since no
+        bullet may exist yet
+        """
+        game = self.game
+        settings = self.settings
+        images = [ship.image for ship in game.ships]
+        images.append(game.resolution.image(settings.bullet_file_pb,
+            (settings.bullet_w, settings.bullet_h)))
+        images.append(game.alien_fleet.arsenal.image)
+        images.extend(game.alien_fleet.atlas.frames)
+        if settings.asteroids:
+            images.extend(game.asteroids.images)
+        for image in images:
+            self._scaled_image(image)
+
+    def _scaled_image(self, image):
+
+        """
+        Returns the scaled copy of a sprite image. Images prescale() did not
+        know about are scaled the first time they are drawn
+
+        Returns:
+            pygame.Surface: image scaled to the offscreen surface, converted
+            for fast blits
+        """
+        scaled = self.scaled.get(image)
+        if scaled is None:
+            width, height = image.get_size()
+            scaled = pygame.transform.scale(image, (max(1, round(width * self.scale)),
+                max(1, round(height * self.scale)))).convert_alpha()
+            self.scaled[image] = scaled
+        return scaled
+
+    def _live_sprites(self):
+
+        """
+        Yields (image, (x, y)) for every sprite in the game, in drawing order
+        """
+        game = self.game
+        for ship in game.ships:
+            for bullet in ship.arsenal.arsenal:
+                yield bullet.image, bullet.rect.topleft
+            yield ship.image, ship.rect.topleft
+        enemy = game.alien_fleet.arsenal
+        for slot in enemy.active:
+            yield enemy.image, enemy.rects[slot].topleft
+        for alien in game.alien_fleet.fleet:
+            yield alien.image, alien.rect.topleft
+        for asteroid in game.asteroids.asteroids:
+            yield asteroid.image, asteroid.rect.topleft
+
+    def draw(self, snapshot=None):
+
+        """
+        Draws the background, sprites and particles on the offscreen surface
+        and stretches it over the screen
+
+        Args
+        ----
+        snapshot (RenderSnapshot)
+            positions published by the simulation thread; when None the
+            sprites are drawn from the live game objects
+        """
+        game = self.game
+        if game.quality_governor.solid_background:
+            self.surface.fill(self.settings.bg_fill_color)
+        else:
+            game.starfield.draw()
+
+        if snapshot is None:
+            sprites = self._live_sprites()
+        else:
+            sprites = (*snapshot.bullets, *snapshot.ship, *snapshot.enemy_bullets,
+                *snapshot.aliens, *snapshot.asteroids)
+        scale = self.scale
+        self.surface.blits([
+            (self._scaled_image(image), (x * scale, y * scale))
+            for image, (x, y) in sprites
+            ], doreturn=False)
+        game.particles.draw(self.surface, scale,
+            None if snapshot is None else snapshot.particles)
+
+        if self.use_scale2x:
+            pygame.transform.scale2x(self.surface, self.screen)
+        else:
+            pygame.transform.scale(self.surface, self.screen.get_size(), self.screen)
@@ -0,0 +1,379 @@
+import argparse
+import functools
+import inspect
+import json
+import sys
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+from headless import AutoPlayer, create_headless_game
+
+
+REPO_DIR = Path(__file__).resolve().parent
+TOOL_MODULES = ('memory_profile', 'headless', 'benchmark', 'soak')
+
+
+def _game_functions():
+
+    """
+    Finds every function and method defined in the game's own modules
+
+    Returns:
+        list: (owner, attribute name, function, label) where owner is the
+        module or class the function is an attribute of
+    """
+    found = []
+    for module in list(sys.modules.values()):
+        path = getattr(module, '__file__', None)
+        if not path or Path(path).resolve().parent != REPO_DIR:
+            continue
+        path = Path(path)
+        if path.stem in TOOL_MODULES or path.stem.startswith('test_'):
+            continue
+        file_name = path.name
+        for name, value in list(vars(module).items()):
+            if getattr(value, '__module__', None) != module.__name__:
+                continue
+            if inspect.isfunction(value):
+                found.append((module, name, value, f'{file_name}:{name}'))
+            elif inspect.isclass(value):
+                for attribute, member in list(vars(value).items()):
+                    if inspect.isfunction(member):
+                        found.append((value, attribute, member,
+                            f'{file_name}:{member.__qualname__}'))
+    return found
+
+
+def _empty():
+    pass
+
+
+class AllocationProfiler:
+
+    """
+    Runs the game headless under tracemalloc and measures the memory
+    allocated per frame by call site
+
+    Every function of the game's own modules is wrapped for the run. On
+    entry the wrapper resets tracemalloc's peak, and on return it reads how
+    far the traced memory rose above where the call started, so memory that
+    is allocated and freed again inside the call (the groupcollide result
+    dict, a font.render surface's Python object) counts as well as memory
+    that is kept. A call's figure includes what its callees allocated, like
+    cumulative time in a profiler, so the frame's stages come out on top
+    and leaf sites such as Bullet.__init__ show their own allocations
+
+    Methods
+    -------
+
+    __init__(self, frames, warmup, seed)
+        sets up the run
+    run(self)
+        plays the game and measures every profiled frame
+    report(self)
+        results as a dict that can be saved as a budget
+    """
+
+    def __init__(self, frames=600, warmup=120, seed=0):
+
+        """
+        Sets up the run
+
+        Args
+        ----
+        frames (int)
+            frames to profile after the warmup
+        warmup (int)
+            frames played before profiling starts, to fill caches
+        seed (int)
+            random_seed of the game, so runs compared against a budget play
+            the same frames
+
+        Attributes
+        ----------
+        sites
+            label -> [bytes allocated, calls] over the profiled frames
+        starts, highs
+            traced memory at the start of each call on the stack, and the
+            highest it has been since, with the frame itself at depth 0
+        depth (int)
+            calls of game functions on the stack
+        overhead (int)
+            bytes a call to an empty function measures, taken off every call
+        tracing (bool)
+            True while the profiled frames run
+        """
+        self.frames = frames
+        self.warmup = warmup
+        self.seed = seed
+        self.sites = defaultdict(lambda: [0, 0])
+        self.starts = [0]
+        self.highs = [0]
+        self.depth = 0
+        self.overhead = 0
+        self.tracing = False
+        self.peaks = []
+        self.game = None
+
+    def _enter(self):
+
+        """
+        Starts measuring a call: folds the peak so far into the caller's high
+        and resets the peak
+        """
+        current, peak = tracemalloc.get_traced_memory()
+        depth = self.depth
+        if peak > self.highs[depth]:
+            self.highs[depth] = peak
+        tracemalloc.reset_peak()
+        depth += 1
+        if depth == len(self.starts):
+            self.starts.append(0)
+            self.highs.append(0)
+        self.depth = depth
+        self.starts[depth] = self.highs[depth] = current
+
+    def _leave(self):
+
+        """
+        Finishes measuring a call and passes its high on to the caller
+
+        Returns:
+            int: bytes the call had allocated at its peak
+        """
+        peak = tracemalloc.get_traced_memory()[1]
+        depth = self.depth
+        high = max(peak, self.highs[depth])
+        self.depth = depth - 1
+        if high > self.highs[depth - 1]:
+            self.highs[depth - 1] = high
+        tracemalloc.reset_peak()
+        return max(high - self.starts[depth] - self.overhead, 0)
+
+    def _measured(self, label, function):
+
+        """
+        Returns:
+            function: function wrapped to add what each call allocates to the
+            site label while the profiled frames run
+        """
+        profiler = self
+
+        @functools.wraps(function)
+        def measured(*args, **kwargs):
+            profiler._enter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                size = profiler._leave()
+                if profiler.tracing:
+                    site = profiler.sites[label]
+                    site[0] += size
+                    site[1] += 1
+
+        return measured
+
+    def _calibrate(self):
+
+        """
+        Measures what the wrapper itself allocates in a call, over a hundred
+        calls to an empty function
+        """
+        measured = self._measured('', _empty)
+        self.tracing = True
+        for _ in range(100):
+            measured()
+        self.tracing = False
+        size, calls = self.sites.pop('')
+        self.overhead = size // calls
+
+    def run(self):
+
+        """
+        Wraps the game's functions, plays the warmup, then the profiled
+        frames, and puts the functions back
+        """
+        wrapped = _game_functions()
+        for owner, name, function, label in wrapped:
+            setattr(owner, name, self._measured(label, function))
+        try:
+            self.game = create_headless_game(random_seed=self.seed)
+            player = AutoPlayer(self.game)
+            for _ in range(self.warmup):
+                player.play_frame()
+
+            tracemalloc.start()
+            self._calibrate()
+            self.tracing = True
+            for _ in range(self.frames):
+                tracemalloc.reset_peak()
+                start, _ = tracemalloc.get_traced_memory()
+                self.highs[0] = start
+                player.play_frame()
+                peak = max(tracemalloc.get_traced_memory()[1], self.highs[0])
+                self.peaks.append(peak - start)
+        finally:
+            self.tracing = False
+            tracemalloc.stop()
+            for owner, name, function, _ in wrapped:
+                setattr(owner, name, function)
+
+    def report(self):
+
+        """
+        Returns:
+            dict: bytes allocated and calls per frame by call site, frame
+            peaks, and surface memory held by the game
+        """
+        frames = max(self.frames, 1)
+        sites = {
+            site: {'bytes': size / frames, 'calls': calls / frames}
+            for site, (size, calls) in sorted(
+                self.sites.items(), key=lambda item: -item[1][0])
+            if size
+            }
+        peaks = sorted(self.peaks) or [0]
+        return {
+            'frames': self.frames,
+            'seed': self.seed,
+            'sites': sites,
+            'peak_bytes_per_frame': {
+                'mean': sum(peaks) / len(peaks),
+                'p95': peaks[min(len(peaks) - 1, int(len(peaks) * 0.95))],
+                },
+            'surface_bytes': surface_memory(self.game),
+            }
+
+
+def _surface_bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+
+def surface_memory(game):
+
+    """
+    Adds up the pixel memory of the surfaces the game holds
+
+    Args
+    ----
+    game: AlienInvasion
+
+    Returns:
+        dict: bytes by owner, and the total
+    """
+    fleet = game.alien_fleet
+    memory = {
+        'ships': sum(_surface_bytes(ship.image) for ship in game.ships),
+        'bullets': sum(_surface_bytes(bullet.image)
+            for ship in game.ships for bullet in ship.arsenal.arsenal),
+        'aliens': _surface_bytes(fleet.atlas.surface),
+        'alien_bullets': _surface_bytes(fleet.arsenal.image),
+        'background': sum(_surface_bytes(layer.tiled) for layer in game.starfield.layers),
+        'hud': sum(_surface_bytes(image) for image in (game.HUD.score_image,
+            game.HUD.max_score_image, game.HUD.hi_score_image,
+            game.HUD.level_image, game.HUD.life_image)),
+        }
+    memory['total'] = sum(memory.values())
+    return memory
+
+
+def check_budget(report, budget, tolerance, slack):
+
+    """
+    Compares a report against a saved budget
+
+    Args
+    ----
+    report (dict)
+        from AllocationProfiler.report()
+    budget (dict)
+        an earlier report
+    tolerance (float)
+        allowed growth as a fraction of the budget
+    slack (int)
+        bytes per frame a site may grow by regardless of tolerance
+
+    Returns:
+        list: one line for each site or total that went over budget
+    """
+    failures = []
+    if budget.get('seed', report['seed']) != report['seed']:
+        failures.append(f'seed {report["seed"]} is not the budget seed {budget["seed"]}')
+    allowed = budget['sites']
+    for site, values in report['sites'].items():
+        limit = allowed.get(site, {'bytes': 0})['bytes'] * (1 + tolerance) + slack
+        if values['bytes'] > limit:
+            failures.append(f'{site}: {values["bytes"]:.0f} B/frame '
+                f'(budget {limit:.0f})')
+
+    limit = budget['peak_bytes_per_frame']['p95'] * (1 + tolerance) + slack
+    if report['peak_bytes_per_frame']['p95'] > limit:
+        failures.append(f'frame peak p95: '
+            f'{report["peak_bytes_per_frame"]["p95"]:.0f} B (budget {limit:.0f})')
+
+    limit = budget['surface_bytes']['total'] * (1 + tolerance) + slack
+    if report['surface_bytes']['total'] > limit:
+        failures.append(f'surface memory: {report["surface_bytes"]["total"]} B '
+            f'(budget {limit:.0f})')
+    return failures
+
+
+def print_report(report, top):
+
+    """
+    Prints the busiest call sites, frame peaks and surface memory
+    """
+    print(f'{report["frames"]} frames')
+    print('allocated per frame by call site, callees included:')
+    for site, values in list(report['sites'].items())[:top]:
+        print(f'  {values["bytes"]:10.1f} B {values["calls"]:8.2f} calls  {site}')
+    peak = report['peak_bytes_per_frame']
+    print(f'frame peak: mean {peak["mean"]:.0f} B, p95 {peak["p95"]:.0f} B')
+    print('surface memory:')
+    for owner, size in report['surface_bytes'].items():
+        print(f'  {owner:14} {size / 1024:10.1f} KiB')
+
+
+def main(argv=None):
+
+    """
+    Command line entry point
+
+    Returns:
+        int: 1 if a budget was given and exceeded, else 0
+    """
+    parser = argparse.ArgumentParser(
+        description='Profile allocations per frame in a headless game.')
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--warmup', type=int, default=120)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--seed', type=int, default=0,
+        help='random seed of the game, keep it the same as the budget')
+    parser.add_argument('--save-budget', type=Path,
+        help='write the results to this file as the new budget')
+    parser.add_argument('--budget', type=Path,
+        help='fail if the results go over this budget')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--slack', type=int, default=512,
+        help='bytes per frame any site may grow by without failing')
+    args = parser.parse_args(argv)
+
+    profiler = AllocationProfiler(args.frames, args.warmup, args.seed)
+    profiler.run()
+    report = profiler.report()
+    print_report(report, args.top)
+
+    if args.save_budget:
+        args.save_budget.write_text(json.dumps(report, indent=4))
+    if args.budget:
+        failures = check_budget(report, json.loads(args.budget.read_text()),
+            args.tolerance, args.slack)
+        for failure in failures:
+            print(f'OVER BUDGET {failure}')
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+import pygame
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+   from alien_invasion import AlienInvasion
+
+
+class MusicController:
+
+    """
+    Plays the title track on the menu and the battle track during play, fading
+    from one to the other
+
+    pygame.mixer.music streams a track from its file as it plays, so starting
+    one only opens the file. Switching tracks fades the current one out and
+    starts the next, with a fade in, from update() once the stream is idle,
+    so no call here waits for the fade or for decoding
+
+    Methods
+    -------
+
+    __init__(self, game: 'AlienInvasion')
+        starts the title track
+    play_title(self)
+        fades over to the title track
+    play_battle(self)
+        fades over to the battle track
+    update(self)
+        starts the next track once the fade out has finished
+    pause(self)
+        silences the music
+    unpause(self)
+        brings the music back
+    """
+
+    def __init__(self, game: 'AlienInvasion'):
+
+        """
+        Starts the title track
+
+        Args
+        ----
+        game: AlienInvasion
+
+        Attributes
+        ----------
+        settings
+            references the settings file
+        current
+            (file, volume) of the track playing or fading in, None during a
+            fade out
+        pending
+            (file, volume) of the track to start once the fade out finishes
+        paused_volume (float)
+            volume to go back to on unpause(), None when not paused
+        """
+        self.settings = game.settings
+        self.current = None
+        self.pending = None
+        self.paused_volume = None
+        game.events.subscribe('game_over', self._on_game_over)
+        self.play_title()
+
+    def _on_game_over(self, events):
+
+        """
+        Goes back to the title track when the game ends
+        """
+        self.play_title()
+
+    def play_title(self):
+
+        """
+        Fades over to the title track
+        """
+        self._switch_to((self.settings.title_screen_music,
+            self.settings.title_music_volume))
+
+    def play_battle(self):
+
+        """
+        Fades over to the battle track
+        """
+        self._switch_to((self.settings.battle_music,
+            self.settings.battle_music_volume))
+
+    def _switch_to(self, track):
+
+        """
+        Starts a track now if nothing is playing, or fades the current track
+        out and leaves the new one for update()
+
+        Args
+        ----
+        track
+            (file, volume) to play
+        """
+        if track == (self.pending or self.current):
+            return
+        if not pygame.mixer.music.get_busy():
+            self._start(track)
+            return
+        if self.current is not None:
+            pygame.mixer.music.fadeout(self.settings.music_fade_ms)
+            self.current = None
+        self.pending = track
+
+    def _start(self, track):
+
+        """
+        Opens a track and plays it on a loop, fading it in
+        """
+        music_file, volume = track
+        self.current = track
+        self.pending = None
+        if self.paused_volume is not None:
+            self.paused_volume, volume = volume, 0
+        try:
+            pygame.mixer.music.load(music_file)
+            pygame.mixer.music.set_volume(volume)
+            pygame.mixer.music.play(-1, fade_ms=self.settings.music_fade_ms)
+        except pygame.error as e:
+            print(f'Could not play {music_file}: {e}')
+
+    def update(self):
+
+        """
+        Starts the pending track once the fade out has finished
+        """
+        if self.pending and not pygame.mixer.music.get_busy():
+            self._start(self.pending)
+
+    def pause(self):
+
+        """
+        Silences the music. The stream keeps playing at no volume because
+        pygame.mixer.music.pause() waits for the audio thread while holding
+        the GIL, and deadlocks when a sound finishes at the same moment
+        """
+        if self.paused_volume is None:
+            self.paused_volume = pygame.mixer.music.get_volume()
+            pygame.mixer.music.set_volume(0)
+
+    def unpause(self):
+
+        """
+        Brings the music back to its volume before pause()
+        """
+        if self.paused_volume is not None:
+            pygame.mixer.music.set_volume(self.paused_volume)
+            self.paused_volume = None
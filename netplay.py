@@ -0,0 +1,505 @@
+import random
+import socket
+import struct
+import zlib
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+from arsenal import ShipArsenal
+from ship import Ship
+
+if TYPE_CHECKING:
+   from alien_invasion import AlienInvasion
+
+
+class DesyncError(Exception):
+
+    """
+    Raised when the two players' simulations no longer match
+    """
+
+
+class StateCodec:
+
+    """
+    Packs the shared game state into a fixed binary layout, and builds
+    delta-compressed snapshots from it
+
+    Layout (little-endian)
+    ----------------------
+
+    header
+        score, level, ships_left, fleet_direction, ship_speed, bullet_speed,
+        fleet_speed, alien_fire_rate
+    ships
+        count, then for each ship: x, bullet count, (x, y) per bullet
+    aliens
+        count, then x, y, column and row per alien
+    columns
+        count, then the fleet's columns in the order shooters are picked from
+    alien bullets
+        count, then slot, x, y per bullet in flight
+    free slots
+        count, then the slots of the alien bullet pool that are not in flight,
+        in the order they will be fired
+
+    Methods
+    -------
+
+    encode(game)
+        packs the game state into bytes
+    apply(game, data)
+        rebuilds the game state from bytes made by encode()
+    ship_count(data)
+        number of ships in bytes made by encode()
+    checksum(game)
+        crc32 of the packed state
+    delta_encode(base, data)
+        XORs data against base and compresses the result
+    delta_decode(base, delta)
+        reverses delta_encode()
+    """
+
+    HEADER = struct.Struct('<IIiidddd')
+    COUNT_B = struct.Struct('<B')
+    COUNT_H = struct.Struct('<H')
+    SHIP = struct.Struct('<dB')
+    BULLET = struct.Struct('<id')
+    ALIEN = struct.Struct('<ddHH')
+    ENEMY_BULLET = struct.Struct('<Bid')
+    LENGTH = struct.Struct('!I')
+
+    @classmethod
+    def encode(cls, game: 'AlienInvasion'):
+
+        """
+        Packs the game state shared by both players into bytes
+
+        Returns:
+            bytes: the packed state
+        """
+        settings = game.settings
+        stats = game.game_stats
+        fleet = game.alien_fleet
+        parts = [cls.HEADER.pack(stats.score, stats.level, stats.ships_left,
+            fleet.fleet_direction, settings.ship_speed, settings.bullet_speed,
+            settings.fleet_speed, settings.alien_fire_rate)]
+
+        parts.append(cls.COUNT_B.pack(len(game.ships)))
+        for ship in game.ships:
+            parts.append(cls.SHIP.pack(ship.x, len(ship.arsenal.arsenal)))
+            for bullet in ship.arsenal.arsenal:
+                parts.append(cls.BULLET.pack(bullet.rect.x, bullet.y))
+
+        parts.append(cls.COUNT_H.pack(len(fleet.fleet)))
+        for alien in fleet.fleet:
+            parts.append(cls.ALIEN.pack(alien.x, alien.y, alien.col, alien.row))
+        parts.append(cls.COUNT_H.pack(len(fleet.columns)))
+        parts.extend(cls.COUNT_H.pack(col) for col in fleet.columns)
+
+        enemy = fleet.arsenal
+        parts.append(cls.COUNT_B.pack(len(enemy.active)))
+        for slot in enemy.active:
+            parts.append(cls.ENEMY_BULLET.pack(slot, enemy.rects[slot].x, enemy.ys[slot]))
+        parts.append(cls.COUNT_B.pack(len(enemy.free)))
+        parts.append(bytes(enemy.free))
+        return b''.join(parts)
+
+    @classmethod
+    def apply(cls, game: 'AlienInvasion', data):
+
+        """
+        Rebuilds the game state from bytes made by encode(). The game must
+        already have the same number of ships
+
+        Args
+        ----
+        game: AlienInvasion
+        data (bytes)
+            packed state
+        """
+        settings = game.settings
+        stats = game.game_stats
+        fleet = game.alien_fleet
+        (stats.score, stats.level, stats.ships_left, fleet.fleet_direction,
+            settings.ship_speed, settings.bullet_speed, settings.fleet_speed,
+            settings.alien_fire_rate) = cls.HEADER.unpack_from(data, 0)
+        offset = cls.HEADER.size
+
+        (ship_count,) = cls.COUNT_B.unpack_from(data, offset)
+        offset += cls.COUNT_B.size
+        for ship in game.ships[:ship_count]:
+            ship.x, bullet_count = cls.SHIP.unpack_from(data, offset)
+            offset += cls.SHIP.size
+            ship.rect.x = ship.x
+            ship.arsenal.arsenal.empty()
+            for _ in range(bullet_count):
+                ship.arsenal.fire_bullet()
+            for bullet in ship.arsenal.arsenal:
+                bullet.rect.x, bullet.y = cls.BULLET.unpack_from(data, offset)
+                offset += cls.BULLET.size
+                bullet.rect.y = bullet.y
+
+        (alien_count,) = cls.COUNT_H.unpack_from(data, offset)
+        offset += cls.COUNT_H.size
+        end = offset + alien_count * cls.ALIEN.size
+        records = list(cls.ALIEN.iter_unpack(data[offset:end]))
+        offset = end
+        fleet.fleet.empty()
+        for x, y, col, row in records:
+            fleet._create_alien(x, y, col, row)
+        for alien, (x, y, _, _) in zip(fleet.fleet, records):
+            alien.x, alien.y = x, y
+        # columns keep the order they were first filled in, which depends on
+        # which aliens were shot, and the fleet picks shooters by that order
+        (column_count,) = cls.COUNT_H.unpack_from(data, offset)
+        offset += cls.COUNT_H.size
+        end = offset + column_count * cls.COUNT_H.size
+        order = [col for (col,) in cls.COUNT_H.iter_unpack(data[offset:end])]
+        offset = end
+        fleet.columns = {col: fleet.columns[col] for col in order}
+
+        enemy = fleet.arsenal
+        (enemy_count,) = cls.COUNT_B.unpack_from(data, offset)
+        offset += cls.COUNT_B.size
+        enemy.active.clear()
+        for _ in range(enemy_count):
+            slot, x, y = cls.ENEMY_BULLET.unpack_from(data, offset)
+            offset += cls.ENEMY_BULLET.size
+            enemy.active.append(slot)
+            enemy.rects[slot].x = x
+            enemy.ys[slot] = y
+            enemy.rects[slot].y = y
+        (free_count,) = cls.COUNT_B.unpack_from(data, offset)
+        offset += cls.COUNT_B.size
+        # fire_bullet() pops from the end of the free list, so it has to be
+        # in the same order on both sides or the next shots use other slots
+        enemy.free[:] = data[offset:offset + free_count]
+
+        game.HUD.update_scores()
+        game.HUD.update_level()
+
+    @classmethod
+    def ship_count(cls, data):
+
+        """
+        Returns:
+            int: number of ships in a state made by encode()
+        """
+        return cls.COUNT_B.unpack_from(data, cls.HEADER.size)[0]
+
+    @classmethod
+    def checksum(cls, game: 'AlienInvasion'):
+
+        """
+        Returns:
+            int: crc32 of the packed game state
+        """
+        return zlib.crc32(cls.encode(game))
+
+    @classmethod
+    def delta_encode(cls, base, data):
+
+        """
+        XORs data against base, so unchanged bytes become zeros, and compresses
+        the result
+
+        Args
+        ----
+        base (bytes)
+            state both players already have
+        data (bytes)
+            state to send
+
+        Returns:
+            bytes: length of data followed by the compressed XOR
+        """
+        base = base[:len(data)].ljust(len(data), b'\0')
+        xored = int.from_bytes(data, 'little') ^ int.from_bytes(base, 'little')
+        return cls.LENGTH.pack(len(data)) + zlib.compress(
+            xored.to_bytes(len(data), 'little'))
+
+    @classmethod
+    def delta_decode(cls, base, delta):
+
+        """
+        Reverses delta_encode()
+
+        Returns:
+            bytes: the state that was sent
+        """
+        (length,) = cls.LENGTH.unpack_from(delta, 0)
+        xored = zlib.decompress(delta[cls.LENGTH.size:])
+        base = base[:length].ljust(length, b'\0')
+        data = int.from_bytes(xored, 'little') ^ int.from_bytes(base, 'little')
+        return data.to_bytes(length, 'little')
+
+
+class LockstepSession:
+
+    """
+    Connection to the other player for co-op play
+
+    Both players run the same simulation. Each tick they swap their inputs and
+    only step once both are known. Every few ticks the inputs carry a checksum
+    of the state so a desync is caught at once. The host can start playing
+    alone; a player who joins later is sent a delta-compressed snapshot of the
+    state against the fresh level-1 state both sides can build
+
+    Messages are a type byte and a length followed by the payload
+
+    Methods
+    -------
+
+    connect(game)
+        hosts or joins, as set in settings
+    step_inputs(self)
+        swaps this tick's inputs and applies them to both ships
+    queue_fire(self)
+        fires on the next tick
+    report(self)
+        latency and bandwidth summary
+    close(self)
+        closes the sockets
+    """
+
+    HELLO = 1
+    SNAPSHOT = 2
+    INPUT = 3
+
+    HEADER = struct.Struct('!BI')
+    HELLO_BODY = struct.Struct('!II')
+    INPUT_BODY = struct.Struct('!IBBI')
+
+    LEFT = 1
+    RIGHT = 2
+    FIRE = 4
+
+    def __init__(self, game: 'AlienInvasion', local_index):
+
+        """
+        Sets up an unconnected session
+
+        Args
+        ----
+        game: AlienInvasion
+        local_index (int)
+            index in game.ships of this player's ship, 0 for the host
+
+        Attributes
+        ----------
+        game
+            AlienInvasion
+        settings
+            references the settings file
+        tick (int)
+            number of the next simulation tick
+        peer
+            socket to the other player, None until they connect
+        baseline (bytes)
+            packed fresh level-1 state, the base for the join snapshot
+        fire_queued (bool)
+            fire on the next tick
+        wait_times
+            seconds spent waiting for the other player's input, per tick
+        bytes_sent, bytes_received (int)
+            traffic counters
+        """
+        self.game = game
+        self.settings = game.settings
+        self.local_index = local_index
+        self.tick = 0
+        self.peer = None
+        self.listener = None
+        self.baseline = b''
+        self.fire_queued = False
+        self.wait_times = []
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.started = perf_counter()
+
+    @classmethod
+    def connect(cls, game: 'AlienInvasion'):
+
+        """
+        Hosts or joins a session, as set by netplay_role in settings. The host
+        starts the game and listens without blocking; joining blocks until the
+        host's snapshot has been applied
+
+        Returns:
+            LockstepSession
+        """
+        settings = game.settings
+        address = (settings.netplay_host, settings.netplay_port)
+        game.restart_game()
+
+        if settings.netplay_role == 'host':
+            session = cls(game, 0)
+            session.baseline = StateCodec.encode(game)
+            session.listener = socket.create_server(address)
+            session.listener.setblocking(False)
+            return session
+
+        session = cls(game, 1)
+        session.baseline = StateCodec.encode(game)
+        session.peer = socket.create_connection(address,
+            timeout=settings.netplay_timeout)
+        session.peer.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        session._add_partner()
+
+        kind, body = session._receive()
+        session.tick, seed = cls.HELLO_BODY.unpack(body)
+        kind, body = session._receive()
+        StateCodec.apply(game, StateCodec.delta_decode(session.baseline, body))
+        game.alien_fleet.rng.seed(seed)
+        return session
+
+    def _add_partner(self):
+
+        """
+        Adds the second ship to the game
+        """
+        partner = Ship(self.game, ShipArsenal(self.game),
+            self.settings.netplay_partner_offset)
+        self.game.ships.append(partner)
+
+    def _accept(self):
+
+        """
+        Host only: takes a waiting player, adds their ship, and sends the tick,
+        a new shared seed, and the join snapshot
+        """
+        try:
+            peer, _ = self.listener.accept()
+        except BlockingIOError:
+            return
+        peer.setblocking(True)
+        peer.settimeout(self.settings.netplay_timeout)
+        peer.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.peer = peer
+        self.listener.close()
+        self.listener = None
+        self._add_partner()
+
+        seed = random.getrandbits(32)
+        self.game.alien_fleet.rng.seed(seed)
+        snapshot = StateCodec.delta_encode(self.baseline, StateCodec.encode(self.game))
+        self._send(self.HELLO, self.HELLO_BODY.pack(self.tick, seed))
+        self._send(self.SNAPSHOT, snapshot)
+
+    def _send(self, kind, body):
+        message = self.HEADER.pack(kind, len(body)) + body
+        self.peer.sendall(message)
+        self.bytes_sent += len(message)
+
+    def _receive_exact(self, size):
+        chunks = []
+        while size:
+            chunk = self.peer.recv(size)
+            if not chunk:
+                raise ConnectionError('other player disconnected')
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b''.join(chunks)
+
+    def _receive(self):
+
+        """
+        Returns:
+            tuple: message type and payload of the next message
+        """
+        kind, length = self.HEADER.unpack(self._receive_exact(self.HEADER.size))
+        body = self._receive_exact(length)
+        self.bytes_received += self.HEADER.size + length
+        return kind, body
+
+    def queue_fire(self):
+
+        """
+        Fires on the next tick
+        """
+        self.fire_queued = True
+
+    def _local_input(self):
+
+        """
+        Returns:
+            int: bit mask of this player's input for the tick
+        """
+        bits = 0
+        if self.game.input.pressed('left'):
+            bits |= self.LEFT
+        if self.game.input.pressed('right'):
+            bits |= self.RIGHT
+        if self.fire_queued:
+            bits |= self.FIRE
+            self.fire_queued = False
+        return bits
+
+    def step_inputs(self):
+
+        """
+        Swaps this tick's inputs with the other player and applies both to the
+        ships. Before the other player joins, the host applies its own input
+
+        Raises:
+            DesyncError: if the other player's checksum does not match
+        """
+        if self.listener is not None:
+            self._accept()
+
+        local = self._local_input()
+        inputs = [0] * len(self.game.ships)
+        inputs[self.local_index] = local
+
+        if self.peer is not None:
+            check_tick = self.tick % self.settings.netplay_checksum_interval == 0
+            checksum = StateCodec.checksum(self.game) if check_tick else 0
+            self._send(self.INPUT, self.INPUT_BODY.pack(
+                self.tick, local, check_tick, checksum))
+
+            waited = perf_counter()
+            kind, body = self._receive()
+            self.wait_times.append(perf_counter() - waited)
+            if kind != self.INPUT:
+                raise ConnectionError(f'unexpected message type {kind}')
+            tick, remote, has_checksum, remote_checksum = self.INPUT_BODY.unpack(body)
+            if tick != self.tick or (check_tick and has_checksum
+                    and remote_checksum != checksum):
+                raise DesyncError(f'desync at tick {self.tick}')
+            inputs[1 - self.local_index] = remote
+
+        for ship, bits in zip(self.game.ships, inputs):
+            ship.moving_left = bool(bits & self.LEFT)
+            ship.moving_right = bool(bits & self.RIGHT)
+            if bits & self.FIRE and ship.fire():
+                self.game._play_sound(self.game.laser_sound)
+        self.tick += 1
+
+    def report(self):
+
+        """
+        Returns:
+            str: ticks played, input wait latency, and bandwidth
+        """
+        elapsed = max(perf_counter() - self.started, 1e-9)
+        waits = sorted(self.wait_times)
+        if waits:
+            mean_ms = sum(waits) / len(waits) * 1000
+            p95_ms = waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000
+        else:
+            mean_ms = p95_ms = 0.0
+        return (f'netplay: {self.tick} ticks, input wait mean {mean_ms:.2f} ms '
+            f'p95 {p95_ms:.2f} ms, sent {self.bytes_sent / elapsed:.0f} B/s, '
+            f'received {self.bytes_received / elapsed:.0f} B/s')
+
+    def close(self):
+
+        """
+        Closes the sockets
+        """
+        for sock in (self.peer, self.listener):
+            if sock is not None:
+                sock.close()
+        self.peer = None
+        self.listener = None
@@ -0,0 +1,187 @@
+import numpy as np
+import pygame
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+   from alien_invasion import AlienInvasion
+
+
+class ExplosionParticles:
+
+    """
+    Explosion particles kept in preallocated NumPy arrays
+
+    Positions, velocities and lifetimes of every particle live in fixed-size
+    arrays that are updated with vectorized operations and written to the
+    screen in one batch. New particles are written over the oldest ones, so the
+    particle count never goes above the budget in settings
+
+    Methods
+    -------
+
+    __init__(self, game: 'AlienInvasion')
+        allocates the particle arrays and the color palette
+    emit(self, centers)
+        starts an explosion at each center
+    update(self)
+        moves particles and ages them
+    snapshot(self)
+        copies of the live particles' positions and lifetimes
+    draw(self, surface, scale, particles)
+        writes all live particles to the screen or a scaled surface
+    clear(self)
+        removes all particles
+    """
+
+    def __init__(self, game: 'AlienInvasion'):
+
+        """
+        Allocates the particle arrays and the color palette
+
+        Args
+        ----
+        game: AlienInvasion
+
+        Attributes
+        ----------
+        screen
+            screen of game
+        settings
+            references the settings file
+        budget (int)
+            maximum number of particles alive at once
+        pos
+            (budget, 2) array of particle positions
+        vel
+            (budget, 2) array of particle velocities
+        life
+            frames each particle has left, 0 means the slot is free
+        cursor (int)
+            next slot to write, always the oldest particle
+        palette
+            screen colors from the start of a particle's life to its end
+        """
+        self.screen = game.screen
+        self.settings = game.settings
+        self.budget = self.settings.particle_budget
+        self.rng = np.random.default_rng()
+
+        self.pos = np.zeros((self.budget, 2), dtype=np.float32)
+        self.vel = np.zeros((self.budget, 2), dtype=np.float32)
+        self.life = np.zeros(self.budget, dtype=np.float32)
+        self.cursor = 0
+
+        self.palette = np.array(
+            [self.screen.map_rgb(color) for color in self.settings.particle_colors],
+            dtype=np.uint32)
+        game.events.subscribe('aliens_killed', self._on_aliens_killed)
+        game.events.subscribe('asteroid_impacts', self._on_asteroid_impacts)
+
+    def _on_aliens_killed(self, events):
+
+        """
+        Starts one explosion for every alien killed this frame
+        """
+        self.emit([alien.rect.center for event in events for alien in event['aliens']])
+
+    def _on_asteroid_impacts(self, events):
+
+        """
+        Starts an explosion for every alien crushed or asteroid destroyed
+        this frame
+        """
+        self.emit([center for event in events for center in event['centers']])
+
+    def emit(self, centers):
+
+        """
+        Starts an explosion at each center, recycling the oldest particles when
+        the budget is used up
+
+        Args
+        ----
+        centers
+            list of (x, y) positions, one per destroyed alien
+        """
+        if not centers:
+            return
+        per_burst = self.settings.particles_per_explosion
+        count = min(len(centers) * per_burst, self.budget)
+
+        origins = np.repeat(np.asarray(centers, dtype=np.float32), per_burst, axis=0)
+        origins = origins[-count:]
+        angles = self.rng.uniform(0, 2 * np.pi, count).astype(np.float32)
+        speeds = self.rng.uniform(0.5, 1.0, count).astype(np.float32)
+        speeds *= self.settings.particle_speed
+
+        slots = (self.cursor + np.arange(count)) % self.budget
+        self.pos[slots] = origins
+        self.vel[slots, 0] = np.cos(angles) * speeds
+        self.vel[slots, 1] = np.sin(angles) * speeds
+        self.life[slots] = self.settings.particle_life
+        self.cursor = int((self.cursor + count) % self.budget)
+
+    def update(self):
+
+        """
+        Moves particles by their velocity, slows them down, and ages them
+        """
+        self.pos += self.vel
+        self.vel *= self.settings.particle_drag
+        np.subtract(self.life, 1, out=self.life)
+        np.maximum(self.life, 0, out=self.life)
+
+    def snapshot(self):
+
+        """
+        Copies the live particles, for drawing on another thread while update()
+        keeps changing the arrays
+
+        Returns:
+            tuple: (positions, lifetimes) of the live particles
+        """
+        alive = np.flatnonzero(self.life)
+        return self.pos[alive], self.life[alive]
+
+    def draw(self, surface=None, scale=1, particles=None):
+
+        """
+        Writes all live particles that are on the screen into the screen pixels
+        in one batch, colored by how much of their life is left
+
+        Args
+        ----
+        surface
+            surface to draw on, the screen when None
+        scale (float)
+            size of the surface as a fraction of the screen
+        particles
+            (positions, lifetimes) from snapshot(), the live arrays when None
+        """
+        pos, life = particles if particles is not None else self.snapshot()
+        if not life.size:
+            return
+        surface = surface or self.screen
+        width, height = surface.get_size()
+        xs = (pos[:, 0] * scale).astype(np.intp)
+        ys = (pos[:, 1] * scale).astype(np.intp)
+        visible = (xs >= 0) & (xs < width - 1) & (ys >= 0) & (ys < height - 1)
+        xs = xs[visible]
+        ys = ys[visible]
+
+        age = 1 - life[visible] / self.settings.particle_life
+        colors = self.palette[(age * (len(self.palette) - 1)).astype(np.intp)]
+
+        pixels = pygame.surfarray.pixels2d(surface)
+        pixels[xs, ys] = colors
+        pixels[xs + 1, ys] = colors
+        pixels[xs, ys + 1] = colors
+        pixels[xs + 1, ys + 1] = colors
+        del pixels
+
+    def clear(self):
+
+        """
+        Removes all particles
+        """
+        self.life.fill(0)
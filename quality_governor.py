@@ -0,0 +1,145 @@
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+   from alien_invasion import AlienInvasion
+
+
+class QualityGovernor:
+
+    """
+    Watches frame times and steps optional rendering and audio costs down when
+    the game keeps running over its frame budget, then back up when there is
+    headroom again
+
+    Quality levels (each level keeps the savings of the levels before it)
+    ----------------------------------------------------------------------
+
+    0
+        full quality
+    1
+        solid fill instead of the full-screen background blit
+    2
+        HUD text is re-rendered less often
+    3
+        overlapping sound effects are merged into one
+    4
+        the fleet is drawn with a single batched blit
+
+    Methods
+    -------
+
+    __init__(self, game: 'AlienInvasion')
+        initializes the governor at full quality
+    record_frame(self, frame_ms, work_ms)
+        records the timing of a frame and changes the level if needed
+    step_down(self)
+        lowers quality by one level
+    step_up(self)
+        raises quality by one level
+    """
+
+    MAX_LEVEL = 4
+
+    def __init__(self, game: 'AlienInvasion'):
+
+        """
+        Initializes the governor at full quality
+
+        Args
+        ----
+        game: AlienInvasion
+
+        Attributes
+        ----------
+        game
+            AlienInvasion
+        settings
+            references the settings file
+        budget_ms (float)
+            time available for one frame at the target FPS
+        level (int)
+            current quality level, 0 is full quality
+        over_budget_frames (int)
+            frames in a row that went over budget
+        headroom_frames (int)
+            frames in a row that finished well inside the budget
+        """
+        self.game = game
+        self.settings = game.settings
+        self.budget_ms = 1000 / self.settings.FPS
+        self.level = 0
+        self.over_budget_frames = 0
+        self.headroom_frames = 0
+
+    @property
+    def solid_background(self):
+        return self.level >= 1
+
+    @property
+    def hud_refresh_interval(self):
+        return self.settings.quality_hud_interval if self.level >= 2 else 1
+
+    @property
+    def merge_sounds(self):
+        return self.level >= 3
+
+    @property
+    def batch_fleet_draw(self):
+        return self.level >= 4
+
+    def record_frame(self, frame_ms, work_ms):
+
+        """
+        Records the timing of a frame and changes the level after enough frames
+        in a row were over budget or had headroom
+
+        Args
+        ----
+        frame_ms (int)
+            time between frames, as returned by clock.tick()
+        work_ms (int)
+            time spent in the frame before waiting, from the frame pacer
+        """
+        if frame_ms > self.budget_ms * self.settings.quality_over_budget:
+            self.over_budget_frames += 1
+            self.headroom_frames = 0
+        elif work_ms < self.budget_ms * self.settings.quality_headroom:
+            self.headroom_frames += 1
+            self.over_budget_frames = 0
+        else:
+            self.over_budget_frames = 0
+            self.headroom_frames = 0
+
+        if self.over_budget_frames >= self.settings.quality_step_down_frames:
+            self.step_down()
+        elif self.headroom_frames >= self.settings.quality_step_up_frames:
+            self.step_up()
+
+    def step_down(self):
+
+        """
+        Lowers quality by one level
+        """
+        if self.level < self.MAX_LEVEL:
+            self.level += 1
+            self._apply()
+        self.over_budget_frames = 0
+
+    def step_up(self):
+
+        """
+        Raises quality by one level
+        """
+        if self.level > 0:
+            self.level -= 1
+            self._apply()
+        self.headroom_frames = 0
+
+    def _apply(self):
+
+        """
+        Passes the settings of the current level to the parts of the game that
+        read them each frame
+        """
+        self.game.HUD.refresh_interval = self.hud_refresh_interval
+        self.game.alien_fleet.batch_draw = self.batch_fleet_draw
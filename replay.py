@@ -0,0 +1,333 @@
+import mmap
+import struct
+import sys
+import zlib
+from typing import TYPE_CHECKING
+
+import pygame
+from arsenal import ShipArsenal
+from netplay import StateCodec
+from ship import Ship
+
+if TYPE_CHECKING:
+   from alien_invasion import AlienInvasion
+
+
+HEADER = struct.Struct('<4sHIB')
+RECORD = struct.Struct('<I')
+INDEX_ENTRY = struct.Struct('<QI')
+FOOTER = struct.Struct('<QI4s')
+MAGIC = b'AIRP'
+VERSION = 2
+
+
+class ReplayRecorder:
+
+    """
+    Writes a seekable replay of every simulated frame
+
+    File layout (little-endian)
+    ---------------------------
+
+    header
+        magic, version, keyframe interval, ship count when recording started.
+        A netplay partner can join later, so every state also carries its
+        own ship count, which is what the viewer uses
+    records
+        one per frame, each its length and then the data. Every
+        keyframe_interval frames the full state from StateCodec is stored
+        compressed; the frames between store a delta against the last
+        keyframe
+    index
+        offset and length of each record's data, one fixed-size entry per
+        frame
+    footer
+        offset of the index, frame count, magic
+
+    The file is flushed after every keyframe. If the game crashes or is
+    killed before close() writes the index and footer, ReplayReader finds the
+    records from their lengths instead
+
+    Methods
+    -------
+
+    __init__(self, game: 'AlienInvasion')
+        opens the replay file if recording is on
+    record_frame(self)
+        writes the current state as a keyframe or delta
+    close(self)
+        writes the index and footer and closes the file
+    """
+
+    def __init__(self, game: 'AlienInvasion'):
+
+        """
+        Opens the replay file and writes the header if replays are on in
+        settings
+
+        Args
+        ----
+        game: AlienInvasion
+
+        Attributes
+        ----------
+        game
+            AlienInvasion
+        enabled (bool)
+            True while recording
+        interval (int)
+            frames between keyframes
+        keyframe (bytes)
+            state of the last keyframe, the base for deltas
+        index
+            (offset, length) of every record written
+        """
+        self.game = game
+        self.settings = game.settings
+        self.enabled = self.settings.record_replay
+        if not self.enabled:
+            return
+
+        self.interval = self.settings.replay_keyframe_interval
+        self.keyframe = b''
+        self.index = []
+        self.file = open(self.settings.replay_file, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.interval, len(game.ships)))
+
+    def record_frame(self):
+
+        """
+        Writes the current state as a keyframe or as a delta against the last
+        keyframe, and flushes the file after a keyframe
+        """
+        if not self.enabled:
+            return
+        state = StateCodec.encode(self.game)
+        is_keyframe = len(self.index) % self.interval == 0
+        if is_keyframe:
+            self.keyframe = state
+            record = zlib.compress(state)
+        else:
+            record = StateCodec.delta_encode(self.keyframe, state)
+        self.file.write(RECORD.pack(len(record)))
+        self.index.append((self.file.tell(), len(record)))
+        self.file.write(record)
+        if is_keyframe:
+            self.file.flush()
+
+    def close(self):
+
+        """
+        Writes the index and footer and closes the file
+        """
+        if not self.enabled:
+            return
+        self.enabled = False
+        index_offset = self.file.tell()
+        self.file.write(b''.join(INDEX_ENTRY.pack(*entry) for entry in self.index))
+        self.file.write(FOOTER.pack(index_offset, len(self.index), MAGIC))
+        self.file.close()
+
+
+class ReplayReader:
+
+    """
+    Memory-maps a replay file and returns the state of any frame by reading
+    one keyframe and at most one delta. A replay that was never closed has
+    no index or footer, so its index is rebuilt by walking the records, and
+    a record cut short at the end is left out
+
+    Methods
+    -------
+
+    __init__(self, path)
+        maps the file and reads the header and footer, or rebuilds the index
+    state_at(self, frame)
+        packed state of a frame
+    close(self)
+        unmaps the file
+    """
+
+    def __init__(self, path):
+
+        """
+        Maps the file and reads the header and footer, or rebuilds the index
+        if the recording was not closed
+
+        Args
+        ----
+        path (file)
+            replay written by ReplayRecorder
+
+        Attributes
+        ----------
+        interval (int)
+            frames between keyframes
+        ship_count (int)
+            ships in the recorded game when recording started
+        frame_count (int)
+            frames in the replay
+        finished (bool)
+            True if the recording was closed and has its index and footer
+        index
+            (offset, length) of every record when the index was rebuilt, None
+            when it is read from the file
+
+        Exceptions
+        ----------
+
+        ValueError
+            if the file is not a replay or holds no whole frame
+        """
+        self.file = open(path, 'rb')
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f'{path} is empty')
+        if len(self.data) < HEADER.size:
+            self.close()
+            raise ValueError(f'{path} is not a replay')
+        magic, version, self.interval, self.ship_count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path} is not a replay')
+
+        end_magic = None
+        if len(self.data) >= HEADER.size + FOOTER.size:
+            self.index_offset, self.frame_count, end_magic = FOOTER.unpack_from(
+                self.data, len(self.data) - FOOTER.size)
+        self.finished = end_magic == MAGIC
+        self.index = None if self.finished else self._scan()
+        if not self.finished:
+            self.frame_count = len(self.index)
+        if not self.frame_count:
+            self.close()
+            raise ValueError(f'{path} holds no frames')
+        self._cached_keyframe = (None, b'')
+
+    def _scan(self):
+
+        """
+        Rebuilds the index of a replay that was not closed from the length in
+        front of each record, stopping at a record cut short
+
+        Returns:
+            list: (offset, length) of every whole record
+        """
+        index = []
+        offset = HEADER.size
+        end = len(self.data)
+        while offset + RECORD.size <= end:
+            (length,) = RECORD.unpack_from(self.data, offset)
+            offset += RECORD.size
+            if offset + length > end:
+                break
+            index.append((offset, length))
+            offset += length
+        return index
+
+    def _record(self, frame):
+        if self.index is not None:
+            offset, length = self.index[frame]
+        else:
+            offset, length = INDEX_ENTRY.unpack_from(
+                self.data, self.index_offset + frame * INDEX_ENTRY.size)
+        return self.data[offset:offset + length]
+
+    def state_at(self, frame):
+
+        """
+        Returns the packed state of a frame
+
+        Args
+        ----
+        frame (int)
+            frame number, 0 to frame_count - 1
+
+        Returns:
+            bytes: state that StateCodec.apply() can load
+        """
+        frame = max(0, min(frame, self.frame_count - 1))
+        key = frame - frame % self.interval
+        if self._cached_keyframe[0] != key:
+            self._cached_keyframe = (key, zlib.decompress(self._record(key)))
+        keyframe = self._cached_keyframe[1]
+        if frame == key:
+            return keyframe
+        return StateCodec.delta_decode(keyframe, self._record(frame))
+
+    def close(self):
+
+        """
+        Unmaps and closes the file
+        """
+        self.data.close()
+        self.file.close()
+
+
+def view_replay(game: 'AlienInvasion', path):
+
+    """
+    Plays a replay in the game window. RIGHT/LEFT step one frame, PAGEUP and
+    PAGEDOWN jump one keyframe, HOME/END go to the start or end, SPACE pauses,
+    and Q or closing the window quits. Ships are added and removed to match
+    each frame's state, for netplay games the partner joined partway through
+
+    Args
+    ----
+    game: AlienInvasion
+    path (file)
+        replay written by ReplayRecorder
+    """
+    reader = ReplayReader(path)
+    if not reader.finished:
+        print(f'{path} was not closed, playing the {reader.frame_count} '
+            'frames recorded before it stopped')
+    ships = list(game.ships)
+    game.game_active = True
+
+    frame = 0
+    playing = True
+    jumps = {
+        pygame.K_RIGHT: 1, pygame.K_LEFT: -1,
+        pygame.K_PAGEDOWN: reader.interval, pygame.K_PAGEUP: -reader.interval,
+        pygame.K_HOME: -reader.frame_count, pygame.K_END: reader.frame_count,
+        }
+    try:
+        while True:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (
+                        event.type == pygame.KEYDOWN and event.key == pygame.K_q):
+                    return
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                    playing = not playing
+                elif event.type == pygame.KEYDOWN and event.key in jumps:
+                    frame += jumps[event.key]
+                    playing = False
+            frame = max(0, min(frame, reader.frame_count - 1))
+            state = reader.state_at(frame)
+            count = StateCodec.ship_count(state)
+            while len(ships) < count:
+                ships.append(Ship(game, ShipArsenal(game)))
+            game.ships = ships[:count]
+            StateCodec.apply(game, state)
+            game._update_screen()
+            game.clock.tick(game.settings.FPS)
+            if playing and frame < reader.frame_count - 1:
+                frame += 1
+    finally:
+        reader.close()
+
+
+if __name__ == '__main__':
+
+    """
+    Opens a replay in the viewer: python replay.py [replay file]
+    """
+    from alien_invasion import AlienInvasion
+
+    alien_inv = AlienInvasion()
+    view_replay(alien_inv, sys.argv[1] if len(sys.argv) > 1
+        else alien_inv.settings.replay_file)
+    pygame.quit()
@@ -0,0 +1,144 @@
+import pygame
+
+
+class ResolutionCache:
+
+    """
+    Scaled copies of the game's images, kept for the last few window sizes
+    the game has been shown at
+
+    Sprites are sized for the screen size in settings and scaled with the
+    window by the same factor on both axes, so they keep their shape. Each
+    resolution has its own store of scaled images and backgrounds, and going
+    back to a recent size reuses that store instead of loading and scaling
+    again. Only max_sizes stores are kept; switching to a new size drops the
+    one used longest ago, so resizing through many sizes does not hold a
+    screen-sized background for each of them. Source images are loaded from
+    disk once
+
+    Methods
+    -------
+
+    __init__(self, base_size, max_sizes)
+        starts at the screen size the sprites are drawn for
+    set_resolution(self, size)
+        switches to the store of a window size, dropping the oldest store
+    scaled_size(self, size)
+        a sprite size at the current resolution
+    get(self, key, build)
+        an asset of the current resolution, built the first time it is asked for
+    image(self, image_file, size, flip)
+        an image scaled for the current resolution
+    """
+
+    def __init__(self, base_size, max_sizes=3):
+
+        """
+        Starts at the screen size the sprites are drawn for
+
+        Args
+        ----
+        base_size
+            (width, height) the sprite sizes in settings are meant for
+        max_sizes (int)
+            window sizes to keep scaled assets for
+
+        Attributes
+        ----------
+        base_size
+            (width, height) the sprite sizes in settings are meant for
+        size
+            current (width, height) of the screen
+        scale (float)
+            factor sprite sizes are multiplied by at the current size
+        stores
+            (width, height) -> {key: asset} for the last max_sizes sizes,
+            most recently used last
+        sources
+            images loaded from disk, by file
+        """
+        self.base_size = tuple(base_size)
+        self.size = self.base_size
+        self.scale = 1.0
+        self.max_sizes = max(1, max_sizes)
+        self.stores = {self.base_size: {}}
+        self.sources = {}
+
+    def set_resolution(self, size):
+
+        """
+        Switches to the store of a window size, starting an empty one if the
+        window has not had that size recently. Stores past max_sizes are
+        dropped, the one used longest ago first
+
+        Args
+        ----
+        size
+            (width, height) of the screen
+        """
+        self.size = tuple(size)
+        self.scale = min(self.size[0] / self.base_size[0],
+            self.size[1] / self.base_size[1])
+        self.stores[self.size] = self.stores.pop(self.size, {})
+        while len(self.stores) > self.max_sizes:
+            del self.stores[next(iter(self.stores))]
+
+    def scaled_size(self, size):
+
+        """
+        Returns:
+            tuple: (width, height) of a sprite made for the base size, at the
+            current resolution
+        """
+        width, height = size
+        return (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+
+    def get(self, key, build):
+
+        """
+        Returns an asset of the current resolution, calling build() to make it
+        the first time it is asked for at this size
+
+        Args
+        ----
+        key
+            hashable name of the asset
+        build
+            function with no arguments that makes the asset
+        """
+        store = self.stores[self.size]
+        asset = store.get(key)
+        if asset is None:
+            asset = store[key] = build()
+        return asset
+
+    def _source(self, image_file):
+        source = self.sources.get(image_file)
+        if source is None:
+            source = self.sources[image_file] = pygame.image.load(image_file)
+        return source
+
+    def image(self, image_file, size, flip=False):
+
+        """
+        Returns an image scaled from its base size to the current resolution
+
+        Args
+        ----
+        image_file (file)
+            image to load
+        size
+            (width, height) of the image at the base size
+        flip (bool)
+            flips the image vertically
+
+        Returns:
+            pygame.Surface: the scaled image, shared by everything that asks
+            for it at this size
+        """
+        def build():
+            image = pygame.transform.scale(self._source(image_file),
+                self.scaled_size(size))
+            return pygame.transform.flip(image, False, True) if flip else image
+
+        return self.get(('image', image_file, tuple(size), flip), build)
@@ -1,3 +1,4 @@
+import pygame
 from pathlib import Path
 
 class Settings:
@@ -13,17 +14,104 @@ class Settings:
         name (str)
             name of the game (caption)
         screen_w (int)
-            width of screen
+            width of screen, sprite sizes are meant for this size; follows
+            the window when it is resized
         screen_h (int)
             height of screen
+        resizable (bool)
+            lets the player resize the window, sprites and layout are scaled
+            to the new size (not used in netplay)
+        fullscreen (bool)
+            starts in fullscreen, toggled with the fullscreen key
+        resize_settle (float)
+            seconds the window size must stay the same before the game is
+            scaled to it, so dragging the window edge scales once at the end
+        resolution_cache_sizes (int)
+            window sizes the scaled images and backgrounds are kept for
         FPS (int)
             frames per second, used by Clock()
+        frame_pacing (str)
+            how the loop waits for the next frame: 'tick', 'busy', 'hybrid',
+            'vsync' or 'uncapped' (see FramePacer)
+        pacing_spin_ms (float)
+            time before the deadline that hybrid pacing stops sleeping and
+            spins
+        pacing_samples (int)
+            recent frame intervals kept for the jitter report
+        report_frame_pacing (bool)
+            prints the frame interval jitter when the game quits
+        render_scale (float)
+            size of the offscreen surface the scene is drawn on, as a fraction
+            of the screen; 1 draws straight to the screen
+        render_upscale (str)
+            'scale' or 'scale2x', how the offscreen surface is stretched to
+            the screen; scale2x keeps edges sharper but costs more, and is
+            only used when render_scale is 0.5
+        ship_lost_pause (float)
+            seconds the game pauses after a ship is lost
+        prebuild_frame_share (float)
+            share of a frame that may pass before pre-building of the next
+            fleet stops for that frame
+        threaded_simulation (bool)
+            runs the simulation on its own thread and renders snapshots of it
+            on the main thread
+        random_seed (int)
+            seed for alien fire, None for a different game each time
+        netplay_role (str)
+            'host' or 'join' for networked co-op, None to play alone
+        netplay_host (str)
+            address the host listens on or the joining player connects to
+        netplay_port (int)
+            port of the netplay connection
+        netplay_timeout (float)
+            seconds to wait for the other player before giving up
+        netplay_checksum_interval (int)
+            ticks between state checksums
+        netplay_partner_offset (int)
+            x distance of the second ship from the middle of the screen
         bg_file (file)
-            accesses background image file
+            accesses background image file (star layer)
+        galaxy_file (file)
+            accesses galaxy image file (back layer of the background)
+        scrolling_background (bool)
+            scrolls the background layers
+        starfield_layers (list)
+            (image file, speed, colorkey) for each background layer, back to
+            front
         difficulty_scale (int)
             rate of increase in difficulty
         scores_file (json file)
-            file for saving score information between games
+            old hi score file, brought over to the leaderboard once
+        leaderboard_file (sqlite file)
+            database of every finished run
+        player_name (str)
+            name finished runs are recorded under
+        telemetry (bool)
+            writes a per-frame and per-event session log
+        telemetry_file (jsonl file)
+            file the session log is appended to
+        telemetry_flush_interval (float)
+            seconds between writes of the session log
+        capture_video (bool)
+            records the rendered frames from the start, the capture key
+            starts and stops recording at any time
+        capture_dir (folder)
+            folder each recording gets its own folder in
+        capture_format (str)
+            'png' for a numbered PNG sequence, 'raw' for the screen's pixels
+            in one file with an index
+        capture_queue_size (int)
+            frames that can wait to be written before new frames are dropped
+        capture_workers (int)
+            threads encoding PNG frames, raw capture always uses one
+        capture_png_level (int)
+            zlib compression level of the PNG frames, 1 is fastest
+        record_replay (bool)
+            records every simulated frame to a seekable replay file
+        replay_file (file)
+            file the replay is written to
+        replay_keyframe_interval (int)
+            frames between full-state keyframes in the replay
         ship_file (file)
             accesses ship image file
         ship_w (int)
@@ -43,12 +131,61 @@ class Settings:
             file for sound played when a ship is lost
             made using https://sfxr.me/
         title_screen_music (file)
-            file for background music
+            file for the music on the title screen
+        battle_music (file)
+            file for background music during play
             found at https://opengameart.org/art-search?keys=battle+in+the+stars
+        title_music_volume (float)
+            volume of the title music
+        battle_music_volume (float)
+            volume of the battle music
+        music_fade_ms (int)
+            length of the fade out and fade in when the music changes
         alien_file (file)
             image used for alien
+        alien_sheet_file (file)
+            sprite sheet with the alien frames in one row, None to animate
+            alien_file with alien_squash
+        alien_frame_count (int)
+            number of frames in the alien sprite sheet
+        alien_squash (list)
+            (width factor, height factor) of each alien frame made from
+            alien_file
+        dive_attacks (bool)
+            lets aliens leave the formation to dive at the ship (not used in
+            netplay)
+        dive_rate (float)
+            dives started per second
+        max_divers (int)
+            aliens out of formation at once
+        dive_speed (float)
+            pixels a diver moves each frame along its path
+        dive_aims (int)
+            dive paths sampled across the screen, the ship is aimed at with
+            the closest one
+        dive_return_ticks (int)
+            frames a diver takes to get back to its slot
+        alien_frame_ticks (int)
+            frames each alien animation frame is shown for
+        asteroids (bool)
+            fills the screen with drifting asteroids; they are not part of
+            the netplay or replay state
+        asteroid_file (file)
+            image used for asteroids
+        asteroid_count (int)
+            asteroids in the field at once
+        asteroid_sizes (list)
+            sizes (pixels) an asteroid can have; bigger ones take more hits
+        asteroid_speed (tuple)
+            slowest and fastest downward speed, the sideways drift is at most
+            the slowest
         fleet_direction (int)
             int that changes to negative to move in the opposite direction
+        alien_bullet_pool (int)
+            number of alien bullets that can be in flight at once
+        pixel_collisions (bool)
+            only counts hits where the solid pixels of two sprites overlap,
+            after their rects do
         button_w (int)
             width of the start button
         button_h (int)
@@ -63,16 +200,107 @@ class Settings:
             font size for elements od the HUD
         font_file (file)
             file for the font used
+        key_bindings (dict)
+            keys bound to each action (left, right, fire, quit, fullscreen,
+            capture)
+        allowed_events (list)
+            event types let into the event queue, all others are blocked
+        poll_movement (bool)
+            reads movement from the keys held down each frame instead of only
+            from KEYDOWN and KEYUP events
+        input_latency_timeout (int)
+            frames to wait for the ship to respond to a key before the press
+            is left out of the latency numbers
+        report_input_latency (bool)
+            prints the input latency distribution when the game quits
+        gc_scheduling (bool)
+            turns automatic garbage collection off during the game loop and
+            collects in spare frame time and at transitions instead
+        gc_min_slack_ms (float)
+            time a frame must have left for a young collection to run in it
+        gc_overdue_factor (int)
+            times over the collector's threshold allocations may get before
+            a young collection runs without spare time
+        report_gc_pauses (bool)
+            prints garbage collection pauses when the game quits
+        adaptive_quality (bool)
+            lets the quality governor lower optional costs when frames run
+            over budget
+        quality_over_budget (float)
+            frame time, as a fraction of the budget, that counts as over budget
+        quality_headroom (float)
+            work time, as a fraction of the budget, that counts as headroom
+        quality_step_down_frames (int)
+            frames in a row over budget before quality is lowered
+        quality_step_up_frames (int)
+            frames in a row with headroom before quality is raised
+        quality_hud_interval (int)
+            frames between HUD score re-renders at reduced quality
+        bg_fill_color (int, rgb scale)
+            color used instead of the background image at reduced quality
+        particle_budget (int)
+            maximum number of explosion particles alive at once
+        particles_per_explosion (int)
+            particles started for each destroyed alien
+        particle_speed (float)
+            top starting speed of a particle
+        particle_drag (float)
+            fraction of its speed a particle keeps each frame
+        particle_life (int)
+            frames a particle lives
+        particle_colors (list)
+            colors (rgb scale) a particle fades through during its life
 
 
         """
         self.name: str = "Alien Invasion"
         self.screen_w = 1200
         self.screen_h = 800
+        self.resizable = True
+        self.fullscreen = False
+        self.resize_settle = 0.25
+        self.resolution_cache_sizes = 3
         self.FPS = 60
+        self.frame_pacing = 'tick'
+        self.pacing_spin_ms = 2.0
+        self.pacing_samples = 3600
+        self.report_frame_pacing = False
+        self.render_scale = 1
+        self.render_upscale = 'scale'
+        self.ship_lost_pause = 1.0
+        self.prebuild_frame_share = 0.6
+        self.threaded_simulation = False
+        self.random_seed = None
+
+        self.netplay_role = None
+        self.netplay_host = '127.0.0.1'
+        self.netplay_port = 50007
+        self.netplay_timeout = 5.0
+        self.netplay_checksum_interval = 30
+        self.netplay_partner_offset = 120
         self.bg_file = Path.cwd() / 'Assets' / 'images' / 'space.png'
+        self.galaxy_file = Path.cwd() / 'Assets' / 'images' / 'galaxy_.png'
+        self.scrolling_background = True
+        self.starfield_layers = [
+            (self.galaxy_file, 0.25, None),
+            (self.bg_file, 1.0, (0, 0, 0)),
+            ]
         self.difficulty_scale = 1.05
         self.scores_file = Path.cwd() / 'Assets' / 'file' / 'scores.json'
+        self.leaderboard_file = Path.cwd() / 'Assets' / 'file' / 'leaderboard.db'
+        self.player_name = 'PLAYER 1'
+        self.telemetry = False
+        self.telemetry_file = Path.cwd() / 'Assets' / 'file' / 'telemetry.jsonl'
+        self.telemetry_flush_interval = 1.0
+        self.capture_video = False
+        self.capture_dir = Path.cwd() / 'captures'
+        self.capture_format = 'png'
+        self.capture_queue_size = 90
+        self.capture_workers = 2
+        self.capture_png_level = 1
+        self.record_replay = False
+        self.replay_file = Path.cwd() / 'Assets' / 'file' / 'replay.bin'
+        self.replay_keyframe_interval = 120
 
         self.ship_file = Path.cwd() / 'Assets' / 'images' / 'spaceship.png'
         self.ship_w = 64
@@ -85,10 +313,31 @@ class Settings:
         self.laser_sound = Path.cwd() / 'Assets' / 'sound' / 'laser7.mp3'
         self.impact_sound = Path.cwd() / 'Assets' / 'sound' / 'explosion.mp3'
         self.lose_ship_sound = Path.cwd() / 'Assets' / 'sound' / 'lose_ship.mp3'
-        self.title_screen_music = Path.cwd() / 'Assets' / 'sound' / 'Battle in the Stars.mp3'
+        self.title_screen_music = Path.cwd() / 'Assets' / 'sound' / 'SkyFire (Title Screen).mp3'
+        self.battle_music = Path.cwd() / 'Assets' / 'sound' / 'Battle in the Stars.mp3'
+        self.title_music_volume = 0.5
+        self.battle_music_volume = 0.3
+        self.music_fade_ms = 1000
 
         self.alien_file = Path.cwd() / 'Assets' / 'images' / 'alien.png'
+        self.alien_sheet_file = None
+        self.alien_frame_count = 4
+        self.alien_squash = [(1.0, 1.0), (1.0, 0.94), (0.96, 0.88), (1.0, 0.94)]
+        self.alien_frame_ticks = 10
+        self.dive_attacks = True
+        self.dive_rate = 0.5
+        self.max_divers = 4
+        self.dive_speed = 6.0
+        self.dive_aims = 12
+        self.dive_return_ticks = 90
+        self.asteroids = False
+        self.asteroid_file = Path.cwd() / 'Assets' / 'images' / 'Asteroid Brown.png'
+        self.asteroid_count = 40
+        self.asteroid_sizes = [28, 44, 64]
+        self.asteroid_speed = (0.75, 2.5)
         self.fleet_direction = 1
+        self.alien_bullet_pool = 12
+        self.pixel_collisions = True
 
         self.button_w = 200
         self.button_h = 50
@@ -99,6 +348,44 @@ class Settings:
         self.HUD_font_size = 20
         self.font_file = Path.cwd() / 'Assets' / 'Fonts' / 'Silkscreen' / 'PixelifySans-VariableFont_wght.ttf'
 
+        self.key_bindings = {
+            'left': [pygame.K_LEFT, pygame.K_a],
+            'right': [pygame.K_RIGHT, pygame.K_d],
+            'fire': [pygame.K_SPACE],
+            'quit': [pygame.K_q],
+            'fullscreen': [pygame.K_F11],
+            'capture': [pygame.K_F9],
+            }
+        self.allowed_events = [
+            pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN,
+            pygame.VIDEORESIZE,
+            ]
+        self.poll_movement = True
+        self.input_latency_timeout = 30
+        self.report_input_latency = False
+        self.gc_scheduling = False
+        self.gc_min_slack_ms = 2.0
+        self.gc_overdue_factor = 10
+        self.report_gc_pauses = False
+
+        self.adaptive_quality = True
+        self.quality_over_budget = 1.1
+        self.quality_headroom = 0.6
+        self.quality_step_down_frames = 30
+        self.quality_step_up_frames = 180
+        self.quality_hud_interval = 10
+        self.bg_fill_color = (4, 4, 16)
+
+        self.particle_budget = 4096
+        self.particles_per_explosion = 48
+        self.particle_speed = 4.0
+        self.particle_drag = 0.94
+        self.particle_life = 36
+        self.particle_colors = [
+            (255, 255, 220), (255, 220, 90), (255, 150, 40),
+            (220, 70, 30), (120, 30, 30),
+            ]
+
     def initialize_dynamic_settings(self):
 
         """
@@ -130,6 +417,10 @@ class Settings:
             hit
         alien_points (int)
             sets amount of points earned when an alien is destroyed
+        alien_fire_rate (float)
+            shots per second fired by the front aliens
+        alien_bullet_speed (float)
+            speed of alien bullets (y-coordinates)
 
         """
 
@@ -149,6 +440,9 @@ class Settings:
 
         self.alien_points = 50
 
+        self.alien_fire_rate = 0.75
+        self.alien_bullet_speed = 5
+
     def increase_difficulty(self):
 
         """
@@ -157,3 +451,4 @@ class Settings:
         self.ship_speed *= self.difficulty_scale
         self.bullet_speed *= self.difficulty_scale
         self.fleet_speed *= self.difficulty_scale
+        self.alien_fire_rate *= self.difficulty_scale
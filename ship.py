@@ -1,4 +1,5 @@
 import pygame
+from collision_masks import cached_mask, collide_pixels
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -13,6 +14,10 @@ class Ship:
     ---------
     __init__(self, game: 'AlienInvasion')
         initializes rect for the ship image and its movements
+    _load_image(self)
+        sets the ship image and mask for the current resolution
+    rescale(self, old_size)
+        fits the ship to a new screen size
     update(self)
         sets ship speed, prevents ship from leaving the screen
     draw(self)
@@ -20,7 +25,8 @@ class Ship:
     
     """   
     
-    def __init__(self, game: 'AlienInvasion', arsenal: 'ShipArsenal'):
+    def __init__(self, game: 'AlienInvasion', arsenal: 'ShipArsenal', 
+                 start_offset: int = 0):
 
         """
         Initializes ship elements
@@ -32,6 +38,10 @@ class Ship:
         ----------
         game ('AlienInvasion')
             refers to the main game class
+        arsenal ('ShipArsenal')
+            bullets fired by this ship
+        start_offset (int)
+            x distance from the middle of the screen where the ship starts
 
         
         """
@@ -40,15 +50,13 @@ class Ship:
         self.screen = game.screen
         self.boundaries = self.screen.get_rect()
 
-        self.image = pygame.image.load(self.settings.ship_file)
-        self.image = pygame.transform.scale( self.image, 
-            (self.settings.ship_w, self.settings.ship_h)
-            )
-        self.rect = self.image.get_rect()
+        self._load_image()
+        self.start_offset = start_offset
         self._center_ship()
         self.moving_right = False
         self.moving_left = False
         self.arsenal = arsenal
+        self.arsenal.ship = self
 
     def _center_ship(self):
 
@@ -57,7 +65,37 @@ class Ship:
 
         """
         self.rect.midbottom = self.boundaries.midbottom
+        self.rect.x += round(self.start_offset * self.game.resolution.scale)
         self.x = float(self.rect.x)
+
+    def _load_image(self):
+
+        """
+        Sets the ship image, mask and rect size for the current resolution
+        """
+        self.image = self.game.resolution.image(self.settings.ship_file,
+            (self.settings.ship_w, self.settings.ship_h))
+        self.mask = cached_mask(self.game.resolution,
+            (self.settings.ship_file, *self.image.get_size()), self.image)
+        self.rect = self.image.get_rect()
+
+    def rescale(self, old_size):
+
+        """
+        Fits the ship to a new screen size, keeping it at the same fraction of
+        the screen width
+
+        Args
+        ----
+        old_size
+            (width, height) of the screen before the change
+        """
+        self.boundaries = self.screen.get_rect()
+        self.x *= self.boundaries.width / old_size[0]
+        self._load_image()
+        self.rect.bottom = self.boundaries.bottom
+        self.x = min(max(self.x, 0), self.boundaries.width - self.rect.width)
+        self.rect.x = self.x
     
     def update(self):
 
@@ -125,14 +163,19 @@ class Ship:
     def check_collisions(self, other_group):
 
         """
-        Checks the collision between ship and any other sprite
+        Checks the collision between ship and any other sprite, on solid pixels
+        when pixel_collisions is on in settings
 
         Returns
         -------
         
             bool: If ship collides, then ship is returned to center
         """
-        if pygame.sprite.spritecollideany(self, other_group):
+        if self.settings.pixel_collisions:
+            hit = collide_pixels(self, other_group)
+        else:
+            hit = pygame.sprite.spritecollideany(self, other_group)
+        if hit:
             self._center_ship()
             return True
         return False
\ No newline at end of file
@@ -0,0 +1,213 @@
+import threading
+from time import perf_counter, sleep
+from typing import NamedTuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+   from alien_invasion import AlienInvasion
+
+
+class RenderSnapshot(NamedTuple):
+
+    """
+    Immutable picture of everything that moves, taken at the end of a
+    simulation tick. Each sprite field is a tuple of (image, (x, y)) pairs that
+    can be handed straight to Surface.blits(); particles holds copies of the
+    live particle arrays from ExplosionParticles.snapshot()
+    """
+
+    ship: tuple
+    bullets: tuple
+    aliens: tuple
+    enemy_bullets: tuple
+    asteroids: tuple
+    particles: tuple
+
+
+class SnapshotBuffer:
+
+    """
+    Double buffer of render snapshots
+
+    The simulation thread writes into the back slot and then flips which slot
+    is the front one. The render thread only reads the front slot, so it always
+    gets a whole snapshot
+
+    Methods
+    -------
+
+    __init__(self)
+        creates two empty slots
+    publish(self, snapshot)
+        stores a snapshot in the back slot and makes it the front
+    latest(self)
+        returns the front snapshot
+    """
+
+    def __init__(self):
+
+        """
+        Creates two empty slots
+
+        Attributes
+        ----------
+        slots
+            the two snapshots
+        front (int)
+            index of the slot the render thread reads
+        lock
+            guards the flip of front
+        """
+        self.slots = [None, None]
+        self.front = 0
+        self.lock = threading.Lock()
+
+    def publish(self, snapshot):
+
+        """
+        Stores a snapshot in the back slot and makes it the front slot
+
+        Args
+        ----
+        snapshot (RenderSnapshot)
+        """
+        back = 1 - self.front
+        self.slots[back] = snapshot
+        with self.lock:
+            self.front = back
+
+    def latest(self):
+
+        """
+        Returns the front snapshot, None before the first publish
+        """
+        with self.lock:
+            return self.slots[self.front]
+
+
+class SimulationThread(threading.Thread):
+
+    """
+    Runs the game simulation at a fixed tick on its own thread and publishes a
+    render snapshot after every tick
+
+    Methods
+    -------
+
+    __init__(self, game: 'AlienInvasion')
+        sets up the tick length and snapshot buffer
+    run(self)
+        the simulation loop
+    step(self)
+        runs one simulation tick
+    take_snapshot(self)
+        builds a RenderSnapshot from the current game state
+    stop(self)
+        asks the loop to finish and waits for it
+    """
+
+    def __init__(self, game: 'AlienInvasion'):
+
+        """
+        Sets up the tick length and snapshot buffer
+
+        Args
+        ----
+        game: AlienInvasion
+
+        Attributes
+        ----------
+        game
+            AlienInvasion
+        tick (float)
+            seconds per simulation tick, from FPS in settings
+        buffer
+            SnapshotBuffer read by the render loop
+        state_lock
+            held while the game state changes, shared with the event handling
+            on the main thread
+        """
+        super().__init__(name='simulation', daemon=True)
+        self.game = game
+        self.tick = 1 / game.settings.FPS
+        self.buffer = SnapshotBuffer()
+        self.state_lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def run(self):
+
+        """
+        Steps the simulation once per tick until stopped. If a tick runs late
+        the schedule restarts from now instead of running ticks back to back.
+        The lock is waited for one tick at a time, so the loop still sees a
+        stop asked for by a thread that holds the lock
+        """
+        next_tick = perf_counter()
+        while not self._stopped.is_set():
+            if not self.state_lock.acquire(timeout=self.tick):
+                continue
+            try:
+                if self._stopped.is_set():
+                    break
+                self.step()
+                self.buffer.publish(self.take_snapshot())
+            finally:
+                self.state_lock.release()
+
+            next_tick += self.tick
+            delay = next_tick - perf_counter()
+            if delay > 0:
+                sleep(delay)
+            else:
+                next_tick = perf_counter()
+
+    def step(self):
+
+        """
+        Runs one simulation tick, the same work run_game does between events
+        and drawing
+        """
+        game = self.game
+        if game.game_active and not game._paused():
+            for ship in game.ships:
+                ship.update()
+            game.alien_fleet.update_fleet()
+            game.asteroids.update()
+            game._check_collisions()
+            game.events.dispatch()
+            game.particles.update()
+
+    def take_snapshot(self):
+
+        """
+        Builds a RenderSnapshot from the current game state
+
+        Returns:
+            RenderSnapshot
+        """
+        game = self.game
+        ship = game.ship
+        enemy = game.alien_fleet.arsenal
+        return RenderSnapshot(
+            ship=((ship.image, ship.rect.topleft),),
+            bullets=tuple(
+                (bullet.image, bullet.rect.topleft) for bullet in ship.arsenal.arsenal),
+            aliens=tuple(
+                (alien.image, alien.rect.topleft) for alien in game.alien_fleet.fleet),
+            enemy_bullets=tuple(
+                (enemy.image, enemy.rects[slot].topleft) for slot in enemy.active),
+            asteroids=tuple(
+                (asteroid.image, asteroid.rect.topleft)
+                for asteroid in game.asteroids.asteroids),
+            particles=game.particles.snapshot(),
+            )
+
+    def stop(self):
+
+        """
+        Asks the loop to finish after the current tick and waits until it has,
+        so nothing touches the game or pygame afterwards. Safe to call while
+        holding state_lock
+        """
+        self._stopped.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
@@ -0,0 +1,300 @@
+import argparse
+import gc
+import json
+import resource
+import sys
+from collections import Counter
+from pathlib import Path
+from statistics import median
+from time import perf_counter
+
+import numpy as np
+
+from headless import AutoPlayer, create_headless_game
+
+
+COUNTERS = ('rss_kib', 'objects', 'aliens', 'bullets', 'alien_bullets',
+    'asteroids', 'particles', 'handlers', 'frame_ms')
+
+
+def _rss_kib():
+
+    """
+    Returns:
+        int: resident memory of this process in KiB, read from /proc where it
+        exists, else the peak from getrusage()
+    """
+    try:
+        with open('/proc/self/statm') as statm:
+            pages = int(statm.read().split()[1])
+        return pages * resource.getpagesize() // 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def find_growth(values, windows, tolerance, slack):
+
+    """
+    Checks a series of samples for steady growth
+
+    The samples are split into windows and the lowest value of each window is
+    kept. Sawtooth patterns (garbage building up and being collected, a fleet
+    being rebuilt) do not move these floors, a leak raises every one of them
+
+    Args
+    ----
+    values
+        samples in the order they were taken
+    windows (int)
+        number of windows to split the samples into
+    tolerance (float)
+        growth as a fraction of the first floor that is still allowed
+    slack (float)
+        growth that is always allowed
+
+    Returns:
+        tuple: (first floor, last floor) if every floor is at least the one
+        before it and the last grew past the allowance, else None
+    """
+    size = len(values) // windows
+    if size < 1:
+        return None
+    floors = [min(values[i * size:(i + 1) * size]) for i in range(windows)]
+    if any(later < earlier for earlier, later in zip(floors, floors[1:])):
+        return None
+    if floors[-1] - floors[0] <= max(slack, abs(floors[0]) * tolerance):
+        return None
+    return floors[0], floors[-1]
+
+
+class SoakTest:
+
+    """
+    Plays a headless game for a long time and samples what it holds, to find
+    memory leaks and frame time creep that only show after hours of play
+
+    The automated player restarts after every game over, and the level and the
+    whole game are also reset on a fixed frame count, so a run goes through
+    thousands of _reset_level and restart_game cycles. Every sample_every
+    frames the process memory, the number of live objects by type, the sprites
+    in the fleet and the arsenals and the frame times since the last sample
+    are recorded
+
+    Methods
+    -------
+
+    __init__(self, minutes, max_frames, sample_every, reset_every, restart_every)
+        sets up the run
+    run(self, log=None)
+        plays the game and takes the samples
+    sample(self)
+        current counters and object counts by type
+    report(self, windows, tolerance, slack)
+        counters and object types that kept growing
+    """
+
+    def __init__(self, minutes=60, max_frames=None, sample_every=1800,
+            reset_every=900, restart_every=5400):
+
+        """
+        Sets up the run
+
+        Args
+        ----
+        minutes (float)
+            wall clock time to play for
+        max_frames (int)
+            frames to stop after, None to play until the time is up
+        sample_every (int)
+            frames between samples
+        reset_every (int)
+            frames between forced _reset_level calls
+        restart_every (int)
+            frames between forced restart_game calls
+
+        Attributes
+        ----------
+        samples
+            one dict of counters per sample
+        types
+            one dict of live objects by type name per sample
+        frames (int)
+            frames played
+        resets (int)
+            level resets, forced and from clearing a level
+        """
+        self.minutes = minutes
+        self.max_frames = max_frames
+        self.sample_every = sample_every
+        self.reset_every = reset_every
+        self.restart_every = restart_every
+        self.samples = []
+        self.types = []
+        self.frames = 0
+        self.resets = 0
+        self.game = None
+        self.player = None
+        self._frame_times = []
+
+    def _on_level_cleared(self, events):
+        self.resets += len(events)
+
+    def sample(self):
+
+        """
+        Counts what the game holds right now, after a full collection so only
+        objects that are still referenced are counted
+
+        Returns:
+            tuple: (dict of counters, Counter of live objects by type name)
+        """
+        gc.collect()
+        types = Counter(type(obj).__name__ for obj in gc.get_objects())
+        game = self.game
+        fleet = game.alien_fleet
+        counters = {
+            'frame': self.frames,
+            'rss_kib': _rss_kib(),
+            'objects': sum(types.values()),
+            'aliens': len(fleet.fleet),
+            'bullets': sum(len(ship.arsenal.arsenal) for ship in game.ships),
+            'alien_bullets': len(fleet.arsenal.active),
+            'asteroids': len(game.asteroids.asteroids),
+            'particles': int(np.count_nonzero(game.particles.life)),
+            'handlers': sum(len(handlers) for handlers in game.events.handlers.values()),
+            'frame_ms': median(self._frame_times) if self._frame_times else 0.0,
+            }
+        self._frame_times = []
+        return counters, types
+
+    def run(self, log=None):
+
+        """
+        Plays until the time or the frame count runs out, sampling every
+        sample_every frames
+
+        Args
+        ----
+        log (file)
+            JSON lines file every sample is appended to as it is taken
+        """
+        self.game = create_headless_game()
+        self.game.events.subscribe('level_cleared', self._on_level_cleared)
+        self.player = AutoPlayer(self.game)
+        log_file = open(log, 'a') if log else None
+        stop_at = perf_counter() + self.minutes * 60
+        try:
+            while perf_counter() < stop_at:
+                if self.max_frames is not None and self.frames >= self.max_frames:
+                    break
+                self.frames += 1
+                if self.frames % self.restart_every == 0:
+                    self.player.restarts += 1
+                    self.game.restart_game()
+                elif self.frames % self.reset_every == 0:
+                    self.resets += 1
+                    self.game._reset_level()
+
+                start = perf_counter()
+                self.player.play_frame()
+                self._frame_times.append((perf_counter() - start) * 1000)
+
+                if self.frames % self.sample_every == 0:
+                    counters, types = self.sample()
+                    self.samples.append(counters)
+                    # the collector stops tracking plain dicts of str -> int,
+                    # so the samples kept here do not show up in later counts
+                    self.types.append(dict(types))
+                    print(' '.join(f'{name}={value:.3f}' if isinstance(value, float)
+                        else f'{name}={value}' for name, value in counters.items()))
+                    if log_file:
+                        log_file.write(json.dumps(counters) + '\n')
+                        log_file.flush()
+        finally:
+            if log_file:
+                log_file.close()
+            self.game.game_stats.save_scores()
+
+    def report(self, windows=8, tolerance=0.05, slack=None, skip=1):
+
+        """
+        Looks for counters and object types that grew through the whole run
+
+        Args
+        ----
+        windows (int)
+            number of windows the samples are split into
+        tolerance (float)
+            growth as a fraction of the first floor that is still allowed
+        slack (dict)
+            counter -> growth that is always allowed, object types use
+            slack['objects']
+        skip (int)
+            samples at the start left out while caches fill
+
+        Returns:
+            dict: counters and object types that grew, as name -> (first
+            floor, last floor)
+        """
+        slack = {'rss_kib': 2048, 'objects': 256, 'frame_ms': 0.05, **(slack or {})}
+        samples = self.samples[skip:]
+        growth = {}
+        for name in COUNTERS:
+            found = find_growth([counters[name] for counters in samples],
+                windows, tolerance, slack.get(name, 0))
+            if found:
+                growth[name] = found
+
+        types = self.types[skip:]
+        for name in set().union(*types):
+            found = find_growth([counts.get(name, 0) for counts in types],
+                windows, tolerance, slack['objects'] / 8)
+            if found:
+                growth[f'type:{name}'] = found
+        return growth
+
+
+def main(argv=None):
+
+    """
+    Command line entry point
+
+    Returns:
+        int: 1 if something kept growing, else 0
+    """
+    parser = argparse.ArgumentParser(
+        description='Play a headless game for a long time and flag anything that keeps growing.')
+    parser.add_argument('--minutes', type=float, default=60)
+    parser.add_argument('--frames', type=int,
+        help='stop after this many frames, even if time is left')
+    parser.add_argument('--sample-every', type=int, default=1800)
+    parser.add_argument('--reset-every', type=int, default=900,
+        help='frames between forced level resets')
+    parser.add_argument('--restart-every', type=int, default=5400,
+        help='frames between forced game restarts')
+    parser.add_argument('--windows', type=int, default=8,
+        help='windows the samples are split into to look for growth')
+    parser.add_argument('--tolerance', type=float, default=0.05)
+    parser.add_argument('--skip', type=int, default=1,
+        help='samples at the start left out of the growth check')
+    parser.add_argument('--log', type=Path,
+        help='append every sample to this JSON lines file')
+    args = parser.parse_args(argv)
+
+    soak = SoakTest(args.minutes, args.frames, args.sample_every,
+        args.reset_every, args.restart_every)
+    soak.run(args.log)
+    print(f'{soak.frames} frames, {len(soak.samples)} samples, '
+        f'{soak.resets} level resets, {soak.player.restarts} restarts')
+
+    if len(soak.samples) - args.skip < args.windows:
+        print(f'Not enough samples to look for growth, need {args.windows + args.skip}')
+        return 0
+    growth = soak.report(args.windows, args.tolerance, skip=args.skip)
+    for name, (first, last) in sorted(growth.items()):
+        print(f'GROWTH {name}: {first} -> {last}')
+    return 1 if growth else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
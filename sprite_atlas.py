@@ -0,0 +1,112 @@
+import pygame
+
+
+class SpriteAtlas:
+
+    """
+    Animation frames packed side by side in one converted surface
+
+    Every frame is a subsurface of the atlas, scaled once when the atlas is
+    built, so showing another frame only means picking another index
+
+    Methods
+    -------
+
+    __init__(self, frames)
+        packs the frames into the atlas
+    from_sheet(cls, sheet_file, count, size)
+        cuts a sprite sheet with the frames in one row
+    from_image(cls, image_file, size, squash)
+        makes squash and stretch frames from a single image
+    """
+
+    def __init__(self, frames):
+
+        """
+        Packs the frames into the atlas
+
+        Args
+        ----
+        frames
+            surfaces of the same size, in animation order
+
+        Attributes
+        ----------
+        surface
+            the atlas, frames from left to right
+        frames
+            subsurface of the atlas for each frame
+        mask
+            collision mask covering the solid pixels of every frame
+        """
+        width, height = frames[0].get_size()
+        atlas = pygame.Surface((width * len(frames), height), pygame.SRCALPHA)
+        for i, frame in enumerate(frames):
+            atlas.blit(frame, (i * width, 0))
+        self.surface = atlas.convert_alpha()
+        self.frames = [
+            self.surface.subsurface((i * width, 0, width, height))
+            for i in range(len(frames))
+            ]
+
+        self.mask = pygame.mask.from_surface(frames[0])
+        for frame in frames[1:]:
+            self.mask.draw(pygame.mask.from_surface(frame), (0, 0))
+
+    @classmethod
+    def from_sheet(cls, sheet_file, count, size):
+
+        """
+        Cuts a sprite sheet into frames and scales them
+
+        Args
+        ----
+        sheet_file (file)
+            image with the frames in one row, all the same width
+        count (int)
+            number of frames in the sheet
+        size
+            (width, height) of a frame in the game
+
+        Returns:
+            SpriteAtlas
+        """
+        sheet = pygame.image.load(sheet_file)
+        cell_w = sheet.get_width() // count
+        return cls([
+            pygame.transform.scale(
+                sheet.subsurface((i * cell_w, 0, cell_w, sheet.get_height())), size)
+            for i in range(count)
+            ])
+
+    @classmethod
+    def from_image(cls, image_file, size, squash):
+
+        """
+        Makes squash and stretch frames from a single image. Each frame is the
+        image scaled by a (width, height) factor and stood on the bottom middle
+        of the frame
+
+        Args
+        ----
+        image_file (file)
+            the image to animate
+        size
+            (width, height) of a frame in the game
+        squash (list)
+            (width factor, height factor) of each frame, at most 1
+
+        Returns:
+            SpriteAtlas
+        """
+        width, height = size
+        image = pygame.image.load(image_file)
+        frames = []
+        for factor_w, factor_h in squash:
+            frame_w = round(width * factor_w)
+            frame_h = round(height * factor_h)
+            frame = pygame.Surface(size, pygame.SRCALPHA)
+            frame.blit(pygame.transform.scale(image, (frame_w, frame_h)),
+                ((width - frame_w) // 2, height - frame_h))
+            frames.append(frame)
+        return cls(frames)
@@ -0,0 +1,202 @@
+import pygame
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+   from alien_invasion import AlienInvasion
+
+
+def tile_layer(image_file, size, colorkey=None):
+
+    """
+    Scales a layer image to the screen and tiles it twice vertically into a
+    single converted surface
+
+    Args
+    ----
+    image_file (file)
+        image used for the layer
+    size
+        (width, height) of the surface the layer is drawn on
+    colorkey (int, rgb scale)
+        color drawn as transparent, None for an opaque layer
+
+    Returns:
+        pygame.Surface: the tiled image, twice the height of the screen
+    """
+    width, height = size
+    image = pygame.image.load(image_file)
+    image = pygame.transform.scale(image, (width, height))
+
+    tiled = pygame.Surface((width, height * 2))
+    tiled.blit(image, (0, 0))
+    tiled.blit(image, (0, height))
+    tiled = tiled.convert()
+    if colorkey is not None:
+        tiled.set_colorkey(colorkey, pygame.RLEACCEL)
+    return tiled
+
+
+class StarfieldLayer:
+
+    """
+    One scrolling layer of the background
+
+    The image is scaled to the screen once and tiled twice vertically into a
+    single converted surface. Each frame blits a screen-sized window of that
+    surface, so scrolling only moves the source rect and never scales or
+    allocates
+
+    Methods
+    -------
+
+    __init__(self, screen, tiled, speed)
+        sets up the visible window of a tiled layer image
+    update(self)
+        moves the layer down by its speed
+    draw(self)
+        blits the visible window of the layer
+    """
+
+    def __init__(self, screen, tiled, speed):
+
+        """
+        Sets up the visible window of a tiled layer image
+
+        Args
+        ----
+        screen
+            screen of game
+        tiled
+            layer image from tile_layer(), sized for the screen
+        speed (float)
+            pixels the layer moves down each frame
+
+        Attributes
+        ----------
+        tiled
+            layer image stacked twice vertically
+        area
+            rect of the tiled image that is visible this frame
+        offset (float)
+            how far the layer has scrolled, wraps at the screen height
+        """
+        self.screen = screen
+        self.speed = speed
+        width, height = screen.get_size()
+        self.tiled = tiled
+        self.height = height
+        self.offset = 0.0
+        self.area = pygame.Rect(0, height, width, height)
+
+    def update(self):
+
+        """
+        Moves the layer down by its speed, wrapping after one screen height
+        """
+        self.offset = (self.offset + self.speed) % self.height
+        self.area.y = self.height - int(self.offset)
+
+    def draw(self):
+
+        """
+        Blits the visible window of the tiled image onto the screen
+        """
+        self.screen.blit(self.tiled, (0, 0), self.area)
+
+
+class Starfield:
+
+    """
+    Parallax background made of scrolling layers, drawn back to front
+
+    Methods
+    -------
+
+    __init__(self, game: 'AlienInvasion', screen=None)
+        builds the layers from settings
+    rescale(self, screen)
+        rebuilds the layers for a new screen size
+    update(self)
+        scrolls every layer
+    draw(self)
+        draws every layer
+    """
+
+    def __init__(self, game: 'AlienInvasion', screen=None):
+
+        """
+        Builds the layers from settings
+
+        Args
+        ----
+        game: AlienInvasion
+        screen
+            surface the layers are sized for and drawn on, the game's screen
+            when None. Speeds are scaled with the surface height
+
+        Attributes
+        ----------
+        game
+            AlienInvasion
+        settings
+            references the settings file
+        layers
+            StarfieldLayer objects, back to front
+        """
+        self.game = game
+        self.settings = game.settings
+        self.layers = self._build_layers(screen or game.screen)
+
+    def _build_layers(self, screen):
+
+        """
+        Makes a layer for every image in settings, with tiled images kept in
+        the game's resolution cache so a size seen before is not scaled again
+
+        Returns:
+            list: StarfieldLayer objects, back to front
+        """
+        size = screen.get_size()
+        scale = screen.get_height() / self.game.screen.get_height()
+        layers = []
+        for image_file, speed, colorkey in self.settings.starfield_layers:
+            tiled = self.game.resolution.get(('starfield', image_file, size),
+                lambda image_file=image_file, colorkey=colorkey:
+                    tile_layer(image_file, size, colorkey))
+            layers.append(StarfieldLayer(screen, tiled, speed * scale))
+        return layers
+
+    def rescale(self, screen=None):
+
+        """
+        Rebuilds the layers for a new screen size, keeping how far each layer
+        has scrolled
+
+        Args
+        ----
+        screen
+            surface the layers are drawn on, the game's screen when None
+        """
+        scrolled = [layer.offset / layer.height for layer in self.layers]
+        self.layers = self._build_layers(screen or self.game.screen)
+        for layer, fraction in zip(self.layers, scrolled):
+            layer.offset = fraction * layer.height
+            layer.area.y = layer.height - int(layer.offset)
+
+    def update(self):
+
+        """
+        Scrolls every layer if scrolling is turned on in settings
+        """
+        if not self.settings.scrolling_background:
+            return
+        for layer in self.layers:
+            layer.update()
+
+    def draw(self):
+
+        """
+        Draws every layer, back to front
+        """
+        for layer in self.layers:
+            layer.draw()
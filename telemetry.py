@@ -0,0 +1,214 @@
+import json
+import threading
+from collections import deque
+from time import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+   from alien_invasion import AlienInvasion
+
+
+class TelemetryLog:
+
+    """
+    Optional session telemetry written as compact JSON lines
+
+    Recording only appends a tuple to a queue. A background thread turns the
+    queued records into JSON and writes them to the telemetry file, so the
+    game loop never encodes or touches the disk
+
+    Record layout
+    -------------
+
+    {"t": "s", "ts": ...}
+        session start, with the wall clock time
+    {"t": "f", "n": frame, "ms": frame time, "a": aliens, "b": bullets,
+     "c": collisions}
+        one per frame
+    {"t": "e", "n": frame, "e": event name, ...}
+        game events such as ship_lost, game_over and level_up
+
+    Methods
+    -------
+
+    __init__(self, game: 'AlienInvasion')
+        opens the log and starts the writer thread if telemetry is on
+    record_frame(self, frame_ms)
+        queues a frame record
+    record_event(self, name, **fields)
+        queues an event record
+    add_collisions(self, count)
+        counts collisions for the current frame
+    close(self)
+        writes what is left and closes the file
+    """
+
+    def __init__(self, game: 'AlienInvasion'):
+
+        """
+        Opens the log and starts the writer thread if telemetry is on in
+        settings
+
+        Args
+        ----
+        game: AlienInvasion
+
+        Attributes
+        ----------
+        game
+            AlienInvasion
+        settings
+            references the settings file
+        enabled (bool)
+            True when records are being kept
+        frame (int)
+            number of frames recorded
+        collisions (int)
+            collisions counted since the last frame record
+        queue
+            records waiting for the writer thread
+        """
+        self.game = game
+        self.settings = game.settings
+        self.enabled = self.settings.telemetry
+        self.frame = 0
+        self.collisions = 0
+        self.queue = deque()
+        game.events.subscribe('aliens_killed', self._on_aliens_killed)
+        game.events.subscribe('level_cleared', self._on_level_cleared)
+        game.events.subscribe('ship_lost', self._on_ship_lost)
+        game.events.subscribe('game_over', self._on_game_over)
+        if not self.enabled:
+            return
+
+        self.file = open(self.settings.telemetry_file, 'a', encoding='utf-8')
+        self._stopped = threading.Event()
+        self.queue.append(('s', time()))
+        self.writer = threading.Thread(target=self._write_loop,
+            name='telemetry', daemon=True)
+        self.writer.start()
+
+    def record_frame(self, frame_ms):
+
+        """
+        Queues a frame record
+
+        Args
+        ----
+        frame_ms (int)
+            frame time from clock.tick()
+        """
+        if not self.enabled:
+            return
+        self.frame += 1
+        self.queue.append(('f', self.frame, frame_ms,
+            len(self.game.alien_fleet.fleet), len(self.game.ship.arsenal.arsenal),
+            self.collisions))
+        self.collisions = 0
+
+    def record_event(self, name, **fields):
+
+        """
+        Queues an event record
+
+        Args
+        ----
+        name (str)
+            name of the event
+        fields
+            extra values stored with the event
+        """
+        if not self.enabled:
+            return
+        self.queue.append(('e', self.frame, name, fields))
+
+    def add_collisions(self, count):
+
+        """
+        Counts collisions for the current frame
+        """
+        self.collisions += count
+
+    def _on_aliens_killed(self, events):
+
+        """
+        Counts the aliens killed this frame as collisions
+        """
+        self.add_collisions(sum(len(event['aliens']) for event in events))
+
+    def _on_level_cleared(self, events):
+
+        """
+        Records a level_up event with the new level
+        """
+        self.record_event('level_up', level=self.game.game_stats.level)
+
+    def _on_ship_lost(self, events):
+
+        """
+        Records a ship_lost event for every ship lost this frame
+        """
+        for event in events:
+            self.record_event('ship_lost', ships_left=event['ships_left'])
+
+    def _on_game_over(self, events):
+
+        """
+        Records the game_over event with the final score and level
+        """
+        for event in events:
+            self.record_event('game_over', score=event['score'], level=event['level'])
+
+    def _write_loop(self):
+
+        """
+        Writes queued records every telemetry_flush_interval seconds until the
+        log is closed
+        """
+        while not self._stopped.wait(self.settings.telemetry_flush_interval):
+            self._drain()
+        self._drain()
+
+    def _drain(self):
+
+        """
+        Encodes every queued record and writes them in one call
+        """
+        lines = []
+        while self.queue:
+            lines.append(self._encode(self.queue.popleft()))
+        if lines:
+            self.file.write(''.join(lines))
+            self.file.flush()
+
+    def _encode(self, record):
+
+        """
+        Turns a queued tuple into one JSON line
+
+        Returns:
+            str: the record as compact JSON ending in a newline
+        """
+        kind = record[0]
+        if kind == 'f':
+            _, frame, frame_ms, aliens, bullets, collisions = record
+            data = {'t': 'f', 'n': frame, 'ms': frame_ms, 'a': aliens,
+                'b': bullets, 'c': collisions}
+        elif kind == 'e':
+            _, frame, name, fields = record
+            data = {'t': 'e', 'n': frame, 'e': name, **fields}
+        else:
+            data = {'t': 's', 'ts': record[1]}
+        return json.dumps(data, separators=(',', ':')) + '\n'
+
+    def close(self):
+
+        """
+        Stops the writer thread, writes what is left, and closes the file
+        """
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._stopped.set()
+        self.writer.join()
+        self.file.close()
@@ -0,0 +1,108 @@
+import os
+import select
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+import netplay
+from headless import create_headless_game
+from netplay import LockstepSession, StateCodec
+
+
+TICKS = 2400
+FIRE_EVERY = 7
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _settings(port):
+    return dict(netplay_port=port, netplay_checksum_interval=1, random_seed=0)
+
+
+def _play(game, ticks):
+
+    """
+    Steps a netplay game like _run_netplay() does, without drawing, firing
+    every FIRE_EVERY ticks
+
+    Returns:
+        int: tick the game stopped at
+    """
+    session = game.netplay
+    while session.tick < ticks and game.game_active:
+        if session.tick % FIRE_EVERY == 0:
+            session.queue_fire()
+        game._update_netplay()
+    return session.tick
+
+
+def _join(port):
+
+    """
+    Joins the session on port, plays it out and prints the tick it stopped
+    at and the checksum of the state there
+    """
+    game = create_headless_game(netplay_role='join', **_settings(port))
+    game.netplay = LockstepSession.connect(game)
+    try:
+        tick = _play(game, TICKS)
+    finally:
+        game.netplay.close()
+    print(tick, StateCodec.checksum(game))
+
+
+def test_loopback_stays_in_sync(monkeypatch):
+
+    """
+    Hosts here and joins from another process over the loopback interface,
+    then plays past the first alien shots with checksums on every tick, so
+    any difference in the simulations raises DesyncError
+    """
+    root = Path(__file__).parent
+    monkeypatch.chdir(root)
+    # the shared seed the host sends is random, fix it so every run plays
+    # the same game
+    monkeypatch.setattr(netplay.random, 'getrandbits', lambda bits: 1)
+    port = _free_port()
+    host = create_headless_game(netplay_role='host', **_settings(port))
+    host.netplay = LockstepSession.connect(host)
+
+    joiner = None
+    try:
+        # the host plays alone until alien bullets have been fired and freed,
+        # so its pool is no longer in the order a fresh one starts in
+        pool = host.alien_fleet.arsenal
+        for _ in range(TICKS):
+            if pool.active and pool.free != sorted(pool.free):
+                break
+            host.netplay.queue_fire()
+            host._update_netplay()
+        join_tick = host.netplay.tick
+
+        # without the prompt setting pygame prints its banner on import, ahead
+        # of the joiner's result
+        joiner = subprocess.Popen([sys.executable, __file__, str(port)],
+            cwd=root, stdout=subprocess.PIPE, text=True,
+            env={**os.environ, 'PYGAME_HIDE_SUPPORT_PROMPT': '1'})
+        # wait for the connection so it is taken on the next tick
+        select.select([host.netplay.listener], [], [], host.settings.netplay_timeout)
+        host_tick = _play(host, TICKS)
+        output, _ = joiner.communicate(timeout=host.settings.netplay_timeout * 2)
+    finally:
+        host.netplay.close()
+        if joiner is not None and joiner.poll() is None:
+            joiner.kill()
+
+    assert joiner.returncode == 0
+    assert join_tick < TICKS
+    assert output.split() == [str(host_tick), str(StateCodec.checksum(host))]
+    assert host_tick == TICKS
+
+
+if __name__ == '__main__':
+    _join(int(sys.argv[1]))
@@ -0,0 +1,318 @@
+import queue
+import struct
+import threading
+import zlib
+from time import perf_counter, strftime
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+   from alien_invasion import AlienInvasion
+
+
+def _png_chunk(kind, data):
+    return (struct.pack('>I', len(data)) + kind + data
+        + struct.pack('>I', zlib.crc32(kind + data)))
+
+
+def encode_png(raw, size, pitch, order, level=1):
+
+    """
+    Encodes a copy of the screen's pixels as an RGB PNG
+
+    pygame.image.save() holds the GIL while it encodes, which would stop the
+    game loop for the whole encode. Here the pixels are reordered with numpy
+    and compressed with zlib, which both let go of the GIL for the heavy work
+
+    Args
+    ----
+    raw (bytes)
+        the screen's pixel memory, 4 bytes per pixel
+    size
+        (width, height) of the frame
+    pitch (int)
+        bytes per row of raw
+    order
+        byte offset of red, green and blue within a pixel
+    level (int)
+        zlib compression level
+
+    Returns:
+        bytes: the PNG file
+    """
+    width, height = size
+    pixels = np.frombuffer(raw, np.uint8).reshape(height, pitch)[:, :width * 4]
+    pixels = pixels.reshape(height, width, 4)
+    rows = np.zeros((height, 1 + width * 3), np.uint8)
+    rgb = rows[:, 1:].reshape(height, width, 3)
+    for channel, offset in enumerate(order):
+        rgb[..., channel] = pixels[..., offset]
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + _png_chunk(b'IHDR', header)
+        + _png_chunk(b'IDAT', zlib.compress(rows.tobytes(), level))
+        + _png_chunk(b'IEND', b''))
+
+
+class VideoCapture:
+
+    """
+    Records the rendered frames to disk for bug reports and trailers
+
+    After each frame is drawn, its pixels are copied out of the screen into a
+    bounded queue, which is the only work the game loop does. Worker threads
+    take frames off the queue and write them as a PNG sequence, or as raw
+    pixels in one file with an index. When the workers fall behind and the
+    queue is full, frames are dropped and counted instead of making the game
+    wait
+
+    Each recording goes to its own folder in capture_dir, with an index.csv
+    that lists the frames written. Frame numbers count every rendered frame,
+    so gaps in the index are the dropped frames. PNG workers add lines in the
+    order they finish frames, so the last one to stop sorts the index by frame
+
+    Index layout
+    ------------
+
+    png: frame, time_ms, file
+    raw: frame, time_ms, offset, width, height, pitch; the pixels of a frame
+    are height * pitch bytes at offset in frames.raw, 4 bytes per pixel in
+    the order given on the first line
+
+    Methods
+    -------
+
+    __init__(self, game: 'AlienInvasion')
+        sets up capture and starts recording if capture_video is on
+    start(self)
+        starts a new recording
+    stop(self)
+        stops recording without waiting, the workers finish the frames
+        already queued
+    toggle(self)
+        starts or stops recording
+    capture_frame(self)
+        queues a copy of the frame just drawn
+    close(self)
+        stops recording and waits for every frame to be written
+    """
+
+    FORMATS = ('png', 'raw')
+
+    def __init__(self, game: 'AlienInvasion'):
+
+        """
+        Sets up capture and starts recording if capture_video is on in settings
+
+        Args
+        ----
+        game: AlienInvasion
+
+        Attributes
+        ----------
+        screen
+            screen of game
+        settings
+            references the settings file
+        format (str)
+            'png' or 'raw'
+        recording (bool)
+            True while frames are being captured
+        queue
+            frames waiting for the workers, bounded by capture_queue_size
+        workers
+            writer threads of every recording, joined by close()
+        frame (int)
+            frames rendered since the recording started
+        written (int)
+            frames written in the current recording
+        dropped (int)
+            frames dropped in the current recording because the queue was
+            full
+        """
+        self.screen = game.screen
+        self.settings = game.settings
+        self.format = self.settings.capture_format
+        if self.format not in self.FORMATS:
+            print(f'Unknown capture_format {self.format!r}, using png')
+            self.format = 'png'
+        self.recording = False
+        self.queue = None
+        self.workers = []
+        self.frame = 0
+        self.written = 0
+        self.dropped = 0
+        if self.settings.capture_video:
+            self.start()
+
+    def start(self):
+
+        """
+        Starts a new recording in its own folder, with its own queue and
+        workers. A raw recording has one worker so frames.raw is written in
+        order
+        """
+        if self.recording:
+            return
+        stamp = strftime('%Y%m%d-%H%M%S')
+        folder = self.settings.capture_dir / stamp
+        number = 1
+        while folder.exists():
+            number += 1
+            folder = self.settings.capture_dir / f'{stamp}-{number}'
+        try:
+            folder.mkdir(parents=True, exist_ok=True)
+            index = open(folder / 'index.csv', 'w', encoding='utf-8')
+            frames = open(folder / 'frames.raw', 'wb') if self.format == 'raw' else None
+        except OSError as e:
+            print(f'Could not start capture in {folder}: {e}')
+            return
+
+        if self.format == 'raw':
+            layout = ['X'] * 4
+            for channel, shift in zip('RGB', self.screen.get_shifts()):
+                layout[shift // 8] = channel
+            index.write(f'# {"".join(layout)}\nframe,time_ms,offset,width,height,pitch\n')
+        else:
+            index.write('frame,time_ms,file\n')
+
+        self.queue = queue.Queue(maxsize=self.settings.capture_queue_size)
+        self.frame = 0
+        self.written = 0
+        self.dropped = 0
+        self._started_at = perf_counter()
+        recording = {'folder': folder, 'index': index, 'frames': frames,
+            'lock': threading.Lock(), 'offset': 0, 'stopped': threading.Event()}
+        self._stopped = recording['stopped']
+        count = 1 if self.format == 'raw' else self.settings.capture_workers
+        new_workers = [threading.Thread(target=self._write_loop,
+            args=(self.queue, recording), name='capture', daemon=True)
+            for _ in range(count)]
+        recording['left'] = count
+        for worker in new_workers:
+            worker.start()
+        self.workers.extend(new_workers)
+        self.recording = True
+        print(f'Capturing {self.format} frames to {folder}')
+
+    def stop(self):
+
+        """
+        Stops recording. The recording's stop event is set rather than a
+        marker queued, so this never waits on a full queue; the workers
+        still write the frames already queued and then exit
+        """
+        if not self.recording:
+            return
+        self.recording = False
+        self._stopped.set()
+        print(f'Capture stopped: {self.frame} frames, {self.dropped} dropped')
+
+    def toggle(self):
+
+        """
+        Starts or stops recording
+        """
+        if self.recording:
+            self.stop()
+        else:
+            self.start()
+
+    def capture_frame(self):
+
+        """
+        Queues a copy of the frame just drawn, or counts it as dropped if the
+        queue is full. The copy is the screen's pixel memory as it is, so the
+        game loop never converts or encodes
+        """
+        if not self.recording:
+            return
+        self.frame += 1
+        if self.queue.full():
+            self.dropped += 1
+            return
+        screen = self.screen
+        order = [shift // 8 for shift in screen.get_shifts()[:3]]
+        item = (self.frame, (perf_counter() - self._started_at) * 1000,
+            screen.get_buffer().raw, screen.get_size(), screen.get_pitch(), order)
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self, frames, recording):
+
+        """
+        Writes frames from the queue until it is empty after the recording
+        was stopped, then closes the recording's files if this was its last
+        worker, sorting a PNG index
+
+        Args
+        ----
+        frames
+            queue of the recording
+        recording (dict)
+            folder, open files, lock, next raw offset and stop event of the
+            recording
+        """
+        while True:
+            try:
+                item = frames.get(timeout=0.1)
+            except queue.Empty:
+                if recording['stopped'].is_set():
+                    break
+                continue
+            try:
+                self._write(recording, *item)
+            except OSError as e:
+                print(f'Could not write capture frame: {e}')
+        with recording['lock']:
+            recording['left'] -= 1
+            if recording['left'] == 0:
+                recording['index'].close()
+                if recording['frames']:
+                    recording['frames'].close()
+                else:
+                    self._sort_index(recording['folder'] / 'index.csv')
+
+    def _sort_index(self, path):
+
+        """
+        Sorts the lines of a PNG recording's index by frame number, keeping
+        the header first
+        """
+        try:
+            header, *lines = path.read_text(encoding='utf-8').splitlines(keepends=True)
+            lines.sort(key=lambda line: int(line.split(',', 1)[0]))
+            path.write_text(header + ''.join(lines), encoding='utf-8')
+        except (OSError, ValueError) as e:
+            print(f'Could not sort {path}: {e}')
+
+    def _write(self, recording, frame, time_ms, raw, size, pitch, order):
+
+        """
+        Writes one frame, as a PNG file or appended to frames.raw
+        """
+        if self.format == 'png':
+            name = f'frame_{frame:06d}.png'
+            (recording['folder'] / name).write_bytes(
+                encode_png(raw, size, pitch, order, self.settings.capture_png_level))
+            line = f'{frame},{time_ms:.2f},{name}\n'
+        else:
+            offset = recording['offset']
+            recording['frames'].write(raw)
+            recording['offset'] += len(raw)
+            line = f'{frame},{time_ms:.2f},{offset},{size[0]},{size[1]},{pitch}\n'
+        with recording['lock']:
+            recording['index'].write(line)
+            self.written += 1
+
+    def close(self):
+
+        """
+        Stops recording and waits for the workers to write every queued frame
+        """
+        self.stop()
+        for worker in self.workers:
+            worker.join()
+        self.workers.clear()